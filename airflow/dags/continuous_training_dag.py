@@ -91,11 +91,11 @@ dag = DAG(
 #     dag=dag,
 # )
 
-# Sensor pour détecter nouveau modèle dans S3
+# Sensor pour détecter nouveau modèle dans S3 (index publié par train.py, voir model_locator.py)
 # s3_model_sensor = S3KeySensor(
 #     task_id='wait_for_new_model',
 #     bucket_name='mlops-models',
-#     bucket_key='models/dandelion_vs_grass_classifier/',
+#     bucket_key='models/dandelion_vs_grass_classifier/index.json',
 #     aws_conn_id='aws_default',
 #     poke_interval=60,
 #     timeout=600,
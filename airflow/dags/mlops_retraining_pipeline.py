@@ -40,8 +40,14 @@ def download_data_task():
     print("✅ Données téléchargées avec succès")
 
 
-def train_model_task():
-    """Entraîne le modèle avec MLflow et upload vers S3."""
+def train_model_task(warm_start: bool = True):
+    """
+    Entraîne le modèle avec MLflow et upload vers S3.
+    
+    Args:
+        warm_start: Affiner le modèle enregistré sur les nouvelles images
+            (train.py revient à un entraînement complet s'il n'y en a pas)
+    """
     import subprocess
     
     print("Entraînement du modèle...")
@@ -56,8 +62,14 @@ def train_model_task():
     script_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "train.py")
     script_path = os.path.abspath(script_path)
     
+    # Une nouvelle tentative (retries) reprend depuis le dernier point de reprise
+    # de la même exécution du DAG (clé AIRFLOW_CTX_DAG_RUN_ID, voir train.py)
+    command = ["python", script_path, "--resume"]
+    if warm_start:
+        command.append("--warm-start")
+    
     result = subprocess.run(
-        ["python", script_path],
+        command,
         env=env,
         capture_output=True,
         text=True
@@ -78,6 +90,17 @@ def build_docker_task():
     project_root = os.path.dirname(os.path.dirname(__file__))
     project_root = os.path.abspath(os.path.join(project_root, ".."))
     
+    # Modèle embarqué dans l'image : index mlruns/model_index.json écrit par train.py
+    result = subprocess.run(
+        ["python", "model_locator.py", "path"],
+        cwd=project_root,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise Exception(f"Aucun modèle à déployer: {result.stderr}")
+    print(f"Modèle: {result.stdout.strip()}")
+    
     result = subprocess.run(
         ["docker", "build", "-t", "dandelion-grass-classifier:latest", "."],
         cwd=project_root,
@@ -0,0 +1,228 @@
+"""
+Augmentation d'images par lot.
+
+Chaque image reçoit une transformation affine unique (rotation, translations,
+zoom, miroir horizontal composés en une matrice), tirée selon les mêmes lois
+que `ImageDataGenerator` ; le lot entier est ensuite déformé en une seule
+opération (interpolation bilinéaire, bords prolongés comme fill_mode="nearest").
+
+Deux implémentations partagent le calcul des matrices :
+- `augment_batch` : opérations TensorFlow (graphe tf.data, ImageProjectiveTransformV3)
+- `augment_numpy_batch` : NumPy vectorisé (lots lus dans un memmap, voir image_cache)
+"""
+import math
+from typing import Optional
+
+import numpy as np
+
+
+# Paramètres reconnus (mêmes noms que ImageDataGenerator)
+AUGMENTATION_PARAMETERS = ["rotation_range", "width_shift_range", "height_shift_range", "horizontal_flip", "zoom_range"]
+
+# Augmentation des images d'entraînement (train.py, recherche d'hyperparamètres, benchmarks)
+AUGMENTATION = {
+    "rotation_range": 20,
+    "width_shift_range": 0.2,
+    "height_shift_range": 0.2,
+    "horizontal_flip": True,
+    "zoom_range": 0.2,
+}
+
+
+def _compose(xp, theta, zx, zy, tx, ty, flip, height, width):
+    """
+    Compose les paramètres tirés en transformations (batch, 8) au format
+    ImageProjectiveTransform : coordonnées de sortie -> coordonnées d'entrée.
+    
+    Comme ImageDataGenerator : entrée = centre + R · (Z · F · (sortie - centre) + t),
+    où F est le miroir horizontal (appliqué à la sortie).
+    """
+    cos, sin = xp.cos(theta), xp.sin(theta)
+    a0, a1 = cos * zx * flip, -sin * zy
+    b0, b1 = sin * zx * flip, cos * zy
+    cx, cy = (width - 1.0) / 2.0, (height - 1.0) / 2.0
+    a2 = cx + cos * tx - sin * ty - a0 * cx - a1 * cy
+    b2 = cy + sin * tx + cos * ty - b0 * cx - b1 * cy
+    zeros = xp.zeros_like(a0)
+    return xp.stack([a0, a1, a2, b0, b1, b2, zeros, zeros], axis=1)
+
+
+def sample_transforms(
+    batch: int,
+    height: int,
+    width: int,
+    rng: Optional[np.random.Generator] = None,
+    rotation_range: float = 0.0,
+    width_shift_range: float = 0.0,
+    height_shift_range: float = 0.0,
+    horizontal_flip: bool = False,
+    zoom_range: float = 0.0
+) -> np.ndarray:
+    """
+    Tire une transformation affine par image (NumPy).
+    
+    Args:
+        batch: Nombre d'images
+        height, width: Taille des images
+        rng: Générateur aléatoire NumPy
+        rotation_range: Angle maximal (degrés)
+        width_shift_range, height_shift_range: Translation maximale (fraction de la taille)
+        horizontal_flip: Miroir horizontal avec probabilité 1/2
+        zoom_range: Zoom dans [1 - zoom_range, 1 + zoom_range], tiré par axe
+    
+    Returns:
+        Transformations float32 (batch, 8)
+    """
+    rng = rng or np.random.default_rng()
+    theta = rng.uniform(-rotation_range, rotation_range, batch) * (math.pi / 180.0)
+    zx = rng.uniform(1.0 - zoom_range, 1.0 + zoom_range, batch)
+    zy = rng.uniform(1.0 - zoom_range, 1.0 + zoom_range, batch)
+    tx = rng.uniform(-width_shift_range, width_shift_range, batch) * width
+    ty = rng.uniform(-height_shift_range, height_shift_range, batch) * height
+    flip = np.where(rng.random(batch) < 0.5, -1.0, 1.0) if horizontal_flip else np.ones(batch)
+    return _compose(np, theta, zx, zy, tx, ty, flip, float(height), float(width)).astype(np.float32)
+
+
+_LANES = np.uint32(0x00FF00FF)
+_ROUND = np.uint32(0x00800080)
+
+
+def _lerp_packed(a: np.ndarray, b: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """
+    Interpolation linéaire de pixels RGBA uint8 empaquetés en uint32.
+    
+    Les octets pairs puis impairs sont traités deux par deux dans des voies
+    de 16 bits (poids en virgule fixe sur 8 bits : 255 * 256 tient dans une voie).
+    """
+    inverse = np.uint32(256) - w
+    even = (a & _LANES) * inverse
+    even += (b & _LANES) * w
+    even += _ROUND
+    even >>= 8
+    even &= _LANES
+    odd = ((a >> 8) & _LANES) * inverse
+    odd += ((b >> 8) & _LANES) * w
+    odd += _ROUND
+    odd &= ~_LANES
+    return even | odd
+
+
+def warp_batch(images: np.ndarray, transforms: np.ndarray) -> np.ndarray:
+    """
+    Applique une transformation par image en une passe vectorisée (NumPy).
+    
+    Les lots uint8 (RGB) sont interpolés en virgule fixe, un pixel par uint32 ;
+    les autres types en float32.
+    
+    Args:
+        images: Lot (batch, H, W, C)
+        transforms: Transformations (batch, 8) de `sample_transforms`
+    
+    Returns:
+        Lot transformé (bilinéaire, coordonnées hors image ramenées au bord),
+        uint8 pour un lot uint8 (C <= 4), float32 sinon
+    """
+    batch, height, width, channels = images.shape
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32).reshape(2, 1, -1)
+    t = transforms.astype(np.float32)[:, :, None]
+    src_x = np.clip(t[:, 0] * xs + t[:, 1] * ys + t[:, 2], 0.0, width - 1.0)
+    src_y = np.clip(t[:, 3] * xs + t[:, 4] * ys + t[:, 5], 0.0, height - 1.0)
+    
+    # Coordonnées positives : la troncature vaut floor
+    index_type = np.int32 if batch * height * width < 2 ** 31 else np.int64
+    x0 = src_x.astype(index_type)
+    y0 = src_y.astype(index_type)
+    wx = src_x - x0
+    wy = src_y - y0
+    top_left = y0 * index_type(width) + x0
+    top_left += (np.arange(batch, dtype=index_type) * index_type(height * width))[:, None]
+    right = (x0 < width - 1).astype(index_type)
+    down = (y0 < height - 1) * index_type(width)
+    
+    if images.dtype == np.uint8 and channels <= 4:
+        padded = np.zeros((batch, height, width, 4), dtype=np.uint8)
+        padded[..., :channels] = images
+        table = padded.reshape(-1).view(np.uint32)
+        wx = (wx * 256.0 + 0.5).astype(np.uint32)
+        wy = (wy * 256.0 + 0.5).astype(np.uint32)
+        top = _lerp_packed(np.take(table, top_left), np.take(table, top_left + right), wx)
+        top_left += down
+        bottom = _lerp_packed(np.take(table, top_left), np.take(table, top_left + right), wx)
+        warped = _lerp_packed(top, bottom, wy).view(np.uint8).reshape(batch, height, width, 4)
+        return np.ascontiguousarray(warped[..., :channels])
+    
+    table = images.reshape(batch * height * width, channels).astype(np.float32, copy=False)
+    wx, wy = wx[..., None], wy[..., None]
+    top = np.take(table, top_left, axis=0)
+    top += (np.take(table, top_left + right, axis=0) - top) * wx
+    top_left += down
+    bottom = np.take(table, top_left, axis=0)
+    bottom += (np.take(table, top_left + right, axis=0) - bottom) * wx
+    top += (bottom - top) * wy
+    return top.reshape(batch, height, width, channels)
+
+
+def augment_numpy_batch(images: np.ndarray, rng: Optional[np.random.Generator] = None, **augmentation) -> np.ndarray:
+    """
+    Augmente un lot NumPy (ex: lot lu dans un memmap).
+    
+    Args:
+        images: Lot (batch, H, W, C)
+        rng: Générateur aléatoire NumPy
+        **augmentation: Paramètres (voir AUGMENTATION_PARAMETERS)
+    
+    Returns:
+        Lot augmenté (uint8 pour un lot uint8, float32 sinon)
+    """
+    transforms = sample_transforms(len(images), images.shape[1], images.shape[2], rng, **augmentation)
+    return warp_batch(images, transforms)
+
+
+def _sample_transforms_tf(
+    batch,
+    height,
+    width,
+    rotation_range: float = 0.0,
+    width_shift_range: float = 0.0,
+    height_shift_range: float = 0.0,
+    horizontal_flip: bool = False,
+    zoom_range: float = 0.0
+):
+    """Tire une transformation affine par image (opérations TensorFlow, mêmes lois)."""
+    import tensorflow as tf
+    
+    theta = tf.random.uniform([batch], -rotation_range, rotation_range) * (math.pi / 180.0)
+    zx = tf.random.uniform([batch], 1.0 - zoom_range, 1.0 + zoom_range)
+    zy = tf.random.uniform([batch], 1.0 - zoom_range, 1.0 + zoom_range)
+    tx = tf.random.uniform([batch], -width_shift_range, width_shift_range) * width
+    ty = tf.random.uniform([batch], -height_shift_range, height_shift_range) * height
+    flip = tf.ones([batch])
+    if horizontal_flip:
+        flip = tf.where(tf.random.uniform([batch]) < 0.5, -1.0, 1.0)
+    return _compose(tf.experimental.numpy, theta, zx, zy, tx, ty, flip, height, width)
+
+
+def augment_batch(images, **augmentation):
+    """
+    Augmente un lot dans le graphe TensorFlow (utilisable dans `Dataset.map`).
+    
+    Args:
+        images: Lot float32 (batch, H, W, 3)
+        **augmentation: Paramètres (voir AUGMENTATION_PARAMETERS)
+    
+    Returns:
+        Lot transformé par ImageProjectiveTransformV3
+    """
+    import tensorflow as tf
+    
+    shape = tf.shape(images)
+    height, width = tf.cast(shape[1], tf.float32), tf.cast(shape[2], tf.float32)
+    transforms = _sample_transforms_tf(shape[0], height, width, **augmentation)
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=tf.cast(transforms, tf.float32),
+        output_shape=shape[1:3],
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="NEAREST",
+    )
@@ -0,0 +1,145 @@
+"""
+Benchmark des variantes d'architecture (model_architectures.py) : nombre de
+paramètres, taille du SavedModel, temps de chargement, latence CPU (1 image
+et lot de 32) et accuracy de validation après quelques epochs.
+
+Chaque variante est enregistrée comme run MLflow imbriqué (expérience
+"architecture_benchmark") si MLflow est disponible.
+
+Usage:
+    python benchmarks/benchmark_architectures.py [--data-dir data] [--epochs 3]
+        [--variants baseline gap separable separable:0.5]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import tensorflow as tf
+from tensorflow import keras
+
+from input_pipeline import load_datasets
+from model_architectures import build_model
+
+try:
+    import mlflow
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+
+def generate_dataset(output_dir: Path, count: int, size: tuple = (320, 240)) -> Path:
+    """Génère un dossier data/<classe>/*.jpg synthétique (taches jaunes sur fond vert pour dandelion)."""
+    rng = np.random.default_rng(42)
+    for i in range(count):
+        label = ["dandelion", "grass"][i % 2]
+        (output_dir / label).mkdir(parents=True, exist_ok=True)
+        array = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        array[..., 1] = rng.integers(80, 180, (size[1], size[0]))
+        if label == "dandelion":
+            for _ in range(3):
+                y, x = rng.integers(20, size[1] - 20), rng.integers(20, size[0] - 20)
+                array[y - 15:y + 15, x - 15:x + 15] = [230, 210, 30]
+        Image.fromarray(array).save(output_dir / label / f"{i:08d}.jpg", quality=90)
+    return output_dir
+
+
+def directory_size(path: Path) -> int:
+    """Taille totale des fichiers d'un dossier (octets)."""
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def latency_ms(model: keras.Model, batch: np.ndarray, repeats: int = 20) -> float:
+    """Latence médiane d'une inférence (ms), fonction compilée et préchauffée."""
+    infer = tf.function(lambda x: model(x, training=False))
+    infer(batch)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        infer(batch).numpy()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000.0)
+
+
+def benchmark_variant(architecture: str, width: float, img_size: tuple, train, validation, epochs: int, tmp: Path) -> dict:
+    """Entraîne, sauvegarde, recharge et chronomètre une variante."""
+    model = build_model((*img_size, 3), architecture, width)
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    model.fit(train, epochs=epochs, validation_data=validation, verbose=0)
+    _, val_accuracy = model.evaluate(validation, verbose=0)
+    
+    saved_path = tmp / model.name
+    model.save(saved_path)
+    start = time.perf_counter()
+    keras.models.load_model(saved_path)
+    load_seconds = time.perf_counter() - start
+    
+    saved_model_mb = directory_size(saved_path) / 1e6
+    shutil.rmtree(saved_path, ignore_errors=True)
+    
+    rng = np.random.default_rng(0)
+    return {
+        "num_params": model.count_params(),
+        "saved_model_mb": saved_model_mb,
+        "load_seconds": load_seconds,
+        "latency_1_ms": latency_ms(model, rng.random((1, *img_size, 3), dtype=np.float32)),
+        "latency_32_ms": latency_ms(model, rng.random((32, *img_size, 3), dtype=np.float32)),
+        "val_accuracy": float(val_accuracy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data", help="Dossier data/<classe>/*.jpg")
+    parser.add_argument("--limit", type=int, default=200, help="Nombre d'images générées si data-dir est vide")
+    parser.add_argument("--epochs", type=int, default=3, help="Epochs d'entraînement par variante")
+    parser.add_argument("--img-size", type=int, default=224)
+    parser.add_argument("--variants", nargs="+", default=["baseline", "gap", "separable", "separable:0.5"],
+                        help="Variantes architecture[:width_multiplier]")
+    parser.add_argument("--experiment", default="architecture_benchmark", help="Expérience MLflow")
+    args = parser.parse_args()
+    
+    tmp_dir = tempfile.TemporaryDirectory()
+    tmp = Path(tmp_dir.name)
+    data_dir = Path(args.data_dir)
+    if not any(data_dir.glob("*/*.jpg")):
+        print(f"⚠️  Aucune image dans {args.data_dir}, génération de {args.limit} JPEG synthétiques")
+        data_dir = generate_dataset(tmp / "data", args.limit)
+    img_size = (args.img_size, args.img_size)
+    train, validation = load_datasets(data_dir, img_size, 0.2, batch_size=32, seed=42)
+    
+    if MLFLOW_AVAILABLE:
+        mlflow.set_experiment(args.experiment)
+        mlflow.start_run(run_name="architectures")
+    else:
+        print("⚠️  MLflow non disponible, résultats affichés uniquement")
+    
+    print(f"\n{'variante':<18} {'params':>10} {'SavedModel':>11} {'chargement':>11} {'1 image':>9} {'lot 32':>9} {'val_acc':>8}")
+    for variant in args.variants:
+        architecture, _, width = variant.partition(":")
+        width = float(width or 1.0)
+        result = benchmark_variant(architecture, width, img_size, train, validation, args.epochs, tmp)
+        print(f"{variant:<18} {result['num_params']:>10,} {result['saved_model_mb']:>9.1f}MB "
+              f"{result['load_seconds']:>10.2f}s {result['latency_1_ms']:>7.1f}ms "
+              f"{result['latency_32_ms']:>7.1f}ms {result['val_accuracy']:>8.3f}")
+        if MLFLOW_AVAILABLE:
+            with mlflow.start_run(run_name=variant, nested=True):
+                mlflow.log_params({"architecture": architecture, "width_multiplier": width,
+                                   "img_size": f"{img_size[0]}x{img_size[1]}", "epochs": args.epochs})
+                mlflow.log_metrics(result)
+    
+    if MLFLOW_AVAILABLE:
+        mlflow.end_run()
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
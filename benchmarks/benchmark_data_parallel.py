@@ -0,0 +1,79 @@
+"""
+Benchmark du passage à l'échelle de l'entraînement data-parallel
+(distributed_training.py) : débit global (images/sec) pour 1, 2, 4 et 8
+processus locaux.
+
+Chaque configuration garde la taille de lot par processus (le lot global et
+le learning rate croissent avec le nombre de processus) et répartit les
+cœurs disponibles entre les processus (threads = cœurs / processus, chaque
+processus épinglé sur ses cœurs). Le débit est celui de la dernière epoch
+(compilation et remplissage du cache exclus) ; l'efficacité est
+débit / (débit à 1 processus × nombre de processus).
+
+Usage:
+    python benchmarks/benchmark_data_parallel.py [--data-dir data] [--workers 1 2 4 8]
+        [--limit 512] [--epochs 2] [--batch-size 16] [--img-size 128]
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark_architectures import generate_dataset
+from distributed_training import available_cores, train_data_parallel
+from input_pipeline import load_datasets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data", help="Dossier data/<classe>/*.jpg")
+    parser.add_argument("--limit", type=int, default=512, help="Nombre d'images générées si data-dir est vide")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Nombres de processus mesurés")
+    parser.add_argument("--epochs", type=int, default=2, help="Epochs par configuration")
+    parser.add_argument("--batch-size", type=int, default=16, help="Taille de lot par processus")
+    parser.add_argument("--img-size", type=int, default=128)
+    parser.add_argument("--architecture", default="baseline")
+    args = parser.parse_args()
+    
+    data_dir = Path(args.data_dir)
+    if not data_dir.exists() or not any(data_dir.rglob("*.jpg")):
+        data_dir = Path(tempfile.mkdtemp(prefix="bench-data-")) / "data"
+        print(f"Génération de {args.limit} images synthétiques dans {data_dir}")
+        generate_dataset(data_dir, args.limit)
+    
+    img_size = (args.img_size, args.img_size)
+    train, validation = load_datasets(data_dir, img_size, 0.2, args.batch_size, seed=42)
+    cores = len(available_cores())
+    print(f"{train.samples} images d'entraînement, {validation.samples} de validation, {cores} cœurs\n")
+    
+    results = []
+    for workers in args.workers:
+        print(f"--- {workers} processus ---")
+        result = train_data_parallel({
+            "train_paths": train.paths, "train_labels": train.labels,
+            "val_paths": validation.paths, "val_labels": validation.labels,
+            "img_size": img_size, "per_worker_batch": args.batch_size, "epochs": args.epochs,
+            "architecture": args.architecture, "seed": 42,
+        }, workers)
+        results.append(result)
+    
+    print(f"\n{'Processus':>9} {'Threads':>7} {'Lot global':>10} {'LR':>8} {'Images/s':>9} "
+          f"{'Accélération':>12} {'Efficacité':>10} {'Attente':>8}")
+    reference = results[0]["images_per_sec"] / results[0]["num_workers"] if results[0]["images_per_sec"] else None
+    for result in results:
+        rate = result["images_per_sec"] or 0.0
+        speedup = rate / reference if reference else 0.0
+        efficiency = speedup / result["num_workers"]
+        print(f"{result['num_workers']:>9} {result['threads_per_worker']:>7} {result['global_batch_size']:>10} "
+              f"{result['learning_rate']:>8.4f} {rate:>9.1f} {speedup:>11.2f}x {efficiency:>9.0%} "
+              f"{result['data_wait_ratio'] or 0.0:>7.0%}")
+    if cores < max(args.workers):
+        print(f"\n⚠️  {cores} cœurs pour {max(args.workers)} processus : cœurs partagés, "
+              "accélération non représentative au-delà")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de l'extraction de features (images/sec) : ancien extracteur
+(décodage pleine résolution + 6 passes np.mean/np.std) contre l'extracteur
+actuel (décodage JPEG réduit + réduction vectorisée).
+
+Usage:
+    python benchmarks/benchmark_feature_extraction.py [--data-dir data] [--limit 200]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from feature_store import extract_image_features
+
+
+def legacy_extract_image_features(image_path: str) -> dict:
+    """Extracteur d'origine, conservé comme référence."""
+    image = Image.open(image_path)
+    features = {
+        "width": image.width,
+        "height": image.height,
+        "mode": image.mode,
+        "aspect_ratio": image.width / image.height if image.height > 0 else 0,
+    }
+    img_array = np.array(image.convert('RGB'))
+    features["mean_r"] = float(np.mean(img_array[:, :, 0]))
+    features["mean_g"] = float(np.mean(img_array[:, :, 1]))
+    features["mean_b"] = float(np.mean(img_array[:, :, 2]))
+    features["std_r"] = float(np.std(img_array[:, :, 0]))
+    features["std_g"] = float(np.std(img_array[:, :, 1]))
+    features["std_b"] = float(np.std(img_array[:, :, 2]))
+    return features
+
+
+def generate_images(output_dir: Path, count: int, size: tuple = (1024, 768)) -> list:
+    """Génère des JPEG synthétiques (bruit + dégradé) si aucune donnée n'est disponible."""
+    rng = np.random.default_rng(42)
+    paths = []
+    gradient = np.linspace(0, 255, size[0], dtype=np.float32)[None, :, None]
+    for i in range(count):
+        noise = rng.integers(0, 64, (size[1], size[0], 3), dtype=np.uint8)
+        array = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        path = output_dir / f"{i:08d}.jpg"
+        Image.fromarray(array).save(path, quality=90)
+        paths.append(str(path))
+    return paths
+
+
+def measure(name: str, fn, paths: list) -> float:
+    """Mesure le débit (images/sec) d'un extracteur."""
+    fn(paths[0])  # warm-up
+    start = time.perf_counter()
+    for path in paths:
+        fn(path)
+    elapsed = time.perf_counter() - start
+    rate = len(paths) / elapsed
+    print(f"{name:<45} {rate:>8.1f} images/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data", help="Dossier data/<classe>/*.jpg")
+    parser.add_argument("--limit", type=int, default=200, help="Nombre d'images mesurées")
+    args = parser.parse_args()
+
+    paths = sorted(str(p) for p in Path(args.data_dir).glob("*/*.jpg"))[:args.limit]
+    tmp_dir = None
+    if not paths:
+        tmp_dir = tempfile.TemporaryDirectory()
+        print(f"⚠️  Aucune image dans {args.data_dir}, génération de {args.limit} JPEG synthétiques")
+        paths = generate_images(Path(tmp_dir.name), args.limit)
+
+    print(f"Benchmark sur {len(paths)} images\n")
+    before = measure("avant (pleine résolution, 6 passes)", legacy_extract_image_features, paths)
+    full = measure("après, draft_size=None (pleine résolution)",
+                   lambda p: extract_image_features(p, draft_size=None), paths)
+    after = measure("après (décodage réduit)", extract_image_features, paths)
+    measure("après + color_hist, hsv, edge_density",
+            lambda p: extract_image_features(p, extra_features=["color_hist", "hsv", "edge_density"]), paths)
+
+    print(f"\nAccélération (pleine résolution): x{full / before:.2f}")
+    print(f"Accélération (décodage réduit):   x{after / before:.2f}")
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
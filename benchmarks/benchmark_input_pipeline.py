@@ -0,0 +1,110 @@
+"""
+Benchmark du pipeline d'entrée (lots/sec) : ImageDataGenerator.flow_from_directory
+(décodage Python mono-thread à chaque epoch) contre le cache memmap
+(image_cache) et le pipeline tf.data (décodage parallèle, cache(), prefetch).
+
+Seule la production des lots est mesurée (pas de pas d'entraînement), avec
+les augmentations de train.py, sur plusieurs epochs pour inclure l'effet
+des caches.
+
+Usage:
+    python benchmarks/benchmark_input_pipeline.py [--data-dir data] [--epochs 3] [--limit 400]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+from augmentation import AUGMENTATION
+from image_cache import build_image_cache, split_indices, CachedImageSequence
+from input_pipeline import load_datasets
+
+
+def generate_dataset(output_dir: Path, count: int, size: tuple = (500, 375)) -> Path:
+    """Génère un dossier data/<classe>/*.jpg synthétique si aucune donnée n'est disponible."""
+    rng = np.random.default_rng(42)
+    gradient = np.linspace(0, 255, size[0], dtype=np.float32)[None, :, None]
+    for i in range(count):
+        label = ["dandelion", "grass"][i % 2]
+        (output_dir / label).mkdir(parents=True, exist_ok=True)
+        noise = rng.integers(0, 64, (size[1], size[0], 3), dtype=np.uint8)
+        array = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        Image.fromarray(array).save(output_dir / label / f"{i:08d}.jpg", quality=90)
+    return output_dir
+
+
+def measure(name: str, batches, epochs: int) -> float:
+    """Mesure le débit (lots/sec) sur plusieurs epochs, première epoch comprise."""
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(epochs):
+        if isinstance(batches, tf.data.Dataset):
+            for _ in batches:
+                steps += 1
+        else:
+            for i in range(len(batches)):
+                batches[i]
+                steps += 1
+            batches.on_epoch_end()
+    elapsed = time.perf_counter() - start
+    rate = steps / elapsed
+    print(f"{name:<45} {rate:>8.2f} lots/sec ({steps} lots, {elapsed:.1f}s)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="data", help="Dossier data/<classe>/*.jpg")
+    parser.add_argument("--limit", type=int, default=400, help="Nombre d'images générées si data-dir est vide")
+    parser.add_argument("--epochs", type=int, default=3, help="Nombre d'epochs mesurées")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--img-size", type=int, default=224)
+    args = parser.parse_args()
+    
+    tmp_dir = tempfile.TemporaryDirectory()
+    data_dir = Path(args.data_dir)
+    if not any(data_dir.glob("*/*.jpg")):
+        print(f"⚠️  Aucune image dans {args.data_dir}, génération de {args.limit} JPEG synthétiques")
+        data_dir = generate_dataset(Path(tmp_dir.name) / "data", args.limit)
+    img_size = (args.img_size, args.img_size)
+    
+    print(f"Benchmark sur {data_dir} ({args.epochs} epochs, lots de {args.batch_size})\n")
+    datagen = ImageDataGenerator(rescale=1.0 / 255.0, validation_split=0.2, **AUGMENTATION)
+    generator = datagen.flow_from_directory(
+        data_dir, target_size=img_size, batch_size=args.batch_size,
+        class_mode="binary", subset="training", shuffle=True, seed=42
+    )
+    before = measure("avant (flow_from_directory)", generator, args.epochs)
+    
+    start = time.perf_counter()
+    cache = build_image_cache(data_dir, img_size, Path(tmp_dir.name) / "cache")
+    print(f"   construction du cache: {time.perf_counter() - start:.1f}s")
+    train_indices, _ = split_indices(cache, 0.2)
+    sequence = CachedImageSequence(
+        cache, train_indices, args.batch_size, shuffle=True,
+        augmentation=AUGMENTATION, seed=42
+    )
+    cached = measure("cache memmap + augmentation par lot", sequence, args.epochs)
+    
+    train_dataset, _ = load_datasets(
+        data_dir, img_size, 0.2, args.batch_size, augmentation=AUGMENTATION, seed=42
+    )
+    after = measure("tf.data (parallèle, cache, prefetch)", train_dataset, args.epochs)
+    
+    print(f"\nAccélération (cache memmap): x{cached / before:.2f}")
+    print(f"Accélération (tf.data):      x{after / before:.2f}")
+    tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark de l'index vectoriel : rappel@k contre latence, recherche exacte
+(produit matriciel) contre IVF-PQ pour plusieurs valeurs de nprobe/refine.
+
+Vecteurs : embeddings ou colonnes numériques d'un Feature Store existant,
+ou à défaut données synthétiques regroupées (mélange de gaussiennes).
+
+Usage:
+    python benchmarks/benchmark_vector_index.py [--n 100000] [--dim 128] [--queries 200]
+    python benchmarks/benchmark_vector_index.py --store-path feature_store [--embeddings]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from vector_index import ExactIndex, IVFPQIndex, load_index
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 100, seed: int = 42) -> np.ndarray:
+    """Vecteurs regroupés autour de `clusters` centres (plus réaliste qu'un bruit uniforme)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=3.0, size=(clusters, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, n)] + rng.normal(size=(n, dim)).astype(np.float32)
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    """Proportion des vrais k plus proches voisins retrouvés."""
+    return float(np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, truth)]))
+
+
+def timed_search(index, queries: np.ndarray, k: int, **kwargs) -> tuple:
+    """Recherche chronométrée, latence moyenne par requête en ms."""
+    start = time.perf_counter()
+    _, ids = index.search(queries, k, **kwargs)
+    return ids, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100000, help="Nombre de vecteurs synthétiques")
+    parser.add_argument("--dim", type=int, default=128, help="Dimension des vecteurs synthétiques")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes")
+    parser.add_argument("--k", type=int, default=10, help="Nombre de voisins")
+    parser.add_argument("--nlist", type=int, default=256, help="Listes inversées IVF")
+    parser.add_argument("--m", type=int, default=16, help="Sous-quantificateurs PQ")
+    parser.add_argument("--store-path", help="Feature Store à indexer (au lieu de données synthétiques)")
+    parser.add_argument("--embeddings", action="store_true", help="Indexer les embeddings du store")
+    args = parser.parse_args()
+    
+    if args.store_path:
+        from feature_store import FeatureStore
+        from vector_index import vectors_from_store
+        _, vectors = vectors_from_store(FeatureStore(args.store_path), embeddings=args.embeddings)
+    else:
+        vectors = synthetic_vectors(args.n, args.dim)
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    queries = queries + rng.normal(scale=0.1, size=queries.shape).astype(np.float32)
+    print(f"Benchmark sur {len(vectors)} vecteurs de dimension {vectors.shape[1]}, {len(queries)} requêtes\n")
+    
+    exact = ExactIndex().add(vectors)
+    truth, exact_latency = timed_search(exact, queries, args.k)
+    print(f"{'index':<32} {'rappel@' + str(args.k):>10} {'ms/requête':>12}")
+    print(f"{'exact':<32} {1.0:>10.3f} {exact_latency:>12.3f}")
+    
+    for refine in (0, 4):
+        start = time.perf_counter()
+        index = IVFPQIndex(nlist=args.nlist, m=args.m, refine=refine).add(vectors)
+        print(f"\nIVF-PQ refine={refine}: construction {time.perf_counter() - start:.1f}s")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index.save(tmp_dir)
+            index = load_index(tmp_dir, mmap=True)
+            for nprobe in (1, 4, 16, 64):
+                if nprobe > index.nlist:
+                    break
+                found, latency = timed_search(index, queries, args.k, nprobe=nprobe)
+                name = f"ivfpq nprobe={nprobe} refine={refine}"
+                print(f"{name:<32} {recall(found, truth):>10.3f} {latency:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Manifeste du dataset (Parquet) : une ligne par image avec chemin, label,
+hash du contenu, taille du fichier, dimensions et sous-ensemble (train /
+validation).
+
+Le sous-ensemble est tiré du hash du contenu : une image garde sa place
+quand d'autres images sont ajoutées ou supprimées, et deux copies d'une même
+image tombent du même côté. Les versions successives du modèle sont ainsi
+évaluées sur les mêmes images de validation.
+
+Le manifeste est mis à jour de façon incrémentale : seuls les fichiers
+nouveaux ou modifiés (taille, mtime) sont relus et hashés.
+"""
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from PIL import Image
+
+from image_cache import build_manifest
+
+
+MANIFEST_FILE = "manifest.parquet"
+MANIFEST_VERSION = 1
+MANIFEST_COLUMNS = [
+    "image_path", "label", "content_hash", "file_size", "file_mtime_ns", "width", "height", "split"
+]
+TRAIN, VALIDATION = "train", "validation"
+
+
+def manifest_path(data_dir: Path) -> Path:
+    """Emplacement par défaut du manifeste (à la racine du dossier des images)."""
+    return Path(data_dir) / MANIFEST_FILE
+
+
+def assign_split(content_hash: str, validation_split: float) -> str:
+    """
+    Sous-ensemble d'une image d'après son hash (MD5 hexadécimal).
+    
+    Les 32 premiers bits du hash, uniformes, sont comparés à la fraction de
+    validation : l'affectation ne dépend que du contenu de l'image.
+    """
+    return VALIDATION if int(content_hash[:8], 16) < validation_split * 0x100000000 else TRAIN
+
+
+def _describe(path: str) -> Dict:
+    """Lit une image une seule fois : hash du contenu et dimensions (en-tête seulement)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        width, height = Image.open(io.BytesIO(data)).size
+    except Exception:
+        width, height = -1, -1
+    return {"content_hash": hashlib.md5(data).hexdigest(), "width": width, "height": height}
+
+
+def load_manifest(path: Path) -> pd.DataFrame:
+    """
+    Charge un manifeste.
+    
+    Returns:
+        DataFrame (colonnes MANIFEST_COLUMNS), vide si le fichier n'existe pas ;
+        la fraction de validation est dans `frame.attrs["validation_split"]`
+    """
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame(columns=MANIFEST_COLUMNS)
+    table = pq.read_table(path)
+    frame = table.to_pandas()
+    metadata = table.schema.metadata or {}
+    if b"validation_split" in metadata:
+        frame.attrs["validation_split"] = float(metadata[b"validation_split"])
+    return frame
+
+
+def _write_manifest(frame: pd.DataFrame, path: Path, validation_split: float):
+    """Écrit le manifeste de façon atomique (fichier temporaire puis os.replace)."""
+    table = pa.Table.from_pandas(frame[MANIFEST_COLUMNS], preserve_index=False)
+    table = table.replace_schema_metadata({
+        "version": str(MANIFEST_VERSION),
+        "validation_split": repr(validation_split),
+    })
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def update_manifest(
+    data_dir: Path,
+    validation_split: float = 0.2,
+    path: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Met à jour le manifeste d'un dossier organisé par classe.
+    
+    Les fichiers inchangés (label, taille, mtime) reprennent leur hash sans
+    être relus ; les autres sont relus et hashés, les fichiers disparus retirés.
+    
+    Args:
+        data_dir: Dossier des images (un sous-dossier par classe)
+        validation_split: Fraction de validation (si elle change, toutes les
+            affectations sont recalculées)
+        path: Fichier du manifeste (défaut : <data_dir>/manifest.parquet)
+    
+    Returns:
+        Manifeste à jour (trié par classe puis par nom)
+    """
+    path = Path(path) if path is not None else manifest_path(data_dir)
+    previous = load_manifest(path)
+    reassign = not previous.empty and previous.attrs.get("validation_split") != validation_split
+    if reassign:
+        print(f"⚠️  validation_split modifié ({previous.attrs.get('validation_split')} -> {validation_split}), "
+              "sous-ensembles recalculés")
+    known = previous.set_index("image_path") if not previous.empty else previous
+    
+    rows = []
+    scanned = 0
+    for entry in build_manifest(data_dir):
+        image_path = entry["path"]
+        row = known.loc[image_path] if image_path in known.index else None
+        if (
+            row is not None
+            and row["label"] == entry["label"]
+            and row["file_size"] == entry["size"]
+            and row["file_mtime_ns"] == entry["mtime_ns"]
+        ):
+            description = {c: row[c] for c in ["content_hash", "width", "height"]}
+        else:
+            description = _describe(image_path)
+            scanned += 1
+        rows.append({
+            "image_path": image_path,
+            "label": entry["label"],
+            "file_size": entry["size"],
+            "file_mtime_ns": entry["mtime_ns"],
+            **description,
+            "split": assign_split(description["content_hash"], validation_split),
+        })
+    
+    frame = pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+    frame = frame.astype({"file_size": "int64", "file_mtime_ns": "int64", "width": "int64", "height": "int64"})
+    removed = len(set(previous["image_path"]) - set(frame["image_path"]))
+    if scanned or removed or reassign or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_manifest(frame, path, validation_split)
+    frame.attrs["validation_split"] = validation_split
+    
+    print(f"✅ Manifeste du dataset: {len(frame)} images ({scanned} hashées, {removed} retirées, "
+          f"{int((frame['split'] == VALIDATION).sum())} en validation) -> {path}")
+    return frame
+
+
+def manifest_splits(frame: pd.DataFrame) -> Dict[str, str]:
+    """Sous-ensemble de chaque image : {chemin: "train" | "validation"}."""
+    return dict(zip(frame["image_path"], frame["split"]))
+
+
+def manifest_digest(frame: pd.DataFrame) -> str:
+    """Empreinte du contenu du dataset et de sa répartition (comparaison entre runs)."""
+    digest = hashlib.sha256()
+    for content_hash, label, split in sorted(zip(frame["content_hash"], frame["label"], frame["split"])):
+        digest.update(f"{content_hash}/{label}/{split}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Mise à jour du manifeste du dataset")
+    parser.add_argument("--data-dir", default="data", help="Dossier data/<classe>/*.jpg")
+    parser.add_argument("--validation-split", type=float, default=0.2, help="Fraction de validation")
+    parser.add_argument("--output", default=None, help="Fichier du manifeste (défaut : <data-dir>/manifest.parquet)")
+    args = parser.parse_args()
+    
+    update_manifest(Path(args.data_dir), args.validation_split, args.output)
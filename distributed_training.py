@@ -0,0 +1,285 @@
+"""
+Entraînement data-parallel sur plusieurs processus locaux (CPU).
+
+Un seul processus `model.fit` n'exploite pas tous les cœurs d'un nœud :
+`train_data_parallel` lance `num_workers` processus reliés par
+`tf.distribute.MultiWorkerMirroredStrategy` sur localhost (TF_CONFIG,
+all-reduce des gradients à chaque pas) :
+- chaque processus est épinglé sur ses propres cœurs (`sched_setaffinity`)
+  avec autant de threads TensorFlow et tf.data que de cœurs,
+- chaque processus lit et décode uniquement sa part des images (partage des
+  chemins avant décodage, `distribute_datasets_from_function`),
+- la taille de lot par processus est fixe : le lot global et le learning
+  rate croissent avec le nombre de processus (règle linéaire, montée
+  progressive sur `warmup_epochs` epochs),
+- seul le chief (processus 0) logge dans MLflow et sauvegarde le modèle.
+
+Voir benchmarks/benchmark_data_parallel.py pour le passage à l'échelle
+(1/2/4/8 processus sur une machine).
+"""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import mlflow
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+
+BASE_LEARNING_RATE = 1e-3
+RESULT_FILE = "result.json"
+
+
+def free_ports(count: int) -> List[int]:
+    """Ports TCP libres sur localhost (un par processus)."""
+    sockets = []
+    try:
+        for _ in range(count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("localhost", 0))
+            sockets.append(s)
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def tf_config(ports: List[int], index: int) -> Dict:
+    """TF_CONFIG du processus `index` d'un cluster local."""
+    return {
+        "cluster": {"worker": [f"localhost:{port}" for port in ports]},
+        "task": {"type": "worker", "index": index},
+    }
+
+
+def available_cores() -> List[int]:
+    """Cœurs utilisables par le processus courant."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def assign_cores(num_workers: int, threads: int) -> List[List[int]]:
+    """
+    Cœurs de chaque processus : blocs contigus de `threads` cœurs.
+    
+    S'il y a moins de cœurs que `num_workers * threads`, les blocs se
+    chevauchent (cœurs partagés).
+    """
+    cores = available_cores()
+    return [
+        sorted({cores[(i * threads + j) % len(cores)] for j in range(threads)})
+        for i in range(num_workers)
+    ]
+
+
+def scaled_learning_rate(base_learning_rate: float, num_workers: int) -> float:
+    """Learning rate pour un lot global `num_workers` fois plus grand (règle linéaire)."""
+    return base_learning_rate * num_workers
+
+
+def warmup_learning_rate(epoch: int, base_learning_rate: float, num_workers: int, warmup_epochs: int) -> float:
+    """
+    Learning rate de l'epoch `epoch` : montée linéaire de la valeur de base
+    (epoch 0) à la valeur mise à l'échelle (epoch `warmup_epochs` et suivantes).
+    """
+    scaled = scaled_learning_rate(base_learning_rate, num_workers)
+    if warmup_epochs <= 0 or epoch >= warmup_epochs:
+        return scaled
+    return base_learning_rate + (scaled - base_learning_rate) * epoch / warmup_epochs
+
+
+def _pin_worker(threads: int, cores: Optional[List[int]]):
+    """Épingle le processus sur ses cœurs et limite ses threads (avant toute opération TensorFlow)."""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def train_worker(config: Dict, threads: int) -> Optional[Dict]:
+    """
+    Entraînement d'un processus du cluster (TF_CONFIG déjà défini).
+    
+    Args:
+        config: Voir train_data_parallel
+        threads: Threads TensorFlow et tf.data du processus
+    
+    Returns:
+        Résultat de l'entraînement pour le chief, None pour les autres processus
+    """
+    import tensorflow as tf
+    from tensorflow import keras
+    from input_pipeline import make_dataset
+    from model_architectures import build_model
+    from training_profiler import TrainingProfiler
+    
+    strategy = tf.distribute.MultiWorkerMirroredStrategy()
+    num_workers = strategy.num_replicas_in_sync
+    is_chief = strategy.cluster_resolver.task_id == 0
+    global_batch = config["per_worker_batch"] * num_workers
+    base_learning_rate = config.get("learning_rate", BASE_LEARNING_RATE)
+    learning_rate = scaled_learning_rate(base_learning_rate, num_workers)
+    img_size = tuple(config["img_size"])
+    
+    def distribute(paths, labels, training):
+        def dataset_fn(input_context):
+            # Part du processus, prise avant lecture et décodage
+            shard = slice(input_context.input_pipeline_id, None, input_context.num_input_pipelines)
+            dataset = make_dataset(
+                paths[shard], labels[shard], img_size,
+                input_context.get_per_replica_batch_size(global_batch),
+                training=training,
+                augmentation=config.get("augmentation") if training else None,
+                seed=config.get("seed", 0) + input_context.input_pipeline_id
+            )
+            options = tf.data.Options()
+            options.threading.private_threadpool_size = threads
+            options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+            # Flux continu : même nombre de pas par epoch sur tous les processus
+            return dataset.with_options(options).repeat()
+        return strategy.distribute_datasets_from_function(dataset_fn)
+    
+    train = distribute(config["train_paths"], config["train_labels"], True)
+    validation = distribute(config["val_paths"], config["val_labels"], False)
+    steps_per_epoch = max(1, len(config["train_paths"]) // global_batch)
+    validation_steps = max(1, len(config["val_paths"]) // global_batch)
+    
+    with strategy.scope():
+        keras.utils.set_random_seed(config.get("seed", 0))
+        model = build_model((*img_size, 3), config.get("architecture", "baseline"), config.get("width_multiplier", 1.0))
+        model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            loss='binary_crossentropy',
+            metrics=['accuracy']
+        )
+    
+    warmup_epochs = config.get("warmup_epochs", 1 if num_workers > 1 else 0)
+    profiler = TrainingProfiler(log_to_mlflow=is_chief and config.get("run_id") is not None)
+    callbacks = [
+        keras.callbacks.EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True),
+        keras.callbacks.LearningRateScheduler(
+            lambda epoch, lr: warmup_learning_rate(epoch, base_learning_rate, num_workers, warmup_epochs)
+        ),
+        profiler,
+    ]
+    
+    start = time.perf_counter()
+    if is_chief and MLFLOW_AVAILABLE and config.get("run_id"):
+        with mlflow.start_run(run_id=config["run_id"]):
+            history = model.fit(
+                train, epochs=config["epochs"], steps_per_epoch=steps_per_epoch,
+                validation_data=validation, validation_steps=validation_steps,
+                callbacks=callbacks, verbose=1
+            )
+    else:
+        history = model.fit(
+            train, epochs=config["epochs"], steps_per_epoch=steps_per_epoch,
+            validation_data=validation, validation_steps=validation_steps,
+            callbacks=callbacks, verbose=1 if is_chief else 0
+        )
+    seconds = time.perf_counter() - start
+    
+    # Tous les processus participent à la sauvegarde ; seule celle du chief est gardée
+    output_dir = Path(config["output_dir"])
+    model_path = output_dir / "model" if is_chief else Path(tempfile.mkdtemp(prefix="worker-model-"))
+    model.save(str(model_path))
+    if not is_chief:
+        shutil.rmtree(model_path, ignore_errors=True)
+        return None
+    
+    profiled = [e for e in profiler.epochs if "step_time_ms" in e]
+    return {
+        "num_workers": num_workers,
+        "threads_per_worker": threads,
+        "global_batch_size": global_batch,
+        "learning_rate": learning_rate,
+        "steps_per_epoch": steps_per_epoch,
+        "history": {k: [float(v) for v in values] for k, values in history.history.items() if k != "lr"},
+        "epoch": list(history.epoch),
+        "seconds": seconds,
+        "step_time_ms": profiled[-1]["step_time_ms"] if profiled else None,
+        # Débit global : un lot global par pas
+        "images_per_sec": 1000.0 * global_batch / profiled[-1]["step_time_ms"] if profiled else None,
+        "data_wait_ratio": profiled[-1]["data_wait_ratio"] if profiled else None,
+        "model_path": str(model_path),
+    }
+
+
+def _run_worker(index: int, ports: List[int], config: Dict, threads: int, cores: Optional[List[int]]):
+    """Point d'entrée d'un processus du cluster."""
+    _pin_worker(threads, cores)
+    os.environ["TF_CONFIG"] = json.dumps(tf_config(ports, index))
+    result = train_worker(config, threads)
+    if result is not None:
+        (Path(config["output_dir"]) / RESULT_FILE).write_text(json.dumps(result))
+
+
+def train_data_parallel(
+    config: Dict,
+    num_workers: int,
+    threads: Optional[int] = None,
+    pin: bool = True,
+    output_dir: Optional[str] = None
+) -> Dict:
+    """
+    Lance l'entraînement sur `num_workers` processus locaux et attend sa fin.
+    
+    Args:
+        config: {"train_paths", "train_labels", "val_paths", "val_labels",
+            "img_size", "per_worker_batch", "epochs"} et optionnellement
+            "learning_rate" (pour un processus), "warmup_epochs",
+            "architecture", "width_multiplier", "augmentation", "seed",
+            "run_id" (run MLflow où le chief logge le profil d'entraînement)
+        num_workers: Nombre de processus
+        threads: Threads par processus (défaut : cœurs disponibles / processus)
+        pin: Épingler chaque processus sur ses cœurs
+        output_dir: Dossier du modèle et du résultat (défaut : dossier temporaire)
+    
+    Returns:
+        Résultat du chief : historique, lot global, learning rate, débit
+        global (images/sec), "model_path" (SavedModel)...
+    """
+    output_dir = Path(output_dir or tempfile.mkdtemp(prefix="data-parallel-"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    config = {**config, "output_dir": str(output_dir)}
+    threads = threads or max(1, len(available_cores()) // num_workers)
+    cores = assign_cores(num_workers, threads) if pin else [None] * num_workers
+    ports = free_ports(num_workers)
+    
+    context = get_context("spawn")
+    processes = [
+        context.Process(target=_run_worker, args=(i, ports, config, threads, cores[i]), name=f"worker-{i}")
+        for i in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        while any(p.is_alive() for p in processes):
+            # Un processus en échec bloquerait les autres dans l'all-reduce
+            failed = [p for p in processes if p.exitcode not in (None, 0)]
+            if failed:
+                raise RuntimeError(f"{failed[0].name} terminé avec le code {failed[0].exitcode}")
+            time.sleep(0.5)
+        failed = [p for p in processes if p.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"{failed[0].name} terminé avec le code {failed[0].exitcode}")
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+    
+    return json.loads((output_dir / RESULT_FILE).read_text())
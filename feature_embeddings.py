@@ -0,0 +1,155 @@
+"""
+Embeddings CNN pour le Feature Store.
+
+Les images passent par le réseau de `create_model` (train.py) jusqu'à
+l'avant-dernière couche Dense(128). Les vecteurs float32 sont écrits par
+blocs dans le Feature Store (colonne Arrow de taille fixe, voir
+`FeatureStore.add_embeddings`), étiquetés avec la version du modèle.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from tensorflow import keras
+
+from feature_store import FeatureStore
+from image_cache import decode_image
+
+
+EMBEDDING_DIM = 128
+
+
+def build_embedding_model(model: keras.Model, units: int = EMBEDDING_DIM) -> keras.Model:
+    """
+    Tronque un modèle entraîné à sa dernière couche Dense de `units` unités.
+    
+    Args:
+        model: Modèle Keras (ex: `create_model`)
+        units: Taille de la couche d'embedding
+    
+    Returns:
+        Modèle Keras renvoyant les activations de cette couche
+    """
+    dense = [layer for layer in model.layers if isinstance(layer, keras.layers.Dense) and layer.units == units]
+    if not dense:
+        raise ValueError(f"Aucune couche Dense({units}) dans le modèle {model.name}")
+    return keras.Model(inputs=model.inputs, outputs=dense[-1].output)
+
+
+def _iter_image_batches(
+    paths: List[str],
+    img_size: tuple,
+    batch_size: int,
+    workers: int
+) -> Iterator[Tuple[List[int], np.ndarray]]:
+    """
+    Décode les images par lots (threads), le lot suivant étant décodé
+    pendant l'inférence du lot courant.
+    
+    Yields:
+        (positions des images lisibles dans `paths`, lot float32 normalisé [0, 1])
+    """
+    def decode(start: int):
+        images = list(pool.map(lambda p: decode_image(p, img_size), paths[start:start + batch_size]))
+        positions = [start + i for i, image in enumerate(images) if image is not None]
+        batch = np.stack([image for image in images if image is not None]) if positions else None
+        return positions, batch
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        starts = range(0, len(paths), batch_size)
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            pending = prefetch.submit(decode, starts[0]) if starts else None
+            for start in starts:
+                positions, batch = pending.result()
+                if start + batch_size < len(paths):
+                    pending = prefetch.submit(decode, start + batch_size)
+                if positions:
+                    yield positions, batch.astype(np.float32) * (1.0 / 255.0)
+
+
+def iter_embeddings(
+    model: keras.Model,
+    paths: List[str],
+    img_size: tuple = (224, 224),
+    batch_size: int = 32,
+    workers: int = 4
+) -> Iterator[Tuple[List[int], np.ndarray]]:
+    """
+    Calcule les embeddings par lots, en flux (rien n'est accumulé).
+    
+    Args:
+        model: Modèle d'embedding (voir `build_embedding_model`)
+        paths: Chemins des images
+        img_size: Taille d'entrée du modèle
+        batch_size: Taille des lots d'inférence
+        workers: Threads de décodage
+    
+    Yields:
+        (positions dans `paths`, embeddings float32 (n, dim))
+    """
+    for positions, batch in _iter_image_batches([str(p) for p in paths], img_size, batch_size, workers):
+        yield positions, model(batch, training=False).numpy().astype(np.float32, copy=False)
+
+
+def extract_embeddings(
+    model: keras.Model,
+    paths: List[str],
+    labels: List[str],
+    store: FeatureStore,
+    model_version: str,
+    img_size: tuple = (224, 224),
+    batch_size: int = 32,
+    chunk_size: int = 1024,
+    workers: int = 4
+) -> Dict:
+    """
+    Calcule les embeddings d'un ensemble d'images et les écrit dans le store.
+    
+    Les vecteurs sont copiés dans un tampon float32 préalloué de `chunk_size`
+    lignes, écrit dans le store dès qu'il est plein : la mémoire reste
+    bornée quel que soit le nombre d'images.
+    
+    Args:
+        model: Modèle entraîné (tronqué automatiquement à sa couche Dense(128))
+        paths: Chemins des images
+        labels: Label de chaque image
+        store: Feature Store de destination
+        model_version: Version du modèle (ex: run_id MLflow)
+        img_size: Taille d'entrée du modèle
+        batch_size: Taille des lots d'inférence
+        chunk_size: Nombre d'embeddings par écriture dans le store
+        workers: Threads de décodage
+    
+    Returns:
+        Résumé {"processed", "stored", "errors"}
+    """
+    paths = [str(p) for p in paths]
+    embedding_model = build_embedding_model(model)
+    dim = embedding_model.output_shape[-1]
+    buffer = np.empty((max(chunk_size, batch_size), dim), dtype=np.float32)
+    buffer_positions = []
+    stored = 0
+    
+    def flush():
+        nonlocal stored
+        if buffer_positions:
+            stored += store.add_embeddings(
+                [paths[i] for i in buffer_positions],
+                [labels[i] for i in buffer_positions],
+                buffer[:len(buffer_positions)],
+                model_version
+            )
+            buffer_positions.clear()
+    
+    for positions, embeddings in iter_embeddings(embedding_model, paths, img_size, batch_size, workers):
+        if len(buffer_positions) + len(positions) > len(buffer):
+            flush()
+        buffer[len(buffer_positions):len(buffer_positions) + len(positions)] = embeddings
+        buffer_positions.extend(positions)
+        if len(buffer_positions) >= chunk_size:
+            flush()
+    flush()
+    
+    summary = {"processed": len(paths), "stored": stored, "errors": len(paths) - stored}
+    print(f"✅ Embeddings {model_version}: {stored}/{len(paths)} images ({dim} dimensions)")
+    return summary
@@ -1,58 +1,673 @@
 """
 Feature Store simple pour stocker les features extraites des images.
-Utilise des fichiers Parquet pour le stockage.
+Utilise des fichiers Parquet (ou Arrow IPC mappés en mémoire) pour le stockage.
+
+Organisation du dossier de stockage :
+    dataset/label=<label>/ingest_date=<date>/part-*.parquet|.arrow
+                              Base compactée (dataset partitionné Hive)
+    segments/seg-*.parquet    Segments immuables ajoutés à chaque écriture
+    embeddings/model_version=<version>/part-*.parquet
+                              Embeddings CNN (vecteurs float32 de taille fixe)
+    tombstones.jsonl          Journal append-only des suppressions (par image_hash)
+    metadata.json             Métadonnées du store
+
+Chaque ligne porte un numéro de séquence (`_seq`). À la lecture, pour un même
+`image_hash` la version la plus récente gagne, et une suppression (tombstone)
+masque les versions plus anciennes. Les anciennes versions sont conservées
+dans la base, ce qui permet des lectures à une date donnée (`as_of`).
 """
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
+import io
 import json
+import os
+import shutil
 from datetime import datetime
 import hashlib
 
 
+SEQ_COLUMN = "_seq"
+DELETED_COLUMN = "_deleted"
+DATE_COLUMN = "ingest_date"
+INTERNAL_COLUMNS = [SEQ_COLUMN, DELETED_COLUMN, DATE_COLUMN]
+
+# Partitionnement Hive de la base : label puis date d'ingestion
+PARTITIONING = ds.partitioning(
+    pa.schema([("label", pa.string()), (DATE_COLUMN, pa.string())]),
+    flavor="hive"
+)
+
+# Formats de la base -> extension des fichiers. "arrow" : Arrow IPC (Feather v2)
+# non compressé, lu par mmap sans copie ; le cache de pages est partagé entre processus.
+BACKENDS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+EMBEDDING_COLUMN = "embedding"
+EMBEDDING_PARTITIONING = ds.partitioning(pa.schema([("model_version", pa.string())]), flavor="hive")
+
+
+def _image_hash(image_path: str) -> str:
+    """Identifiant unique d'une image (MD5 du chemin)."""
+    return hashlib.md5(image_path.encode()).hexdigest()
+
+
+def _now() -> str:
+    """Horodatage ISO (précision microseconde, comparable en tant que chaîne)."""
+    return datetime.now().isoformat(timespec="microseconds")
+
+
+def _as_timestamp(value: Union[str, datetime]) -> str:
+    """Normalise un horodatage (datetime ou chaîne ISO) en chaîne ISO."""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="microseconds")
+    return str(value)
+
+
+def _build_row(image_path: str, label: str, features: Dict, metadata: Optional[Dict] = None) -> Dict:
+    """Construit une ligne du store à partir des arguments de `add_features`."""
+    row = {
+        "image_hash": _image_hash(image_path),
+        "image_path": image_path,
+        "label": label,
+        "timestamp": _now(),
+        **features
+    }
+    if metadata:
+        row["metadata"] = json.dumps(metadata)
+    return row
+
+
+def _write_parquet_atomic(df: pd.DataFrame, path: Path):
+    """Écrit un fichier Parquet via un fichier temporaire puis un rename."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _resolve_latest(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Garde la version la plus récente de chaque image_hash.
+    
+    Args:
+        df: Versions concaténées (colonnes `image_hash`, `_seq`, `_deleted` optionnelle)
+    
+    Returns:
+        Une ligne par image_hash encore présent, triée par séquence
+    """
+    if df.empty:
+        return df
+    df = df.sort_values(SEQ_COLUMN, kind="stable").drop_duplicates(subset="image_hash", keep="last")
+    if DELETED_COLUMN in df.columns:
+        df = df[~df[DELETED_COLUMN].eq(True)]
+    return df.reset_index(drop=True)
+
+
+def _unify_schemas(schemas: List[pa.Schema]) -> pa.Schema:
+    """Unifie les schémas des fichiers (colonnes ajoutées au fil du temps, int -> float)."""
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except TypeError:
+        return pa.unify_schemas(schemas)
+
+
+def _empty_statistics() -> Dict:
+    """Agrégats d'un store vide."""
+    return {"labels": {}, "moments": {}, "last_timestamp": None}
+
+
+def _frame_statistics(frame: pd.DataFrame) -> Dict:
+    """
+    Agrégats d'un lot de lignes : nombre de lignes par label et, par label,
+    moments (n, moyenne, M2) de chaque feature numérique.
+    
+    Args:
+        frame: Lignes du store (une par image)
+    
+    Returns:
+        Agrégats au format de `merge_statistics`
+    """
+    statistics = _empty_statistics()
+    if frame.empty or "label" not in frame.columns:
+        return statistics
+    
+    excluded = set(INTERNAL_COLUMNS) | set(FINGERPRINT_COLUMNS)
+    columns = [
+        c for c in frame.columns
+        if c not in excluded and pd.api.types.is_numeric_dtype(frame[c]) and not pd.api.types.is_bool_dtype(frame[c])
+    ]
+    labels = frame["label"].astype(str)
+    statistics["labels"] = {label: int(n) for label, n in labels.value_counts().items()}
+    if "timestamp" in frame.columns:
+        statistics["last_timestamp"] = str(frame["timestamp"].astype(str).max())
+    if columns:
+        grouped = frame[columns].astype(float).groupby(labels, sort=False)
+        counts, means, variances = grouped.count(), grouped.mean(), grouped.var(ddof=0)
+        for label in counts.index:
+            statistics["moments"][label] = {
+                c: [int(counts.at[label, c]), float(means.at[label, c]),
+                    float(variances.at[label, c] * counts.at[label, c])]
+                for c in columns if counts.at[label, c] > 0
+            }
+    return statistics
+
+
+def _combine_moments(left: List, right: List, sign: int = 1) -> List:
+    """
+    Combine deux moments (n, moyenne, M2) (Chan et al.) ; avec `sign=-1`,
+    retire `right` de `left` (mise à jour / suppression d'une ligne).
+    """
+    n_left, mean_left, m2_left = left
+    n_right, mean_right, m2_right = right
+    n = n_left + sign * n_right
+    if n <= 0:
+        return [0, 0.0, 0.0]
+    if sign > 0:
+        delta = mean_right - mean_left
+        mean = mean_left + delta * n_right / n
+        m2 = m2_left + m2_right + delta ** 2 * n_left * n_right / n
+    else:
+        mean = (n_left * mean_left - n_right * mean_right) / n
+        delta = mean_right - mean
+        m2 = m2_left - m2_right - delta ** 2 * n * n_right / n_left
+    return [n, mean, max(m2, 0.0)]
+
+
+def _merge_statistics(left: Dict, right: Dict, sign: int = 1) -> Dict:
+    """Fusionne deux agrégats ; avec `sign=-1`, retire `right` de `left`."""
+    merged = {
+        "labels": dict(left["labels"]),
+        "moments": {label: dict(features) for label, features in left["moments"].items()},
+        "last_timestamp": left.get("last_timestamp"),
+    }
+    for label, n in right["labels"].items():
+        merged["labels"][label] = merged["labels"].get(label, 0) + sign * n
+        if merged["labels"][label] <= 0:
+            del merged["labels"][label]
+    for label, features in right["moments"].items():
+        target = merged["moments"].setdefault(label, {})
+        for feature, moments in features.items():
+            combined = _combine_moments(target.get(feature, [0, 0.0, 0.0]), moments, sign)
+            if combined[0] > 0:
+                target[feature] = combined
+            else:
+                target.pop(feature, None)
+        if not target:
+            del merged["moments"][label]
+    if sign > 0 and right.get("last_timestamp"):
+        merged["last_timestamp"] = max(filter(None, [merged["last_timestamp"], right["last_timestamp"]]))
+    return merged
+
+
+def merge_statistics(*statistics: Dict) -> Dict:
+    """
+    Fusionne les agrégats de plusieurs segments, shards ou stores
+    (voir `FeatureStore.get_statistics(raw=True)`).
+    
+    Args:
+        *statistics: Agrégats {"labels", "moments", "last_timestamp"}
+    
+    Returns:
+        Agrégats fusionnés
+    """
+    merged = _empty_statistics()
+    for item in statistics:
+        merged = _merge_statistics(merged, item)
+    return merged
+
+
+def _summarize_moments(moments: Dict[str, List]) -> Dict[str, Dict]:
+    """(n, moyenne, M2) -> {count, mean, std} par feature."""
+    return {
+        feature: {"count": n, "mean": mean, "std": float(np.sqrt(m2 / n)) if n else 0.0}
+        for feature, (n, mean, m2) in moments.items()
+    }
+
+
 class FeatureStore:
-    """Feature Store simple utilisant Parquet pour le stockage."""
+    """Feature Store simple utilisant Parquet (ou Arrow IPC) pour le stockage."""
     
-    def __init__(self, store_path: str = "feature_store"):
+    def __init__(
+        self,
+        store_path: str = "feature_store",
+        compaction_fanout: int = 8,
+        compaction_rows: Optional[int] = 100_000,
+        row_group_size: int = 64 * 1024,
+        backend: Optional[str] = None
+    ):
         """
         Initialise le Feature Store.
         
+        La base n'est pas chargée en mémoire : elle est lue à la demande,
+        avec filtres et projections poussés jusqu'au scan Parquet.
+        
         Args:
             store_path: Chemin du dossier de stockage
+            compaction_fanout: Nombre de segments d'un même niveau fusionnés
+                automatiquement en un segment du niveau supérieur
+            compaction_rows: Nombre de lignes non compactées (gardées en mémoire)
+                au-delà duquel `compact` est appelé à l'écriture (None : jamais)
+            row_group_size: Nombre maximal de lignes par row group dans la base
+            backend: Format de la base, "parquet" ou "arrow" (Arrow IPC mappé
+                en mémoire). Par défaut, celui du store existant (voir `migrate_backend`)
         """
         self.store_path = Path(store_path)
         self.store_path.mkdir(parents=True, exist_ok=True)
         self.features_file = self.store_path / "features.parquet"
+        self.dataset_dir = self.store_path / "dataset"
         self.metadata_file = self.store_path / "metadata.json"
+        self.segments_dir = self.store_path / "segments"
+        self.segments_dir.mkdir(exist_ok=True)
+        self.tombstones_file = self.store_path / "tombstones.jsonl"
+        self.embeddings_dir = self.store_path / "embeddings"
+        self.compaction_fanout = max(2, compaction_fanout)
+        self.compaction_rows = compaction_rows
+        self.row_group_size = row_group_size
+        self.backend = self._resolve_backend(backend)
         self._load_store()
     
-    def _load_store(self):
-        """Charge le store depuis le fichier Parquet."""
-        if self.features_file.exists():
+    @property
+    def df(self) -> pd.DataFrame:
+        """Vue fusionnée (base + segments - tombstones) du store, chargée à la demande."""
+        if self._df is None:
+            self._df = self._query()
+        return self._df
+    
+    def _resolve_backend(self, backend: Optional[str]) -> str:
+        """Format de la base : celui demandé doit correspondre à celui du store existant."""
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu: {backend} (attendu: {', '.join(BACKENDS)})")
+        stored = None
+        if self.metadata_file.exists():
             try:
-                self.df = pd.read_parquet(self.features_file)
-                print(f"✅ Feature Store chargé: {len(self.df)} features")
-            except Exception as e:
-                print(f"⚠️  Erreur chargement store: {str(e)}")
-                self.df = pd.DataFrame()
-        else:
-            self.df = pd.DataFrame()
+                with open(self.metadata_file) as f:
+                    stored = json.load(f).get("backend")
+            except ValueError:
+                pass
+        if self.dataset_dir.exists():
+            stored = stored or "parquet"
+        elif backend:
+            # Sans base écrite, le format peut encore être choisi librement
+            return backend
+        if backend and backend != stored:
+            raise ValueError(
+                f"Le store {self.store_path} est au format {stored}: "
+                f"migrer d'abord avec FeatureStore('{self.store_path}').migrate_backend('{backend}')"
+            )
+        return backend or stored or "parquet"
     
-    def _save_store(self):
-        """Sauvegarde le store dans le fichier Parquet."""
+    def _reset_state(self):
+        """Réinitialise l'état en mémoire."""
+        self._metadata = {}
+        self._segments = []
+        self._segment_frames = []
+        self._tombstone_rows = []
+        self._columns = []
+        self._dataset = None
+        self._keys = None
+        self._df = None
+        self._indexed_df = None
+        self._next_seq = 1
+    
+    def _load_store(self):
+        """Charge les métadonnées, les segments et les tombstones (pas la base)."""
+        self._reset_state()
+        
         try:
-            self.df.to_parquet(self.features_file, index=False)
-            # Sauvegarder métadonnées
-            metadata = {
-                "last_updated": datetime.now().isoformat(),
-                "total_features": len(self.df),
-                "features_columns": list(self.df.columns) if not self.df.empty else []
+            if self.metadata_file.exists():
+                with open(self.metadata_file) as f:
+                    self._metadata = json.load(f)
+                self._next_seq = self._metadata.get("next_seq", 1)
+                self._columns = [
+                    c for c in self._metadata.get("features_columns", []) if c not in INTERNAL_COLUMNS
+                ]
+            
+            if self.features_file.exists():
+                self._migrate_legacy_file()
+            
+            for path in sorted(self.segments_dir.glob("seg-*.parquet")):
+                level, first_seq, last_seq = self._parse_segment_name(path)
+                self._segments.append((level, first_seq, last_seq, path))
+                segment = pd.read_parquet(path)
+                self._segment_frames.append(segment)
+                self._track_columns(segment)
+                self._next_seq = max(self._next_seq, last_seq + 1)
+            
+            if self.tombstones_file.exists():
+                with open(self.tombstones_file) as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._tombstone_rows.append({
+                                "image_hash": entry["image_hash"],
+                                "label": entry.get("label"),
+                                "timestamp": entry.get("timestamp", ""),
+                                SEQ_COLUMN: entry["seq"],
+                                DELETED_COLUMN: True,
+                            })
+                            self._next_seq = max(self._next_seq, entry["seq"] + 1)
+            
+            if self._metadata.get("total_features") or self._segments:
+                print(f"✅ Feature Store chargé: {self._metadata.get('total_features', 0)} features (base)"
+                      f", {len(self._segments)} segments")
+        except Exception as e:
+            print(f"⚠️  Erreur chargement store: {str(e)}")
+            self._reset_state()
+    
+    def _migrate_legacy_file(self):
+        """Migre l'ancien `features.parquet` (fichier unique) vers le dataset partitionné."""
+        legacy = pd.read_parquet(self.features_file)
+        if not legacy.empty:
+            if SEQ_COLUMN not in legacy.columns:
+                legacy[SEQ_COLUMN] = 0
+            self._write_base(legacy)
+            self._metadata["total_features"] = int(legacy["image_hash"].nunique())
+            self._track_columns(legacy)
+        self.features_file.unlink()
+        self._save_metadata()
+        print(f"✅ features.parquet migré vers {self.dataset_dir} ({len(legacy)} lignes)")
+    
+    @staticmethod
+    def _parse_segment_name(path: Path) -> tuple:
+        """Extrait (niveau, première séquence, dernière séquence) du nom d'un segment."""
+        _, level, first_seq, last_seq = path.stem.split("-")
+        return int(level[1:]), int(first_seq), int(last_seq)
+    
+    def _segment_path(self, level: int, first_seq: int, last_seq: int) -> Path:
+        """Chemin d'un segment immuable."""
+        return self.segments_dir / f"seg-L{level}-{first_seq:012d}-{last_seq:012d}.parquet"
+    
+    def _save_metadata(self):
+        """Sauvegarde les métadonnées (taille constante, réécrites à chaque commit)."""
+        self._metadata.update({
+            "last_updated": _now(),
+            "total_features": len(self._keys) if self._keys is not None
+            else self._metadata.get("total_features", 0),
+            "features_columns": list(self._columns),
+            "segments": len(self._segments),
+            "tombstones": len(self._tombstone_rows),
+            "next_seq": self._next_seq,
+            "backend": self.backend,
+        })
+        with open(self.metadata_file, 'w') as f:
+            json.dump(self._metadata, f, indent=2)
+    
+    def _track_columns(self, frame: pd.DataFrame):
+        """Met à jour la liste des colonnes visibles sans recalculer la vue fusionnée."""
+        for column in frame.columns:
+            if column not in INTERNAL_COLUMNS and column not in self._columns:
+                self._columns.append(column)
+    
+    def _file_format(self) -> ds.FileFormat:
+        """Format des fichiers de la base."""
+        return ds.IpcFileFormat() if self.backend == "arrow" else ds.ParquetFileFormat()
+    
+    def _open_dataset(self) -> Optional[ds.Dataset]:
+        """Ouvre la base (schéma unifié à partir des footers, sans lire les données)."""
+        if self._dataset is None and self.dataset_dir.exists():
+            options = {
+                "format": self._file_format(),
+                "partitioning": PARTITIONING,
+                # Fichiers IPC mappés en mémoire : les colonnes lues pointent dans le mmap
+                "filesystem": pafs.LocalFileSystem(use_mmap=self.backend == "arrow"),
             }
-            with open(self.metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            dataset = ds.dataset(str(self.dataset_dir), **options)
+            schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+            if schemas:
+                schema = _unify_schemas(schemas + [PARTITIONING.schema])
+                self._dataset = ds.dataset(str(self.dataset_dir), schema=schema, **options)
+        return self._dataset
+    
+    def _scan_table(self, columns: Optional[List[str]] = None, filter=None) -> Optional[pa.Table]:
+        """Lit la base avec projection et filtre poussés au scan (row groups/partitions)."""
+        dataset = self._open_dataset()
+        if dataset is None:
+            return None
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+        return dataset.to_table(columns=columns, filter=filter)
+    
+    def _scan(self, columns: Optional[List[str]] = None, filter=None) -> pd.DataFrame:
+        """Comme `_scan_table`, converti en DataFrame."""
+        table = self._scan_table(columns, filter)
+        return pd.DataFrame() if table is None else table.to_pandas()
+    
+    def _write_base(self, rows: pd.DataFrame):
+        """Ajoute des lignes (toutes versions) à la base partitionnée."""
+        rows = rows.copy()
+        rows[DATE_COLUMN] = rows["timestamp"].astype(str).str[:10]
+        deleted = rows[DELETED_COLUMN] if DELETED_COLUMN in rows.columns else pd.Series(False, index=rows.index)
+        rows[DELETED_COLUMN] = deleted.eq(True)
+        # Tri par hash : les statistiques min/max des row groups servent aux recherches ponctuelles
+        rows = rows.sort_values("image_hash", kind="stable")
+        first_seq, last_seq = int(rows[SEQ_COLUMN].min()), int(rows[SEQ_COLUMN].max())
+        file_format = self._file_format()
+        # IPC non compressé : condition de la lecture sans copie
+        file_options = file_format.make_write_options(compression=None) if self.backend == "arrow" else None
+        ds.write_dataset(
+            pa.Table.from_pandas(rows, preserve_index=False),
+            self.dataset_dir,
+            format=file_format,
+            file_options=file_options,
+            partitioning=PARTITIONING,
+            basename_template=f"part-{first_seq:012d}-{last_seq:012d}-{{i}}{BACKENDS[self.backend]}",
+            existing_data_behavior="overwrite_or_ignore",
+            max_rows_per_group=self.row_group_size,
+            min_rows_per_group=min(self.row_group_size, 1024),
+        )
+        self._dataset = None
+    
+    @staticmethod
+    def _build_filter(label: Optional[str] = None, since=None, as_of=None):
+        """Construit le prédicat poussé au scan (partitions + statistiques)."""
+        conditions = []
+        if label:
+            conditions.append(ds.field("label") == label)
+        if since:
+            since = _as_timestamp(since)
+            conditions.append(ds.field(DATE_COLUMN) >= since[:10])
+            conditions.append(ds.field("timestamp") >= since)
+        if as_of:
+            as_of = _as_timestamp(as_of)
+            conditions.append(ds.field(DATE_COLUMN) <= as_of[:10])
+            conditions.append(ds.field("timestamp") <= as_of)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+    
+    def _segment_rows(self, as_of=None, image_hashes=None) -> pd.DataFrame:
+        """Versions non compactées (segments + tombstones), restreintes à `image_hashes` si donné."""
+        if image_hashes is None and len(self._segment_frames) > 1:
+            self._segment_frames = [pd.concat(self._segment_frames, ignore_index=True)]
+        frames = list(self._segment_frames)
+        if self._tombstone_rows:
+            frames.append(pd.DataFrame(self._tombstone_rows))
+        if image_hashes is not None:
+            # Filtre segment par segment : seules les lignes demandées sont concaténées
+            wanted = list(image_hashes)
+            frames = [f for f in (f[f["image_hash"].isin(wanted)] for f in frames) if not f.empty]
+        if not frames:
+            return pd.DataFrame()
+        rows = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if as_of:
+            rows = rows[rows["timestamp"].astype(str) <= _as_timestamp(as_of)]
+        return rows
+    
+    def _live_keys(self) -> Dict[str, str]:
+        """image_hash -> label des entrées vivantes (scan de 4 colonnes, fait une seule fois)."""
+        if self._keys is None:
+            key_columns = ["image_hash", "label", SEQ_COLUMN, DELETED_COLUMN]
+            base = self._scan(key_columns)
+            segments = self._segment_rows()
+            if not segments.empty:
+                segments = segments[[c for c in key_columns if c in segments.columns]]
+            versions = pd.concat([f for f in (base, segments) if not f.empty], ignore_index=True) \
+                if not (base.empty and segments.empty) else pd.DataFrame()
+            live = _resolve_latest(versions)
+            self._keys = dict(zip(live["image_hash"], live["label"])) if not live.empty else {}
+        return self._keys
+    
+    def _statistics(self) -> Dict:
+        """Agrégats persistés dans les métadonnées (recalculés une fois pour un ancien store)."""
+        if "statistics" not in self._metadata:
+            empty = not self.dataset_dir.exists() and not self._segments and not self._tombstone_rows
+            self._metadata["statistics"] = _empty_statistics() if empty else _frame_statistics(self.df)
+        return self._metadata["statistics"]
+    
+    def _append_rows(self, rows: pd.DataFrame):
+        """
+        Ajoute des lignes sous forme d'un nouveau segment immuable.
+        
+        Le coût d'écriture ne dépend que du nombre de lignes ajoutées,
+        pas de la taille totale du store.
+        """
+        keys = self._live_keys()
+        statistics = self._statistics()
+        # Versions remplacées : retirées des agrégats (lecture limitée à ces images)
+        latest = rows.drop_duplicates(subset="image_hash", keep="last")
+        replaced = [h for h in latest["image_hash"] if h in keys]
+        if replaced:
+            statistics = _merge_statistics(statistics, _frame_statistics(self._query(replaced)), sign=-1)
+        self._metadata["statistics"] = _merge_statistics(statistics, _frame_statistics(latest))
+        
+        rows = rows.copy()
+        first_seq = self._next_seq
+        rows[SEQ_COLUMN] = np.arange(first_seq, first_seq + len(rows), dtype=np.int64)
+        last_seq = first_seq + len(rows) - 1
+        self._next_seq = last_seq + 1
+        
+        path = self._segment_path(0, first_seq, last_seq)
+        _write_parquet_atomic(rows, path)
+        self._segments.append((0, first_seq, last_seq, path))
+        
+        self._segment_frames.append(rows)
+        self._track_columns(rows)
+        self._df = None
+        keys.update(zip(rows["image_hash"], rows["label"]))
+        
+        self._maybe_merge_segments()
+        self._save_metadata()
+        if self.compaction_rows and self._uncompacted_rows() >= self.compaction_rows:
+            self.compact()
+    
+    def _uncompacted_rows(self) -> int:
+        """Nombre de lignes des segments et tombstones (en attente de compaction)."""
+        return sum(len(f) for f in self._segment_frames) + len(self._tombstone_rows)
+    
+    def _maybe_merge_segments(self):
+        """
+        Compaction par niveaux : dès que `compaction_fanout` segments d'un même
+        niveau existent, ils sont concaténés en un seul segment du niveau suivant
+        (toutes les versions sont conservées pour les lectures `as_of`).
+        Chaque ligne est donc réécrite O(log N) fois au total.
+        """
+        level = 0
+        while True:
+            same_level = [s for s in self._segments if s[0] == level]
+            if len(same_level) < self.compaction_fanout:
+                return
+            merged = pd.concat([pd.read_parquet(s[3]) for s in same_level], ignore_index=True)
+            merged = merged.sort_values(SEQ_COLUMN, kind="stable")
+            first_seq = min(s[1] for s in same_level)
+            last_seq = max(s[2] for s in same_level)
+            path = self._segment_path(level + 1, first_seq, last_seq)
+            _write_parquet_atomic(merged, path)
+            for segment in same_level:
+                segment[3].unlink(missing_ok=True)
+            self._segments = [s for s in self._segments if s[0] != level]
+            self._segments.append((level + 1, first_seq, last_seq, path))
+            self._segments.sort(key=lambda s: s[1])
+            level += 1
+    
+    def compact(self):
+        """
+        Compaction : déplace segments et tombstones dans la base partitionnée
+        (nouveaux fichiers uniquement, les fichiers existants ne sont pas réécrits).
+        L'historique des versions est conservé ; voir `vacuum`.
+        """
+        try:
+            rows = self._segment_rows()
+            if rows.empty:
+                return
+            
+            # La base contient-elle désormais plusieurs versions d'une même image ?
+            history = (
+                self._metadata.get("history", False)
+                or bool(self._tombstone_rows)
+                or rows["image_hash"].duplicated().any()
+                or rows["image_hash"].isin(self._scan(["image_hash"]).get("image_hash", [])).any()
+            )
+            self._write_base(rows)
+            
+            for segment in self._segments:
+                segment[3].unlink(missing_ok=True)
+            self.tombstones_file.unlink(missing_ok=True)
+            self._segments = []
+            self._segment_frames = []
+            self._tombstone_rows = []
+            self._df = None
+            self._metadata["history"] = bool(history)
+            self._live_keys()
+            self._save_metadata()
+            print(f"✅ Feature Store compacté: {len(rows)} lignes ajoutées à la base")
         except Exception as e:
-            print(f"❌ Erreur sauvegarde store: {str(e)}")
+            print(f"❌ Erreur compaction store: {str(e)}")
+    
+    def vacuum(self):
+        """
+        Réécrit la base en ne gardant que la dernière version de chaque image
+        (supprime l'historique : les lectures `as_of` antérieures deviennent approximatives).
+        """
+        self.compact()
+        live = _resolve_latest(self._scan())
+        self._rewrite_base(live)
+        self._metadata["history"] = False
+        self._save_metadata()
+        print(f"✅ Feature Store nettoyé: {len(live)} features")
+    
+    def migrate_backend(self, backend: str):
+        """
+        Réécrit la base dans un autre format (ex: Parquet -> Arrow IPC),
+        toutes versions conservées. Les segments restent en Parquet.
+        
+        Args:
+            backend: Format cible ("parquet" ou "arrow")
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu: {backend} (attendu: {', '.join(BACKENDS)})")
+        if backend == self.backend:
+            print(f"✅ Feature Store déjà au format {backend}")
+            return
+        rows = self._scan()
+        source, self.backend = self.backend, backend
+        try:
+            self._rewrite_base(rows)
+        except Exception:
+            self.backend = source
+            self._dataset = None
+            raise
+        self._save_metadata()
+        print(f"✅ Feature Store migré de {source} vers {backend} ({len(rows)} lignes)")
+    
+    def _rewrite_base(self, rows: pd.DataFrame):
+        """Remplace la base par `rows` (écriture dans un dossier temporaire puis échange)."""
+        tmp_dir = self.store_path / "dataset.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.dataset_dir, final_dir = tmp_dir, self.dataset_dir
+        try:
+            if not rows.empty:
+                self._write_base(rows.drop(columns=[DATE_COLUMN], errors="ignore"))
+        finally:
+            self.dataset_dir = final_dir
+        shutil.rmtree(final_dir, ignore_errors=True)
+        if tmp_dir.exists():
+            os.replace(tmp_dir, final_dir)
+        self._dataset = None
+        self._df = None
     
     def add_features(
         self,
@@ -74,30 +689,8 @@ class FeatureStore:
             True si succès
         """
         try:
-            # Créer un hash de l'image pour ID unique
-            image_hash = hashlib.md5(image_path.encode()).hexdigest()
-            
-            # Préparer les données
-            feature_data = {
-                "image_hash": image_hash,
-                "image_path": image_path,
-                "label": label,
-                "timestamp": datetime.now().isoformat(),
-                **features
-            }
-            
-            if metadata:
-                feature_data["metadata"] = json.dumps(metadata)
-            
-            # Ajouter au DataFrame
-            new_row = pd.DataFrame([feature_data])
-            
-            # Supprimer l'ancienne entrée si elle existe (même hash)
-            if not self.df.empty:
-                self.df = self.df[self.df["image_hash"] != image_hash]
-            
-            self.df = pd.concat([self.df, new_row], ignore_index=True)
-            self._save_store()
+            # Nouveau segment : l'ancienne entrée (même hash) est masquée à la lecture
+            self._append_rows(pd.DataFrame([_build_row(image_path, label, features, metadata)]))
             
             print(f"✅ Features ajoutées: {image_path}")
             return True
@@ -106,93 +699,1007 @@ class FeatureStore:
             print(f"❌ Erreur ajout features: {str(e)}")
             return False
     
-    def get_features(self, image_path: Optional[str] = None, label: Optional[str] = None) -> pd.DataFrame:
+    def add_features_batch(self, rows) -> int:
+        """
+        Ajoute un lot de features en un seul commit (un seul segment écrit).
+        
+        Args:
+            rows: DataFrame (colonnes image_path, label + une colonne par feature ;
+                un éventuel timestamp est remplacé par l'horodatage d'ingestion)
+                ou itérable de dicts {"image_path", "label", "features", "metadata"}
+        
+        Returns:
+            Nombre de lignes écrites (après dédoublonnage par image_hash)
+        """
+        try:
+            if isinstance(rows, pd.DataFrame):
+                batch = rows.copy()
+                batch["image_hash"] = [_image_hash(str(path)) for path in batch["image_path"]]
+                # Curseur de `get_changes` : toujours l'horodatage d'ingestion
+                batch["timestamp"] = _now()
+                leading = ["image_hash", "image_path", "label", "timestamp"]
+                batch = batch[leading + [c for c in batch.columns if c not in leading]]
+            else:
+                batch = pd.DataFrame([
+                    _build_row(row["image_path"], row["label"], row.get("features", {}), row.get("metadata"))
+                    for row in rows
+                ])
+            
+            if batch.empty:
+                return 0
+            
+            # Dédoublonnage vectorisé : la dernière occurrence d'un hash gagne
+            batch = batch.drop_duplicates(subset="image_hash", keep="last")
+            self._append_rows(batch)
+            
+            print(f"✅ {len(batch)} features ajoutées en un seul commit")
+            return len(batch)
+        
+        except Exception as e:
+            print(f"❌ Erreur ajout batch features: {str(e)}")
+            return 0
+    
+    def writer(self) -> "FeatureStoreWriter":
+        """
+        Ouvre une session d'écriture : les ajouts sont bufferisés et
+        persistés une seule fois à la sortie du bloc `with`.
+        
+        Returns:
+            Session d'écriture (context manager)
+        """
+        return FeatureStoreWriter(self)
+    
+    def delete_features(self, image_path: str) -> bool:
+        """
+        Supprime les features d'une image (tombstone dans le journal).
+        
+        Args:
+            image_path: Chemin de l'image
+        
+        Returns:
+            True si une entrée a été supprimée
+        """
+        keys = self._live_keys()
+        image_hash = _image_hash(image_path)
+        if image_hash not in keys:
+            return False
+        
+        self._metadata["statistics"] = _merge_statistics(
+            self._statistics(), _frame_statistics(self._query([image_hash])), sign=-1
+        )
+        entry = {"image_hash": image_hash, "seq": self._next_seq, "label": keys[image_hash], "timestamp": _now()}
+        self._next_seq += 1
+        with open(self.tombstones_file, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+        
+        self._tombstone_rows.append({
+            "image_hash": image_hash,
+            "label": entry["label"],
+            "timestamp": entry["timestamp"],
+            SEQ_COLUMN: entry["seq"],
+            DELETED_COLUMN: True,
+        })
+        del keys[image_hash]
+        self._df = None
+        self._save_metadata()
+        return True
+    
+    def _query(
+        self,
+        image_hashes: Optional[List[str]] = None,
+        label: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        since=None,
+        as_of=None
+    ) -> pd.DataFrame:
+        """
+        Lecture avec filtres et projection poussés au scan de la base, puis
+        fusion avec les segments non compactés.
+        
+        Args:
+            image_hashes: Restreindre à ces images
+            label: Filtrer par label (élagage de partitions)
+            columns: Colonnes à renvoyer
+            since: Versions ingérées à partir de cet horodatage
+            as_of: Lecture de l'état du store à cet horodatage
+        
+        Returns:
+            DataFrame avec une ligne par image
+        """
+        key_columns = ["image_hash", SEQ_COLUMN, DELETED_COLUMN]
+        scan_columns = None if columns is None else list(dict.fromkeys(key_columns + ["label", "timestamp"] + columns))
+        
+        expression = self._build_filter(label, since, as_of)
+        hash_filter = ds.field("image_hash").isin(list(image_hashes)) if image_hashes is not None else None
+        if hash_filter is not None:
+            expression = hash_filter if expression is None else expression & hash_filter
+        
+        base = self._scan(scan_columns, expression)
+        segments = self._segment_rows(as_of, image_hashes)
+        
+        if not base.empty:
+            if self._metadata.get("history"):
+                # Version la plus récente de chaque image (à as_of), sans filtre de label/date
+                key_filter = self._build_filter(as_of=as_of)
+                if hash_filter is not None:
+                    key_filter = hash_filter if key_filter is None else key_filter & hash_filter
+                keys = self._scan(["image_hash", SEQ_COLUMN], key_filter)
+                latest = keys.groupby("image_hash")[SEQ_COLUMN].max()
+                base = base[base[SEQ_COLUMN].to_numpy() == base["image_hash"].map(latest).to_numpy()]
+                base = base[~base[DELETED_COLUMN].eq(True)]
+            if not segments.empty:
+                base = base[~base["image_hash"].isin(segments["image_hash"])]
+        
+        if not segments.empty:
+            segments = _resolve_latest(segments)
+            if label:
+                segments = segments[segments["label"] == label]
+            if since:
+                segments = segments[segments["timestamp"].astype(str) >= _as_timestamp(since)]
+        
+        frames = [f for f in (base, segments) if not f.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns) if columns else pd.DataFrame()
+        result = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+        
+        if columns:
+            return result.reindex(columns=columns)
+        ordered = [c for c in self._columns if c in result.columns]
+        ordered += [c for c in result.columns if c not in ordered and c not in INTERNAL_COLUMNS]
+        return result[ordered]
+    
+    def _ensure_indexes(self) -> pd.DataFrame:
+        """
+        (Re)construit les index si la vue fusionnée a changé :
+        image_hash -> position (table de hachage) et label -> positions.
+        
+        Returns:
+            La vue fusionnée indexée
+        """
+        df = self.df
+        if self._indexed_df is not df:
+            if df.empty:
+                self._hash_index = pd.Index([], dtype=object)
+                self._label_index = {}
+            else:
+                self._hash_index = pd.Index(df["image_hash"])
+                self._label_index = df.groupby("label", sort=False).indices
+            self._indexed_df = df
+        return df
+    
+    def get_features(
+        self,
+        image_path: Optional[str] = None,
+        label: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        since: Optional[Union[str, datetime]] = None,
+        as_of: Optional[Union[str, datetime]] = None
+    ) -> pd.DataFrame:
         """
         Récupère des features du store.
         
+        Si la vue complète est déjà en mémoire, les recherches passent par les
+        index ; sinon les filtres et la projection sont poussés au scan Parquet
+        (seuls les partitions, row groups et colonnes utiles sont lus). Le
+        DataFrame renvoyé est toujours une copie, modifiable sans effet sur le store.
+        
         Args:
             image_path: Filtrer par chemin d'image
             label: Filtrer par label
+            columns: Colonnes à renvoyer (toutes par défaut)
+            since: Versions ingérées à partir de cet horodatage
+            as_of: Lire l'état du store à cet horodatage (voir `snapshot`)
             
         Returns:
             DataFrame avec les features
         """
-        df = self.df.copy()
+        if since or as_of or (self._df is None and (image_path or label or columns)):
+            image_hashes = [_image_hash(image_path)] if image_path else None
+            return self._query(image_hashes, label, columns, since, as_of)
+        
+        df = self._ensure_indexes()
+        if df.empty:
+            return df
         
         if image_path:
-            image_hash = hashlib.md5(image_path.encode()).hexdigest()
-            df = df[df["image_hash"] == image_hash]
+            position = self._hash_index.get_indexer([_image_hash(image_path)])
+            positions = position[position >= 0]
+            if label and len(positions):
+                positions = positions[df["label"].to_numpy()[positions] == label]
+        elif label:
+            positions = self._label_index.get(label, np.array([], dtype=np.intp))
+        else:
+            return df[columns].copy() if columns else df.copy()
+        
+        result = df.take(positions)
+        return result[columns] if columns else result
+    
+    def get_many(self, image_hashes: List[str], columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Recherche groupée par image_hash (dans l'ordre demandé, hashes absents ignorés).
         
+        Args:
+            image_hashes: Liste de hashes (voir colonne `image_hash`)
+            columns: Colonnes à renvoyer (toutes par défaut)
+        
+        Returns:
+            DataFrame avec les features trouvées
+        """
+        image_hashes = list(image_hashes)
+        if self._df is None:
+            query_columns = None if columns is None else list(dict.fromkeys(["image_hash"] + columns))
+            found = self._query(image_hashes, columns=query_columns)
+            if found.empty:
+                return found
+            positions = pd.Index(found["image_hash"]).get_indexer(image_hashes)
+            result = found.take(positions[positions >= 0])
+            return result[columns].reset_index(drop=True) if columns else result.reset_index(drop=True)
+        
+        df = self._ensure_indexes()
+        if df.empty:
+            return df
+        positions = self._hash_index.get_indexer(image_hashes)
+        result = df.take(positions[positions >= 0])
+        return result[columns] if columns else result
+    
+    def get_table(
+        self,
+        label: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        since: Optional[Union[str, datetime]] = None
+    ) -> pa.Table:
+        """
+        Comme `get_features`, mais renvoie une table Arrow sans passer par pandas.
+        
+        Avec le backend "arrow", une base compactée sans historique est lue
+        sans copie : les colonnes pointent dans les fichiers mappés en mémoire.
+        Sinon (segments en attente, historique), la vue fusionnée est convertie.
+        
+        Args:
+            label: Filtrer par label
+            columns: Colonnes à renvoyer (toutes par défaut)
+            since: Versions ingérées à partir de cet horodatage
+        
+        Returns:
+            Table Arrow avec les features
+        """
+        if self._segments or self._tombstone_rows or self._metadata.get("history"):
+            return pa.Table.from_pandas(self._query(label=label, columns=columns, since=since), preserve_index=False)
+        
+        table = self._scan_table(columns, self._build_filter(label, since))
+        if table is None:
+            return pa.table({c: pa.array([], pa.null()) for c in columns or []})
+        if columns:
+            return table.select([c for c in columns if c in table.column_names])
+        ordered = [c for c in self._columns if c in table.column_names]
+        ordered += [c for c in table.column_names if c not in ordered and c not in INTERNAL_COLUMNS]
+        return table.select(ordered)
+    
+    def add_embeddings(
+        self,
+        image_paths: List[str],
+        labels: List[str],
+        embeddings: np.ndarray,
+        model_version: str
+    ) -> int:
+        """
+        Ajoute des embeddings (un fichier Parquet par appel, colonne
+        `fixed_size_list<float32>` construite sans copie depuis le tableau).
+        
+        Args:
+            image_paths: Chemins des images
+            labels: Label de chaque image
+            embeddings: Tableau (n, dim) des vecteurs
+            model_version: Version du modèle ayant produit les vecteurs
+        
+        Returns:
+            Nombre d'embeddings écrits
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or len(embeddings) != len(image_paths):
+            raise ValueError(f"embeddings doit être de forme ({len(image_paths)}, dim), reçu {embeddings.shape}")
+        count, dim = embeddings.shape
+        if count == 0:
+            return 0
+        
+        first_seq = self._next_seq
+        self._next_seq += count
+        model_version = str(model_version)
+        table = pa.table({
+            "image_hash": pa.array([_image_hash(str(p)) for p in image_paths], pa.string()),
+            "image_path": pa.array([str(p) for p in image_paths], pa.string()),
+            "label": pa.array([str(l) for l in labels], pa.string()),
+            "model_version": pa.array([model_version] * count, pa.string()),
+            "timestamp": pa.array([_now()] * count, pa.string()),
+            SEQ_COLUMN: pa.array(np.arange(first_seq, first_seq + count, dtype=np.int64)),
+            EMBEDDING_COLUMN: pa.FixedSizeListArray.from_arrays(pa.array(embeddings.reshape(-1)), dim),
+        })
+        ds.write_dataset(
+            table,
+            self.embeddings_dir,
+            format="parquet",
+            partitioning=EMBEDDING_PARTITIONING,
+            basename_template=f"part-{first_seq:012d}-{self._next_seq - 1:012d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        
+        versions = self._metadata.setdefault("embeddings", {})
+        version = versions.setdefault(model_version, {"dim": dim, "rows": 0})
+        version["rows"] += count
+        version["last_updated"] = _now()
+        self._save_metadata()
+        return count
+    
+    def get_embeddings(
+        self,
+        model_version: Optional[str] = None,
+        label: Optional[str] = None,
+        image_hashes: Optional[List[str]] = None
+    ) -> pa.Table:
+        """
+        Embeddings des images présentes dans le store (dernier calcul par image).
+        
+        Args:
+            model_version: Version du modèle (par défaut, la dernière écrite)
+            label: Filtrer par label
+            image_hashes: Restreindre à ces images
+        
+        Returns:
+            Table Arrow (image_hash, image_path, label, model_version, timestamp,
+            embedding) ; voir `embedding_matrix` pour le tableau NumPy
+        """
+        versions = self._metadata.get("embeddings", {})
+        if model_version is None and versions:
+            model_version = max(versions, key=lambda v: versions[v]["last_updated"])
+        if model_version is None or not self.embeddings_dir.exists():
+            dim = versions.get(model_version, {}).get("dim", 0)
+            return pa.table(
+                {c: pa.array([], pa.string()) for c in ["image_hash", "image_path", "label", "model_version", "timestamp"]}
+                | {EMBEDDING_COLUMN: pa.array([], pa.list_(pa.float32(), dim))}
+            )
+        
+        dataset = ds.dataset(self.embeddings_dir, format="parquet", partitioning=EMBEDDING_PARTITIONING)
+        expression = ds.field("model_version") == str(model_version)
         if label:
-            df = df[df["label"] == label]
+            expression &= ds.field("label") == label
+        if image_hashes is not None:
+            expression &= ds.field("image_hash").isin(list(image_hashes))
+        table = dataset.to_table(filter=expression)
         
-        return df
+        # Dernier calcul par image, restreint aux images encore présentes (colonnes clés seulement)
+        keys = pd.DataFrame({"image_hash": table.column("image_hash").to_numpy(zero_copy_only=False),
+                             SEQ_COLUMN: table.column(SEQ_COLUMN).to_numpy()})
+        latest = keys.sort_values(SEQ_COLUMN, kind="stable").drop_duplicates(subset="image_hash", keep="last")
+        live = self._live_keys()
+        latest = latest[latest["image_hash"].isin(list(live))]
+        table = table.take(pa.array(latest.index.to_numpy()))
+        return table.select([c for c in table.column_names if c != SEQ_COLUMN])
     
-    def get_statistics(self) -> Dict:
+    def get_changes(
+        self,
+        since: Optional[Union[str, datetime]] = None,
+        after: Optional[str] = None
+    ) -> tuple:
+        """
+        Modifications strictement postérieures à `since`, pour répliquer le
+        store vers une autre base (voir `feature_sync`).
+        
+        Les lignes d'un même lot partagent leur horodatage : avec `after`, les
+        lignes à l'horodatage `since` dont l'image_hash est supérieur sont
+        aussi renvoyées (reprise au milieu d'un lot, ordre (timestamp, image_hash)).
+        
+        Args:
+            since: Horodatage de la dernière synchronisation (None : tout le store)
+            after: image_hash de la dernière ligne répliquée à l'horodatage `since`
+        
+        Returns:
+            (DataFrame des lignes vivantes ajoutées/modifiées, liste des image_hash supprimés)
+        """
+        if since is None:
+            return self._query(), []
+        
+        since = _as_timestamp(since)
+        changed = self._query(since=since)
+        if not changed.empty:
+            timestamps = changed["timestamp"].astype(str)
+            keep = timestamps > since
+            if after is not None:
+                keep |= (timestamps == since) & (changed["image_hash"] > after)
+            changed = changed[keep].reset_index(drop=True)
+        
+        deleted = [row["image_hash"] for row in self._tombstone_rows if str(row["timestamp"]) > since]
+        if self._metadata.get("history"):
+            expression = (ds.field(DELETED_COLUMN) == True) & (ds.field(DATE_COLUMN) >= since[:10]) \
+                & (ds.field("timestamp") > since)
+            deleted += self._scan(["image_hash"], expression).get("image_hash", pd.Series(dtype=object)).tolist()
+        keys = self._live_keys()
+        return changed, [h for h in dict.fromkeys(deleted) if h not in keys]
+    
+    def snapshot(self) -> str:
+        """
+        Horodatage à conserver (ex: paramètre MLflow) pour relire plus tard
+        exactement les mêmes features via `get_features(as_of=...)`.
+        """
+        return _now()
+    
+    def get_statistics(self, by_label: bool = False, raw: bool = False) -> Dict:
         """
         Retourne des statistiques sur le store.
         
+        Les agrégats (comptes par label, moyenne/variance de chaque feature
+        numérique) sont maintenus à chaque écriture : aucune lecture de la base.
+        
+        Args:
+            by_label: Ajouter les moments de chaque feature par label
+            raw: Renvoyer les agrégats bruts, fusionnables avec `merge_statistics`
+        
         Returns:
             Dictionnaire de statistiques
         """
-        if self.df.empty:
-            return {
-                "total_features": 0,
-                "labels": {},
-                "last_updated": None
-            }
+        statistics = self._statistics()
+        if raw:
+            return merge_statistics(statistics)
+        
+        overall = {}
+        for features in statistics["moments"].values():
+            for feature, moments in features.items():
+                overall[feature] = _combine_moments(overall.get(feature, [0, 0.0, 0.0]), moments)
         
         stats = {
-            "total_features": len(self.df),
-            "labels": self.df["label"].value_counts().to_dict(),
-            "last_updated": self.df["timestamp"].max() if "timestamp" in self.df.columns else None
+            "total_features": sum(statistics["labels"].values()),
+            "labels": dict(statistics["labels"]),
+            "last_updated": statistics.get("last_timestamp"),
+            "features": _summarize_moments(overall)
         }
+        if by_label:
+            stats["features_by_label"] = {
+                label: _summarize_moments(features) for label, features in statistics["moments"].items()
+            }
         
         return stats
     
     def clear(self):
         """Vide le store."""
-        self.df = pd.DataFrame()
-        self._save_store()
+        for segment in self._segments:
+            segment[3].unlink(missing_ok=True)
+        shutil.rmtree(self.dataset_dir, ignore_errors=True)
+        shutil.rmtree(self.embeddings_dir, ignore_errors=True)
+        self.features_file.unlink(missing_ok=True)
+        self.tombstones_file.unlink(missing_ok=True)
+        self._reset_state()
+        self._keys = {}
+        self._metadata["statistics"] = _empty_statistics()
+        self._save_metadata()
         print("✅ Feature Store vidé")
 
 
-def extract_image_features(image_path: str) -> Dict:
+def embedding_matrix(table: pa.Table) -> np.ndarray:
+    """
+    Colonne `embedding` d'une table Arrow -> tableau float32 (n, dim), sans
+    passer par des listes Python.
+    """
+    column = table.column(EMBEDDING_COLUMN).combine_chunks()
+    values = column.flatten().to_numpy(zero_copy_only=False)
+    return values.astype(np.float32, copy=False).reshape(len(column), column.type.list_size)
+
+
+class FeatureStoreWriter:
+    """
+    Session d'écriture bufferisée pour le Feature Store.
+    
+    Exemple:
+        with store.writer() as writer:
+            for path in paths:
+                writer.add(path, label, extract_image_features(path))
+    """
+    
+    def __init__(self, store: FeatureStore):
+        self.store = store
+        self._rows = []
+        self.committed = 0
+    
+    def add(self, image_path: str, label: str, features: Dict, metadata: Optional[Dict] = None):
+        """Bufferise une ligne (aucune écriture disque avant `commit`)."""
+        self._rows.append(_build_row(image_path, label, features, metadata))
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def commit(self) -> int:
+        """Persiste les lignes bufferisées en un seul segment."""
+        if not self._rows:
+            return 0
+        batch = pd.DataFrame(self._rows)
+        self._rows = []
+        written = self.store.add_features_batch(batch)
+        self.committed += written
+        return written
+    
+    def rollback(self):
+        """Abandonne les lignes bufferisées."""
+        self._rows = []
+    
+    def __enter__(self) -> "FeatureStoreWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+# Extracteurs de features additionnels, calculés sur la même image décodée.
+# Signature : fn(rgb: PIL.Image RGB, histogram: np.ndarray (3, 256)) -> Dict
+FEATURE_EXTRACTORS = {}
+
+# Taille (plus grand côté) visée par le décodage JPEG réduit
+DEFAULT_DRAFT_SIZE = 256
+
+_LEVELS = np.arange(256, dtype=np.float64)
+
+
+def register_feature_extractor(name: str):
+    """
+    Décorateur pour enregistrer un extracteur de features additionnel.
+    
+    Args:
+        name: Nom utilisé dans `extra_features`
+    """
+    def decorator(fn):
+        FEATURE_EXTRACTORS[name] = fn
+        return fn
+    return decorator
+
+
+def _histogram_moments(histogram: np.ndarray) -> tuple:
+    """
+    Moyenne et écart-type exacts de chaque canal à partir de son histogramme.
+    
+    Args:
+        histogram: Tableau (C, 256) de comptes par niveau
+    
+    Returns:
+        (moyennes, écarts-types), chacun de forme (C,)
+    """
+    counts = np.maximum(histogram.sum(axis=1), 1)
+    mean = histogram @ _LEVELS / counts
+    mean_sq = histogram @ (_LEVELS * _LEVELS) / counts
+    std = np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+    return mean, std
+
+
+@register_feature_extractor("color_hist")
+def _color_histogram(rgb, histogram: np.ndarray, bins: int = 8) -> Dict:
+    """Histogramme normalisé par canal, regroupé en `bins` classes."""
+    grouped = histogram.reshape(3, bins, 256 // bins).sum(axis=2)
+    grouped = grouped / np.maximum(grouped.sum(axis=1, keepdims=True), 1)
+    return {
+        f"hist_{channel}_{i}": float(grouped[c, i])
+        for c, channel in enumerate("rgb")
+        for i in range(bins)
+    }
+
+
+@register_feature_extractor("hsv")
+def _hsv_statistics(rgb, histogram: np.ndarray) -> Dict:
+    """Moyenne et écart-type des canaux HSV."""
+    hsv_histogram = np.asarray(rgb.convert("HSV").histogram(), dtype=np.float64).reshape(3, 256)
+    mean, std = _histogram_moments(hsv_histogram)
+    features = {}
+    for c, channel in enumerate("hsv"):
+        features[f"mean_{channel}"] = float(mean[c])
+        features[f"std_{channel}"] = float(std[c])
+    return features
+
+
+@register_feature_extractor("edge_density")
+def _edge_density(rgb, histogram: np.ndarray, threshold: float = 32.0) -> Dict:
+    """Proportion de pixels dont le gradient de luminance dépasse `threshold`."""
+    gray = np.asarray(rgb.convert("L"), dtype=np.int16)
+    if gray.shape[0] < 2 or gray.shape[1] < 2:
+        return {"edge_density": 0.0}
+    gx = np.abs(np.diff(gray, axis=1))[:-1, :]
+    gy = np.abs(np.diff(gray, axis=0))[:, :-1]
+    return {"edge_density": float(np.mean((gx + gy) > threshold))}
+
+
+PERCEPTUAL_HASH_COLUMNS = ["dhash", "phash"]
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """Matrice de la DCT-II orthonormée."""
+    k = np.arange(size)[:, None]
+    i = np.arange(size)[None, :]
+    matrix = np.sqrt(2.0 / size) * np.cos(np.pi * (2 * i + 1) * k / (2 * size))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def _hash_hex(bits: np.ndarray) -> str:
+    """64 bits -> 16 caractères hexadécimaux (chaîne : sans perte dans pandas/Parquet)."""
+    return np.packbits(bits.astype(np.uint8)).tobytes().hex()
+
+
+def _perceptual_hashes(rgb) -> Dict:
+    """
+    Hashes perceptuels 64 bits (distance de Hamming faible = images proches).
+    
+    dHash : signe du gradient horizontal d'une vignette 9x8.
+    pHash : basses fréquences DCT (8x8) d'une vignette 32x32 comparées à leur médiane.
+    """
+    from PIL import Image
+    
+    gray = rgb.convert("L")
+    small = np.asarray(gray.resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    thumbnail = np.asarray(gray.resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT_32 @ thumbnail @ _DCT_32.T)[:8, :8].ravel()
+    return {
+        "dhash": _hash_hex(small[:, 1:] > small[:, :-1]),
+        "phash": _hash_hex(low > np.median(low[1:])),
+    }
+
+
+def extract_image_features(
+    image_path: str,
+    extra_features: Optional[List[str]] = None,
+    draft_size: Optional[int] = DEFAULT_DRAFT_SIZE
+) -> Dict:
     """
     Extrait des features simples d'une image.
     
     Args:
         image_path: Chemin de l'image
+        extra_features: Noms d'extracteurs additionnels (voir FEATURE_EXTRACTORS)
+        draft_size: Plus grand côté visé pour le décodage JPEG réduit
+            (None = décodage en pleine résolution)
         
     Returns:
         Dictionnaire de features
     """
+    try:
+        return _compute_image_features(image_path, extra_features, draft_size)
+    except Exception as e:
+        print(f"❌ Erreur extraction features: {str(e)}")
+        return {}
+
+
+def _compute_image_features(
+    image_path: str,
+    extra_features: Optional[List[str]] = None,
+    draft_size: Optional[int] = DEFAULT_DRAFT_SIZE
+) -> Dict:
+    """Calcule les features d'une image (lève une exception en cas d'erreur)."""
     from PIL import Image
-    import numpy as np
     
-    try:
-        image = Image.open(image_path)
+    with Image.open(image_path) as image:
+        width, height = image.size
         
-        # Features basiques
+        # Features basiques (taille et mode d'origine, avant décodage réduit)
         features = {
-            "width": image.width,
-            "height": image.height,
+            "width": width,
+            "height": height,
             "mode": image.mode,
-            "aspect_ratio": image.width / image.height if image.height > 0 else 0,
+            "aspect_ratio": width / height if height > 0 else 0,
         }
         
-        # Features de couleur (moyennes RGB)
-        img_array = np.array(image.convert('RGB'))
-        features["mean_r"] = float(np.mean(img_array[:, :, 0]))
-        features["mean_g"] = float(np.mean(img_array[:, :, 1]))
-        features["mean_b"] = float(np.mean(img_array[:, :, 2]))
-        features["std_r"] = float(np.std(img_array[:, :, 0]))
-        features["std_g"] = float(np.std(img_array[:, :, 1]))
-        features["std_b"] = float(np.std(img_array[:, :, 2]))
+        # Décodage JPEG à échelle réduite (1/2, 1/4, 1/8) directement dans le DCT
+        if draft_size and max(width, height) > draft_size:
+            scale = draft_size / max(width, height)
+            image.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
         
-        return features
+        rgb = image.convert("RGB")
+    
+    # Moyennes/écarts-types RGB : un seul passage (histogramme calculé en C),
+    # puis moments exacts pour les trois canaux en une réduction vectorisée
+    histogram = np.asarray(rgb.histogram(), dtype=np.float64).reshape(3, 256)
+    mean, std = _histogram_moments(histogram)
+    for c, channel in enumerate("rgb"):
+        features[f"mean_{channel}"] = float(mean[c])
+    for c, channel in enumerate("rgb"):
+        features[f"std_{channel}"] = float(std[c])
+    
+    features.update(_perceptual_hashes(rgb))
+    
+    for name in extra_features or []:
+        features.update(FEATURE_EXTRACTORS[name](rgb, histogram))
+    
+    return features
+
+
+FINGERPRINT_COLUMNS = ["file_size", "file_mtime_ns", "content_hash"]
+
+
+def _file_fingerprint(stat: os.stat_result, data: bytes) -> Dict:
+    """Empreinte d'un fichier : taille, mtime (ns) et hash du contenu."""
+    return {
+        "file_size": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+        "content_hash": hashlib.md5(data).hexdigest(),
+    }
+
+
+def _content_hash(path: str) -> str:
+    """Hash MD5 du contenu d'un fichier, lu par blocs."""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_chunk(paths: List[str], options: Optional[Dict] = None) -> List[tuple]:
+    """
+    Tâche exécutée dans un processus worker : extrait les features d'un
+    paquet d'images.
+    
+    Returns:
+        Liste de (chemin, features ou None, message d'erreur ou None)
+    """
+    results = []
+    for path in paths:
+        try:
+            # Une seule lecture du fichier : empreinte de contenu + décodage
+            stat = os.stat(path)
+            with open(path, "rb") as f:
+                data = f.read()
+            features = _compute_image_features(io.BytesIO(data), **(options or {}))
+            features.update(_file_fingerprint(stat, data))
+            results.append((path, features, None))
+        except Exception as e:
+            results.append((path, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _iter_chunk_results(paths: List[str], workers: int, task_size: int, options: Optional[Dict] = None):
+    """
+    Génère les résultats d'extraction au fil de l'eau.
+    
+    Au plus `2 * workers` tâches sont en vol : la mémoire reste bornée
+    quelle que soit la taille du dossier.
+    """
+    tasks = [paths[i:i + task_size] for i in range(0, len(paths), task_size)]
+    
+    if workers <= 1:
+        for task in tasks:
+            yield _extract_chunk(task, options)
+        return
+    
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    
+    # spawn : évite de forker un processus qui a déjà initialisé TensorFlow
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = set()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.add(executor.submit(_extract_chunk, task, options))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def extract_features_parallel(
+    paths: List[str],
+    labels: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    store: Optional[FeatureStore] = None,
+    chunk_size: int = 256,
+    task_size: int = 16,
+    progress: bool = True,
+    extra_features: Optional[List[str]] = None,
+    draft_size: Optional[int] = DEFAULT_DRAFT_SIZE
+) -> Dict:
+    """
+    Extrait les features d'un grand nombre d'images avec un pool de processus.
+    
+    Les résultats sont renvoyés au fil de l'eau et écrits dans le Feature Store
+    par lots de `chunk_size` lignes (un segment par lot).
+    
+    Args:
+        paths: Chemins des images
+        labels: Label de chaque image (obligatoire si `store` est fourni)
+        workers: Nombre de processus (défaut: nombre de cœurs)
+        store: Feature Store de destination (optionnel)
+        chunk_size: Nombre de lignes par écriture dans le store
+        task_size: Nombre d'images par tâche envoyée à un worker
+        progress: Afficher une barre de progression
+    
+    Returns:
+        Dictionnaire {"processed", "stored", "errors": {chemin: erreur}, "features"}
+        ("features" n'est rempli que si aucun store n'est fourni)
+    """
+    from tqdm import tqdm
+    
+    paths = [str(path) for path in paths]
+    if store is not None and labels is None:
+        raise ValueError("labels est obligatoire pour écrire dans le Feature Store")
+    label_by_path = dict(zip(paths, labels)) if labels is not None else {}
+    workers = workers or os.cpu_count() or 1
+    options = {"extra_features": extra_features, "draft_size": draft_size}
+    
+    summary = {"processed": 0, "stored": 0, "errors": {}, "features": {}}
+    buffer = []
+    
+    def flush():
+        if buffer:
+            summary["stored"] += store.add_features_batch(buffer)
+            buffer.clear()
+    
+    with tqdm(total=len(paths), desc="Extraction features", disable=not progress) as bar:
+        for results in _iter_chunk_results(paths, workers, task_size, options):
+            for path, features, error in results:
+                summary["processed"] += 1
+                if error is not None:
+                    summary["errors"][path] = error
+                elif store is None:
+                    summary["features"][path] = features
+                else:
+                    buffer.append({"image_path": path, "label": label_by_path[path], "features": features})
+                    if len(buffer) >= chunk_size:
+                        flush()
+            bar.update(len(results))
+    
+    if store is not None:
+        flush()
+    
+    if summary["errors"]:
+        print(f"⚠️  {len(summary['errors'])} images en erreur lors de l'extraction")
+    return summary
+
+
+def plan_incremental_extraction(
+    store: FeatureStore,
+    paths: List[str],
+    labels: List[str],
+    content_hashes: Optional[Dict[str, str]] = None
+) -> Dict:
+    """
+    Détermine quelles images doivent être (ré)extraites.
+    
+    Vérification rapide (taille, mtime) contre le store ; si elle échoue,
+    escalade vers le hash du contenu : un fichier simplement « touché »,
+    ou dont le contenu est déjà connu sous un autre chemin (copie,
+    renommage), réutilise les features existantes sans décodage.
+    
+    Args:
+        store: Feature Store de référence
+        paths: Chemins des images
+        labels: Label de chaque image
+        content_hashes: Hash MD5 du contenu déjà connus ({chemin: hash}, ex: manifeste
+            du dataset), utilisés sans relire les fichiers
+    
+    Returns:
+        Dictionnaire {"extract": [(chemin, label)], "reuse": [lignes], "unchanged": int}
+    """
+    plan = {"extract": [], "reuse": [], "unchanged": 0}
+    
+    known = store.get_many([_image_hash(path) for path in paths])
+    known = known.set_index("image_path") if not known.empty else known
+    # Colonnes suivies par le store : la vue complète n'est jamais chargée
+    store_columns = list(store._columns)
+    has_fingerprint = all(c in store_columns for c in FINGERPRINT_COLUMNS)
+    # Images à rechercher par hash du contenu (copies, renommages), en une passe
+    by_content = []
+    
+    def complete(row) -> bool:
+        # Lignes antérieures aux hashes perceptuels : à réextraire une fois
+        return all(c in row.index and not pd.isna(row[c]) for c in PERCEPTUAL_HASH_COLUMNS)
+    
+    bookkeeping = {"image_hash", "image_path", "label", "timestamp", "metadata", *FINGERPRINT_COLUMNS}
+    feature_columns = [c for c in store_columns if c not in bookkeeping]
+    
+    def reuse(row, path, label, stat, content_hash):
+        features = {c: row[c] for c in feature_columns if c in row.index and not pd.isna(row[c])}
+        features.update({
+            "file_size": stat.st_size,
+            "file_mtime_ns": stat.st_mtime_ns,
+            "content_hash": content_hash,
+        })
+        plan["reuse"].append({"image_path": path, "label": label, "features": features})
+    
+    for path, label in zip(paths, labels):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            plan["extract"].append((path, label))
+            continue
         
-    except Exception as e:
-        print(f"❌ Erreur extraction features: {str(e)}")
-        return {}
+        row = known.loc[path] if has_fingerprint and path in known.index else None
+        if (
+            row is not None
+            and row["label"] == label
+            and row["file_size"] == stat.st_size
+            and row["file_mtime_ns"] == stat.st_mtime_ns
+            and complete(row)
+        ):
+            plan["unchanged"] += 1
+            continue
+        
+        if not has_fingerprint:
+            plan["extract"].append((path, label))
+            continue
+        
+        content_hash = (content_hashes or {}).get(path) or _content_hash(path)
+        if row is not None and row["content_hash"] == content_hash and complete(row):
+            reuse(row, path, label, stat, content_hash)
+            continue
+        
+        by_content.append((path, label, stat, content_hash))
+    
+    if by_content:
+        # Projection sur deux colonnes, puis lecture des seules lignes correspondantes
+        hashes = store.get_features(columns=["image_hash", "content_hash"]).dropna(subset=["content_hash"])
+        sources = dict(zip(hashes["content_hash"], hashes["image_hash"]))
+        wanted = list(dict.fromkeys(sources[h] for _, _, _, h in by_content if h in sources))
+        rows = store.get_many(wanted)
+        rows = rows.set_index("image_hash", drop=False) if not rows.empty else rows
+        for path, label, stat, content_hash in by_content:
+            source = sources.get(content_hash)
+            if source is not None and source in rows.index and complete(rows.loc[source]):
+                reuse(rows.loc[source], path, label, stat, content_hash)
+            else:
+                plan["extract"].append((path, label))
+    
+    return plan
+
 
+def extract_features_incremental(
+    paths: List[str],
+    labels: List[str],
+    store: FeatureStore,
+    content_hashes: Optional[Dict[str, str]] = None,
+    **kwargs
+) -> Dict:
+    """
+    Extraction incrémentale : seules les images nouvelles ou modifiées sont
+    décodées, les autres sont ignorées ou réutilisent les features connues.
+    
+    Args:
+        paths: Chemins des images
+        labels: Label de chaque image
+        store: Feature Store de destination
+        content_hashes: Hash du contenu déjà connus (voir `plan_incremental_extraction`)
+        **kwargs: Options transmises à `extract_features_parallel`
+    
+    Returns:
+        Résumé de `extract_features_parallel` + "unchanged" et "reused"
+    """
+    paths = [str(path) for path in paths]
+    plan = plan_incremental_extraction(store, paths, labels, content_hashes)
+    
+    reused = store.add_features_batch(plan["reuse"]) if plan["reuse"] else 0
+    to_extract = plan["extract"]
+    summary = extract_features_parallel(
+        [path for path, _ in to_extract],
+        labels=[label for _, label in to_extract],
+        store=store,
+        **kwargs
+    )
+    summary["unchanged"] = plan["unchanged"]
+    summary["reused"] = reused
+    
+    print(f"✅ Extraction incrémentale: {summary['unchanged']} inchangées, "
+          f"{reused} réutilisées, {summary['stored']} extraites")
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Migration du format de la base du Feature Store")
+    parser.add_argument("--store-path", default="feature_store", help="Dossier du Feature Store")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="arrow", help="Format cible")
+    args = parser.parse_args()
+    
+    FeatureStore(args.store_path).migrate_backend(args.backend)
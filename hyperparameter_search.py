@@ -0,0 +1,475 @@
+"""
+Recherche d'hyperparamètres parallèle avec élagage par successive halving.
+
+Les configurations (architecture, largeur, optimiseur, learning rate, taille
+de lot) sont entraînées en parallèle dans un pool de processus, chaque
+processus limité à `threads` threads TensorFlow pour ne pas surcharger le
+CPU. Après chaque palier, seul le meilleur tiers (`eta`) des essais continue
+avec un budget d'epochs multiplié par `eta` (reprise depuis le modèle
+sauvegardé). Le mode Hyperband enchaîne plusieurs paliers de départ.
+
+Les images sont décodées une seule fois dans le cache memmap (image_cache),
+partagé par tous les processus. Chaque essai est un run MLflow imbriqué sous
+le run de la recherche ; la meilleure configuration est enregistrée comme
+`dandelion_vs_grass_classifier` uniquement si elle bat le modèle en production.
+
+Usage:
+    python hyperparameter_search.py [--trials 27] [--max-epochs 9] [--eta 3] [--workers 4] [--hyperband]
+"""
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import mlflow
+    import mlflow.tensorflow
+    from mlflow.tracking import MlflowClient
+    from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID, MLFLOW_RUN_NAME
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+    print("⚠️  MLflow non disponible, suivi des essais désactivé")
+
+try:
+    from utils_s3 import get_minio_client
+    S3_AVAILABLE = True
+except ImportError:
+    S3_AVAILABLE = False
+
+from augmentation import AUGMENTATION
+from dataset_manifest import manifest_splits, update_manifest
+from image_cache import DEFAULT_CACHE_DIR, ImageCache, build_image_cache, split_indices
+from model_architectures import ARCHITECTURES
+from model_locator import DEFAULT_INDEX, MODEL_NAME, PRODUCTION_ALIAS, publish_index, update_index
+
+
+SEARCH_SPACE = {
+    "architecture": ARCHITECTURES,
+    "width_multiplier": [0.5, 1.0],
+    "optimizer": ["adam", "rmsprop", "sgd"],
+    "learning_rate": (1e-4, 3e-3),  # tirage log-uniforme
+    "batch_size": [16, 32, 64],
+}
+
+
+def sample_configurations(count: int, space: Dict = SEARCH_SPACE, seed: Optional[int] = None) -> List[Dict]:
+    """
+    Tire des configurations au hasard dans l'espace de recherche.
+    
+    Args:
+        count: Nombre de configurations
+        space: Listes de valeurs, ou (min, max) pour un tirage log-uniforme
+        seed: Graine
+    
+    Returns:
+        Liste de configurations
+    """
+    rng = np.random.default_rng(seed)
+    configurations = []
+    for _ in range(count):
+        configuration = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                configuration[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+            else:
+                configuration[name] = values[int(rng.integers(len(values)))]
+        configurations.append(configuration)
+    return configurations
+
+
+def successive_halving_rungs(trials: int, min_epochs: int, max_epochs: int, eta: int = 3) -> List[Tuple[int, int]]:
+    """
+    Paliers du successive halving.
+    
+    Args:
+        trials: Nombre d'essais au départ
+        min_epochs: Budget (epochs cumulées) du premier palier
+        max_epochs: Budget maximal d'un essai
+        eta: Facteur de réduction (1/eta des essais continue, budget x eta)
+    
+    Returns:
+        Liste de (essais entraînés, epochs cumulées à atteindre) par palier
+    """
+    rungs = []
+    epochs = min_epochs
+    while True:
+        rungs.append((trials, min(epochs, max_epochs)))
+        if epochs >= max_epochs or trials <= 1:
+            return rungs
+        trials = max(1, trials // eta)
+        epochs *= eta
+
+
+def hyperband_brackets(max_epochs: int, eta: int = 3) -> List[Tuple[int, int]]:
+    """
+    Brackets Hyperband : du plus agressif (beaucoup d'essais, 1 epoch) au
+    plus prudent (peu d'essais, budget complet d'emblée).
+    
+    Returns:
+        Liste de (essais, epochs du premier palier)
+    """
+    s_max = int(math.log(max_epochs, eta) + 1e-9)
+    return [
+        (int(math.ceil((s_max + 1) / (s + 1) * eta ** s)), max(1, int(round(max_epochs * eta ** -s))))
+        for s in range(s_max, -1, -1)
+    ]
+
+
+def _init_worker(threads: int):
+    """Limite les threads TensorFlow d'un processus du pool (avant toute opération)."""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _make_optimizer(name: str, learning_rate: float):
+    """Optimiseur Keras à partir de son nom."""
+    from tensorflow import keras
+    if name == "sgd":
+        return keras.optimizers.SGD(learning_rate=learning_rate, momentum=0.9)
+    if name == "rmsprop":
+        return keras.optimizers.RMSprop(learning_rate=learning_rate)
+    return keras.optimizers.Adam(learning_rate=learning_rate)
+
+
+def train_trial(
+    configuration: Dict,
+    epochs: int,
+    initial_epoch: int,
+    checkpoint: str,
+    cache_path: str,
+    train_indices: np.ndarray,
+    validation_indices: np.ndarray,
+    seed: int = 42
+) -> Dict:
+    """
+    Entraîne un essai jusqu'à `epochs` epochs cumulées (exécuté dans un processus du pool).
+    
+    Le modèle (poids et état de l'optimiseur) est repris depuis `checkpoint`
+    si l'essai a déjà passé un palier, puis y est sauvegardé.
+    
+    Returns:
+        {"val_accuracy", "val_loss", "history", "seconds"}
+    """
+    from tensorflow import keras
+    from image_cache import CachedImageSequence
+    from model_architectures import build_model
+    
+    start = time.perf_counter()
+    cache = ImageCache(cache_path)
+    batch_size = configuration["batch_size"]
+    train = CachedImageSequence(cache, train_indices, batch_size, shuffle=True, augmentation=AUGMENTATION, seed=seed)
+    validation = CachedImageSequence(cache, validation_indices, batch_size)
+    
+    if initial_epoch > 0 and Path(checkpoint).exists():
+        model = keras.models.load_model(checkpoint)
+    else:
+        keras.utils.set_random_seed(seed)
+        model = build_model((*cache.img_size, 3), configuration["architecture"], configuration["width_multiplier"])
+        model.compile(
+            optimizer=_make_optimizer(configuration["optimizer"], configuration["learning_rate"]),
+            loss='binary_crossentropy',
+            metrics=['accuracy']
+        )
+        initial_epoch = 0
+    
+    history = model.fit(train, epochs=epochs, initial_epoch=initial_epoch, validation_data=validation, verbose=0)
+    model.save(checkpoint)
+    return {
+        "val_accuracy": float(history.history["val_accuracy"][-1]),
+        "val_loss": float(history.history["val_loss"][-1]),
+        "history": {k: [float(v) for v in values] for k, values in history.history.items()},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def get_production_accuracy(client, name: str = MODEL_NAME) -> Optional[float]:
+    """
+    Accuracy de validation du modèle en production (alias `production`,
+    à défaut la dernière version enregistrée).
+    
+    Returns:
+        val_accuracy du run source, None si aucun modèle
+    """
+    try:
+        version = client.get_model_version_by_alias(name, PRODUCTION_ALIAS)
+    except Exception:
+        versions = client.search_model_versions(f"name='{name}'")
+        if not versions:
+            return None
+        version = max(versions, key=lambda v: int(v.version))
+    return client.get_run(version.run_id).data.metrics.get("val_accuracy")
+
+
+class HyperparameterSearch:
+    """Recherche d'hyperparamètres (successive halving / Hyperband) sur un pool de processus."""
+    
+    def __init__(
+        self,
+        data_dir: Path,
+        img_size: tuple = (224, 224),
+        validation_split: float = 0.2,
+        max_epochs: int = 9,
+        eta: int = 3,
+        workers: int = 4,
+        threads: Optional[int] = None,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        seed: int = 42,
+        index_path: Path = DEFAULT_INDEX
+    ):
+        """
+        Initialise la recherche.
+        
+        Args:
+            data_dir: Dossier des images (un sous-dossier par classe)
+            img_size: Taille d'entrée du modèle
+            validation_split: Fraction de validation (manifeste du dataset, comme train.py)
+            max_epochs: Budget maximal d'un essai
+            eta: Facteur de réduction entre paliers
+            workers: Processus d'entraînement simultanés (1 : dans le processus courant)
+            threads: Threads TensorFlow par processus (défaut : CPU / workers)
+            cache_dir: Dossier du cache d'images décodées
+            seed: Graine des tirages et des entraînements
+            index_path: Index des modèles mis à jour si le meilleur essai est enregistré
+        """
+        self.max_epochs = max_epochs
+        self.eta = eta
+        self.workers = max(1, workers)
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self.seed = seed
+        self.index_path = Path(index_path)
+        self.cache = build_image_cache(data_dir, img_size, cache_dir)
+        self.train_indices, self.validation_indices = split_indices(
+            self.cache, validation_split, splits=manifest_splits(update_manifest(data_dir, validation_split))
+        )
+        self.checkpoint_dir = Path(tempfile.mkdtemp(prefix="hpsearch-"))
+        self.client = MlflowClient() if MLFLOW_AVAILABLE else None
+        self.trials: List[Dict] = []
+    
+    def _start_trial(self, configuration: Dict, parent) -> Dict:
+        """Crée un essai (run MLflow imbriqué sous la recherche)."""
+        trial = {
+            "id": len(self.trials),
+            "configuration": configuration,
+            "epochs": 0,
+            "val_accuracy": None,
+            "checkpoint": str(self.checkpoint_dir / f"trial-{len(self.trials):04d}.keras"),
+            "run_id": None,
+        }
+        if parent is not None:
+            run = self.client.create_run(parent.info.experiment_id, tags={
+                MLFLOW_PARENT_RUN_ID: parent.info.run_id,
+                MLFLOW_RUN_NAME: f"trial-{trial['id']:04d}",
+            })
+            trial["run_id"] = run.info.run_id
+            for name, value in configuration.items():
+                self.client.log_param(run.info.run_id, name, value)
+        self.trials.append(trial)
+        return trial
+    
+    def _run_rung(self, pool, trials: List[Dict], epochs: int):
+        """Entraîne les essais d'un palier jusqu'à `epochs` epochs cumulées."""
+        arguments = [
+            (trial["configuration"], epochs, trial["epochs"], trial["checkpoint"], str(self.cache.path),
+             self.train_indices, self.validation_indices, self.seed + trial["id"])
+            for trial in trials
+        ]
+        if pool is None:
+            results = [self._safe_train(*args) for args in arguments]
+        else:
+            futures = []
+            for args in arguments:
+                try:
+                    futures.append(pool.submit(train_trial, *args))
+                except BrokenProcessPool as e:
+                    futures.append(e)
+            results = []
+            for future in futures:
+                try:
+                    if isinstance(future, Exception):
+                        raise future
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({"error": str(e) or type(e).__name__})
+        
+        for trial, result in zip(trials, results):
+            if "error" in result:
+                print(f"⚠️  Essai {trial['id']} en échec: {result['error']}")
+                trial["val_accuracy"] = -1.0
+                if trial["run_id"]:
+                    self.client.set_terminated(trial["run_id"], status="FAILED")
+                continue
+            first_epoch = trial["epochs"]
+            trial["epochs"] = epochs
+            trial["val_accuracy"] = result["val_accuracy"]
+            trial["val_loss"] = result["val_loss"]
+            if trial["run_id"]:
+                for name, values in result["history"].items():
+                    for offset, value in enumerate(values):
+                        self.client.log_metric(trial["run_id"], name, value, step=first_epoch + offset)
+                self.client.log_metric(trial["run_id"], "train_seconds", result["seconds"], step=epochs)
+    
+    @staticmethod
+    def _safe_train(*args) -> Dict:
+        """Entraîne un essai dans le processus courant, l'échec étant renvoyé comme résultat."""
+        try:
+            return train_trial(*args)
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def _successive_halving(self, pool, trials: List[Dict], min_epochs: int) -> List[Dict]:
+        """Entraîne puis élague les essais palier par palier ; renvoie les survivants."""
+        for count, epochs in successive_halving_rungs(len(trials), min_epochs, self.max_epochs, self.eta):
+            ranked = sorted(trials, key=lambda t: t["val_accuracy"] if t["val_accuracy"] is not None else -1.0, reverse=True)
+            survivors, pruned = ranked[:count], ranked[count:]
+            for trial in pruned:
+                if trial["run_id"] and trial["val_accuracy"] >= 0:
+                    self.client.set_terminated(trial["run_id"], status="KILLED")
+            trials = survivors
+            self._run_rung(pool, trials, epochs)
+            accuracies = ", ".join(f"{t['val_accuracy']:.3f}" for t in trials)
+            print(f"   palier {epochs} epochs: {len(trials)} essais [{accuracies}]")
+        return trials
+    
+    def run(self, trials: int = 27, hyperband: bool = False, min_epochs: int = 1) -> Dict:
+        """
+        Lance la recherche.
+        
+        Args:
+            trials: Nombre de configurations (successive halving simple)
+            hyperband: Enchaîner les brackets Hyperband (le nombre d'essais en découle)
+            min_epochs: Budget du premier palier (successive halving simple)
+        
+        Returns:
+            Meilleur essai {"configuration", "val_accuracy", "epochs", "run_id"} ; les
+            modèles des essais (`checkpoint`) sont supprimés à la fin de la recherche
+        """
+        brackets = hyperband_brackets(self.max_epochs, self.eta) if hyperband else [(trials, min_epochs)]
+        configurations = sample_configurations(sum(n for n, _ in brackets), seed=self.seed)
+        parent = None
+        if MLFLOW_AVAILABLE:
+            mlflow.set_experiment("dandelion_vs_grass")
+            parent = mlflow.start_run(run_name="hyperparameter_search")
+            mlflow.log_params({
+                "search_trials": len(configurations),
+                "search_max_epochs": self.max_epochs,
+                "search_eta": self.eta,
+                "search_hyperband": hyperband,
+                "search_workers": self.workers,
+                "search_threads_per_worker": self.threads,
+            })
+        
+        print(f"🔎 Recherche: {len(configurations)} configurations, {self.workers} processus x {self.threads} threads")
+        finalists = []
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn"),
+                initializer=_init_worker, initargs=(self.threads,)
+            )
+        try:
+            offset = 0
+            for count, first_epochs in brackets:
+                bracket = [self._start_trial(c, parent) for c in configurations[offset:offset + count]]
+                offset += count
+                finalists.extend(self._successive_halving(pool, bracket, first_epochs))
+            if pool is not None:
+                pool.shutdown()
+                pool = None
+            
+            best = max(finalists, key=lambda t: t["val_accuracy"])
+            if best["val_accuracy"] < 0:
+                raise RuntimeError("Tous les essais de la recherche ont échoué")
+            for trial in finalists:
+                if trial["run_id"] and trial["val_accuracy"] >= 0:
+                    self.client.set_terminated(trial["run_id"], status="FINISHED")
+            print(f"✅ Meilleure configuration (val_accuracy={best['val_accuracy']:.4f}): {best['configuration']}")
+            if parent is not None:
+                mlflow.log_metric("best_val_accuracy", best["val_accuracy"])
+                mlflow.log_dict(best["configuration"], "best_configuration.json")
+                self.register_if_better(best)
+                mlflow.end_run()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            # Un modèle par essai : supprimés une fois le meilleur enregistré
+            shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+        return best
+    
+    def register_if_better(self, best: Dict) -> Optional[str]:
+        """
+        Enregistre le meilleur modèle s'il bat la production, le copie dans
+        Minio et met à jour l'index des modèles (comme train.py).
+        
+        Returns:
+            Version enregistrée, None si la production reste meilleure
+        """
+        from tensorflow import keras
+        
+        production = get_production_accuracy(self.client)
+        if production is not None and best["val_accuracy"] <= production:
+            print(f"⏭️  Production conservée (val_accuracy {production:.4f} >= {best['val_accuracy']:.4f})")
+            return None
+        self.client.log_metric(best["run_id"], "val_accuracy", best["val_accuracy"])
+        model = keras.models.load_model(best["checkpoint"])
+        with mlflow.start_run(run_id=best["run_id"], nested=True):
+            mlflow.tensorflow.log_model(model, artifact_path="model")
+        version = mlflow.register_model(f"runs:/{best['run_id']}/model", MODEL_NAME)
+        self.client.set_registered_model_alias(MODEL_NAME, PRODUCTION_ALIAS, version.version)
+        print(f"✅ Modèle enregistré: {MODEL_NAME} v{version.version} (production: {production})")
+        
+        # Copie Minio servable (MLmodel) et index publié : lus par entrypoint_s3.sh
+        s3_prefix = None
+        if S3_AVAILABLE:
+            try:
+                minio_client = get_minio_client()
+                with tempfile.TemporaryDirectory() as tmp:
+                    export_dir = Path(tmp) / "model"
+                    mlflow.tensorflow.save_model(model, str(export_dir))
+                    s3_prefix = f"models/{MODEL_NAME}/{best['run_id']}"
+                    if not minio_client.upload_directory(str(export_dir), s3_prefix):
+                        raise RuntimeError(f"Aucun fichier uploadé vers {s3_prefix}")
+                self.client.log_param(best["run_id"], "s3_model_path", s3_prefix)
+                print(f"✅ Modèle uploadé vers S3: {s3_prefix}")
+            except Exception as e:
+                s3_prefix = None
+                print(f"⚠️  Upload Minio impossible, index Minio non publié: {str(e)}")
+        entry = update_index(self.client, MODEL_NAME, version.version, self.index_path, s3_prefix)
+        if s3_prefix is not None:
+            publish_index(minio_client, self.index_path)
+        print(f"✅ Index des modèles: v{entry['version']} -> {entry['path']}")
+        return version.version
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres (successive halving / Hyperband)")
+    parser.add_argument("--data-dir", default="data", help="Dossier data/<classe>/*.jpg")
+    parser.add_argument("--trials", type=int, default=27, help="Nombre de configurations")
+    parser.add_argument("--min-epochs", type=int, default=1, help="Budget du premier palier")
+    parser.add_argument("--max-epochs", type=int, default=9, help="Budget maximal d'un essai")
+    parser.add_argument("--eta", type=int, default=3, help="Facteur de réduction entre paliers")
+    parser.add_argument("--workers", type=int, default=4, help="Processus d'entraînement simultanés")
+    parser.add_argument("--threads", type=int, default=None, help="Threads TensorFlow par processus")
+    parser.add_argument("--hyperband", action="store_true", help="Enchaîner les brackets Hyperband")
+    args = parser.parse_args()
+    
+    search = HyperparameterSearch(
+        Path(args.data_dir), max_epochs=args.max_epochs, eta=args.eta,
+        workers=args.workers, threads=args.threads
+    )
+    search.run(trials=args.trials, hyperband=args.hyperband, min_epochs=args.min_epochs)
@@ -0,0 +1,301 @@
+"""
+Cache des images décodées pour l'entraînement.
+
+Les images sont décodées et redimensionnées une seule fois, puis écrites en
+shards `.npy` uint8 (N, H, W, 3) relus par memory-mapping à chaque epoch.
+Le cache est identifié par le manifeste du dataset (chemin, taille, mtime
+de chaque image) et la taille cible : toute modification des images ou de
+`IMG_SIZE` produit une nouvelle clé, donc un nouveau cache, et les caches
+obsolètes du même dossier sont supprimés.
+
+Structure:
+    .cache/images/<clé>/
+        index.json              # clé, taille, classes, chemins, taille des shards
+        labels.npy              # indice de classe de chaque image
+        shard-00000.npy         # images uint8 (memmap)
+"""
+import hashlib
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from tensorflow import keras
+
+from augmentation import augment_numpy_batch
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(".cache") / "images"
+INDEX_FILE = "index.json"
+# Extensions reconnues par flow_from_directory
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".ppm", ".tif", ".tiff"}
+
+
+def build_manifest(data_dir: Path, classes: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Liste les images d'un dossier organisé par classe (un sous-dossier par label).
+    
+    Args:
+        data_dir: Dossier racine
+        classes: Sous-dossiers à prendre en compte (défaut : tous, triés)
+    
+    Returns:
+        Liste de {"path", "label", "size", "mtime_ns"} triée par classe puis par nom
+    """
+    data_dir = Path(data_dir)
+    if classes is None:
+        classes = sorted(p.name for p in data_dir.iterdir() if p.is_dir())
+    manifest = []
+    for label in classes:
+        for path in sorted((data_dir / label).iterdir()):
+            if path.suffix.lower() in IMAGE_EXTENSIONS and path.is_file():
+                stat = path.stat()
+                manifest.append({"path": str(path), "label": label, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return manifest
+
+
+def manifest_key(manifest: List[Dict], img_size: tuple) -> str:
+    """Clé du cache : empreinte du manifeste et de la taille cible."""
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "img_size": list(img_size),
+        "files": [[e["path"], e["label"], e["size"], e["mtime_ns"]] for e in manifest],
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def decode_image(path: str, img_size: tuple) -> Optional[np.ndarray]:
+    """
+    Décode une image comme `flow_from_directory` (RGB, resize nearest), None si erreur.
+    
+    Décodeur commun au cache d'entraînement et aux embeddings (feature_embeddings).
+    """
+    try:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            if image.size != (img_size[1], img_size[0]):
+                image = image.resize((img_size[1], img_size[0]), Image.NEAREST)
+            return np.asarray(image, dtype=np.uint8)
+    except Exception as e:
+        print(f"⚠️  Erreur lecture {path}: {str(e)}")
+        return None
+
+
+class ImageCache:
+    """Cache d'images décodées relu par memory-mapping."""
+    
+    def __init__(self, path: Path):
+        """
+        Ouvre un cache existant.
+        
+        Args:
+            path: Dossier du cache (contenant index.json)
+        """
+        self.path = Path(path)
+        with open(self.path / INDEX_FILE) as f:
+            self.index = json.load(f)
+        self.key = self.index["key"]
+        self.img_size = tuple(self.index["img_size"])
+        self.classes = self.index["classes"]
+        self.class_indices = {label: i for i, label in enumerate(self.classes)}
+        self.paths = self.index["paths"]
+        self.labels = np.load(self.path / "labels.npy")
+        self.shards = [
+            np.load(self.path / f"shard-{i:05d}.npy", mmap_mode="r")
+            for i in range(len(self.index["shards"]))
+        ]
+        self._offsets = np.cumsum([0] + self.index["shards"])
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def take(self, indices) -> np.ndarray:
+        """
+        Lit un lot d'images.
+        
+        Args:
+            indices: Positions des images dans le cache
+        
+        Returns:
+            Tableau uint8 (n, H, W, 3) dans l'ordre des indices
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        batch = np.empty((len(indices), *self.img_size, 3), dtype=np.uint8)
+        shard_ids = np.searchsorted(self._offsets, indices, side="right") - 1
+        # Lecture groupée par shard, dans l'ordre du fichier
+        for shard_id in np.unique(shard_ids):
+            positions = np.flatnonzero(shard_ids == shard_id)
+            local = indices[positions] - self._offsets[shard_id]
+            order = np.argsort(local, kind="stable")
+            batch[positions[order]] = self.shards[shard_id][local[order]]
+        return batch
+
+
+def build_image_cache(
+    data_dir: Path,
+    img_size: tuple,
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+    classes: Optional[List[str]] = None,
+    shard_size: int = 512,
+    workers: int = 4
+) -> ImageCache:
+    """
+    Construit (ou réutilise) le cache des images décodées d'un dataset.
+    
+    Args:
+        data_dir: Dossier des images (un sous-dossier par classe)
+        img_size: Taille cible (hauteur, largeur)
+        cache_dir: Dossier racine des caches
+        classes: Sous-dossiers à prendre en compte (défaut : tous)
+        shard_size: Nombre d'images par shard (borne la mémoire de construction)
+        workers: Threads de décodage
+    
+    Returns:
+        ImageCache à jour
+    """
+    cache_dir = Path(cache_dir)
+    manifest = build_manifest(data_dir, classes)
+    key = manifest_key(manifest, img_size)
+    target = cache_dir / key
+    if (target / INDEX_FILE).exists():
+        print(f"✅ Cache d'images réutilisé: {target}")
+        return ImageCache(target)
+    
+    classes = classes or sorted({e["label"] for e in manifest})
+    tmp = cache_dir / f".{key}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    
+    paths, labels, shards = [], [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(manifest), shard_size):
+            chunk = manifest[start:start + shard_size]
+            images = list(pool.map(lambda e: decode_image(e["path"], img_size), chunk))
+            kept = [(e, image) for e, image in zip(chunk, images) if image is not None]
+            if not kept:
+                continue
+            shard = np.lib.format.open_memmap(
+                tmp / f"shard-{len(shards):05d}.npy", mode="w+", dtype=np.uint8,
+                shape=(len(kept), *img_size, 3)
+            )
+            for i, (_, image) in enumerate(kept):
+                shard[i] = image
+            shard.flush()
+            del shard
+            shards.append(len(kept))
+            paths.extend(e["path"] for e, _ in kept)
+            labels.extend(classes.index(e["label"]) for e, _ in kept)
+    
+    np.save(tmp / "labels.npy", np.asarray(labels, dtype=np.int32))
+    with open(tmp / INDEX_FILE, "w") as f:
+        json.dump({
+            "key": key,
+            "data_dir": str(Path(data_dir).resolve()),
+            "img_size": list(img_size),
+            "classes": classes,
+            "paths": paths,
+            "shards": shards,
+        }, f)
+    
+    # Publication atomique, puis suppression des caches obsolètes du même dataset
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    for other in cache_dir.iterdir():
+        if other == target or not (other / INDEX_FILE).exists():
+            continue
+        with open(other / INDEX_FILE) as f:
+            if json.load(f).get("data_dir") == str(Path(data_dir).resolve()):
+                shutil.rmtree(other, ignore_errors=True)
+    
+    print(f"✅ Cache d'images construit: {len(paths)}/{len(manifest)} images {img_size[0]}x{img_size[1]} -> {target}")
+    return ImageCache(target)
+
+
+def split_indices(
+    cache: ImageCache,
+    validation_split: float,
+    exclude: Optional[set] = None,
+    splits: Optional[Dict[str, str]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sépare train/validation par classe comme `flow_from_directory`
+    (la première fraction `validation_split` de chaque classe va en validation).
+    
+    Args:
+        cache: Cache d'images
+        validation_split: Fraction de validation
+        exclude: Chemins d'images à écarter
+        splits: Sous-ensemble de chaque image ({chemin: "train" | "validation"},
+            voir dataset_manifest) ; remplace la séparation par fraction
+    
+    Returns:
+        (indices d'entraînement, indices de validation)
+    """
+    exclude = exclude or set()
+    if splits is not None:
+        kept = [i for i, path in enumerate(cache.paths) if path not in exclude]
+        validation = [i for i in kept if splits.get(cache.paths[i]) == "validation"]
+        train = [i for i in kept if splits.get(cache.paths[i]) != "validation"]
+        return np.asarray(train, dtype=np.int64), np.asarray(validation, dtype=np.int64)
+    train, validation = [], []
+    for class_id in range(len(cache.classes)):
+        members = [i for i in np.flatnonzero(cache.labels == class_id) if cache.paths[i] not in exclude]
+        split = int(validation_split * len(members))
+        validation.extend(members[:split])
+        train.extend(members[split:])
+    return np.asarray(train, dtype=np.int64), np.asarray(validation, dtype=np.int64)
+
+
+class CachedImageSequence(keras.utils.Sequence):
+    """Lots (images normalisées [0, 1], labels binaires) lus dans un ImageCache."""
+    
+    def __init__(
+        self,
+        cache: ImageCache,
+        indices: np.ndarray,
+        batch_size: int = 32,
+        shuffle: bool = False,
+        augmentation: Optional[Dict] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            cache: Cache d'images
+            indices: Images du sous-ensemble (voir `split_indices`)
+            batch_size: Taille des lots
+            shuffle: Mélanger à chaque epoch
+            augmentation: Paramètres d'augmentation (voir augmentation.py), appliqués par lot
+            seed: Graine du mélange
+        """
+        super().__init__()
+        self.cache = cache
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.augmentation = augmentation
+        self.rng = np.random.default_rng(seed)
+        self.samples = len(self.indices)
+        self.class_indices = cache.class_indices
+        self.classes = cache.labels[self.indices]
+        self.order = self.rng.permutation(self.indices) if shuffle else self.indices
+    
+    def __len__(self) -> int:
+        return math.ceil(self.samples / self.batch_size)
+    
+    def __getitem__(self, i: int):
+        batch_indices = self.order[i * self.batch_size:(i + 1) * self.batch_size]
+        images = self.cache.take(batch_indices)
+        if self.augmentation:
+            images = augment_numpy_batch(images, self.rng, **self.augmentation)
+        images = images.astype(np.float32, copy=False) * (1.0 / 255.0)
+        return images, self.cache.labels[batch_indices].astype(np.float32)
+    
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.order = self.rng.permutation(self.indices)
@@ -0,0 +1,207 @@
+"""
+Détection des quasi-doublons d'images par hash perceptuel (dHash/pHash).
+
+Les hashes 64 bits calculés par `extract_image_features` sont indexés dans
+un BK-tree : les requêtes « tous les hashes à distance de Hamming <= r »
+n'explorent que les sous-arbres compatibles avec l'inégalité triangulaire.
+Le rapport regroupe les images proches ; le filtre garde une image par
+groupe pour l'entraînement.
+
+Usage:
+    python image_dedup.py [--store-path feature_store] [--radius 4] [--output dedup_report.csv]
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from feature_store import FeatureStore, PERCEPTUAL_HASH_COLUMNS
+
+
+DEFAULT_RADIUS = 4
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Nombre de bits différents entre deux hashes."""
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """BK-tree sur des hashes entiers (métrique : distance de Hamming)."""
+    
+    def __init__(self):
+        # Nœuds stockés à plat : hash, élément, enfants {distance: nœud}
+        self._hashes: List[int] = []
+        self._items: List = []
+        self._children: List[Dict[int, int]] = []
+    
+    def __len__(self) -> int:
+        return len(self._hashes)
+    
+    def add(self, value: int, item=None):
+        """
+        Ajoute un hash.
+        
+        Args:
+            value: Hash entier
+            item: Élément associé (ex: chemin de l'image)
+        """
+        node = len(self._hashes)
+        self._hashes.append(value)
+        self._items.append(item)
+        self._children.append({})
+        if node == 0:
+            return
+        current = 0
+        while True:
+            distance = hamming_distance(value, self._hashes[current])
+            child = self._children[current].get(distance)
+            if child is None:
+                self._children[current][distance] = node
+                return
+            current = child
+    
+    def query(self, value: int, radius: int) -> List[Tuple[int, object]]:
+        """
+        Éléments à distance de Hamming <= radius.
+        
+        Args:
+            value: Hash recherché
+            radius: Distance maximale
+        
+        Returns:
+            Liste de (distance, élément)
+        """
+        if not self._hashes:
+            return []
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, self._hashes[node])
+            if distance <= radius:
+                found.append((distance, self._items[node]))
+            # Inégalité triangulaire : seuls les enfants à |d - distance| <= radius peuvent convenir
+            for edge, child in self._children[node].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+def _parse_hash(value) -> Optional[int]:
+    """Hash hexadécimal du store -> entier (None si absent)."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return int(value, 16)
+
+
+def find_duplicate_groups(hashes: Iterable, radius: int = DEFAULT_RADIUS) -> List[int]:
+    """
+    Regroupe les hashes proches autour d'un représentant (premier membre du groupe).
+    
+    Chaque hash rejoint le premier représentant à distance <= radius, sinon il
+    devient lui-même représentant : pas de chaînage, tout membre d'un groupe est
+    à distance <= radius de son représentant.
+    
+    Args:
+        hashes: Hashes entiers ou hexadécimaux (None : image sans hash)
+        radius: Distance de Hamming maximale entre deux quasi-doublons
+    
+    Returns:
+        Numéro de groupe de chaque hash (position du représentant du groupe)
+    """
+    values = [_parse_hash(h) if isinstance(h, str) or h is None else int(h) for h in hashes]
+    groups = list(range(len(values)))
+    
+    # Seuls les représentants sont indexés
+    tree = BKTree()
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        matches = [other for _, other in tree.query(value, radius)]
+        if matches:
+            groups[position] = min(matches)
+        else:
+            tree.add(value, position)
+    return groups
+
+
+def dedup_report(
+    store: FeatureStore,
+    radius: int = DEFAULT_RADIUS,
+    hash_column: str = "phash",
+    label: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Rapport des quasi-doublons du Feature Store.
+    
+    Dans chaque groupe, la première image (ordre des chemins) est conservée,
+    les autres sont marquées à écarter. Un groupe contenant plusieurs labels
+    signale une erreur d'étiquetage probable.
+    
+    Args:
+        store: Feature Store (colonnes de hash remplies par l'extraction)
+        radius: Distance de Hamming maximale entre deux quasi-doublons
+        hash_column: "phash" ou "dhash"
+        label: Restreindre à un label
+    
+    Returns:
+        DataFrame (image_path, label, group, duplicate_of, distance, keep, label_conflict)
+        limité aux images appartenant à un groupe de taille >= 2
+    """
+    if hash_column not in PERCEPTUAL_HASH_COLUMNS:
+        raise ValueError(f"Colonne de hash inconnue: {hash_column} (attendu: {', '.join(PERCEPTUAL_HASH_COLUMNS)})")
+    columns = ["image_path", "label", hash_column]
+    rows = store.get_features(label=label, columns=columns)
+    empty = pd.DataFrame(columns=columns[:2] + ["group", "duplicate_of", "distance", "keep", "label_conflict"])
+    if rows.empty or hash_column not in rows.columns:
+        return empty
+    rows = rows.dropna(subset=[hash_column]).sort_values("image_path").reset_index(drop=True)
+    
+    rows["group"] = find_duplicate_groups(rows[hash_column], radius)
+    sizes = rows["group"].map(rows["group"].value_counts())
+    rows = rows[sizes > 1].copy()
+    if rows.empty:
+        return empty
+    
+    first = rows.groupby("group")["image_path"].transform("first")
+    first_hash = rows.groupby("group")[hash_column].transform("first")
+    rows["duplicate_of"] = first.where(first != rows["image_path"])
+    rows["distance"] = [
+        hamming_distance(int(a, 16), int(b, 16)) for a, b in zip(rows[hash_column], first_hash)
+    ]
+    rows["keep"] = rows["duplicate_of"].isna()
+    rows["label_conflict"] = rows.groupby("group")["label"].transform("nunique") > 1
+    return rows.drop(columns=[hash_column]).reset_index(drop=True)
+
+
+def filter_duplicates(paths: Iterable[str], report: pd.DataFrame) -> List[str]:
+    """
+    Retire des chemins les quasi-doublons marqués à écarter dans le rapport.
+    
+    Args:
+        paths: Chemins des images candidates à l'entraînement
+        report: Rapport de `dedup_report`
+    
+    Returns:
+        Chemins conservés (ordre d'origine)
+    """
+    excluded = set(report.loc[~report["keep"], "image_path"]) if not report.empty else set()
+    return [str(path) for path in paths if str(path) not in excluded]
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Rapport des quasi-doublons du Feature Store")
+    parser.add_argument("--store-path", default="feature_store", help="Dossier du Feature Store")
+    parser.add_argument("--radius", type=int, default=DEFAULT_RADIUS, help="Distance de Hamming maximale")
+    parser.add_argument("--hash", default="phash", choices=PERCEPTUAL_HASH_COLUMNS, help="Hash utilisé")
+    parser.add_argument("--output", default="dedup_report.csv", help="Fichier CSV du rapport")
+    args = parser.parse_args()
+    
+    report = dedup_report(FeatureStore(args.store_path), args.radius, args.hash)
+    report.to_csv(args.output, index=False)
+    print(f"✅ {report['group'].nunique()} groupes de quasi-doublons, "
+          f"{int((~report['keep']).sum())} images à écarter, "
+          f"{report.loc[report['label_conflict'], 'group'].nunique()} groupes avec labels incohérents "
+          f"-> {args.output}")
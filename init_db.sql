@@ -14,13 +14,18 @@ CREATE TABLE IF NOT EXISTS plants_data (
 );
 
 -- Table pour le feature store
+-- Alimentée par feature_sync.py (upsert par image_hash, watermark sur store_timestamp)
 CREATE TABLE IF NOT EXISTS feature_store (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    image_hash CHAR(32) NOT NULL,
     image_path VARCHAR(500) NOT NULL,
     label VARCHAR(50) NOT NULL,
     features JSON,
+    store_timestamp VARCHAR(32),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_image_hash (image_hash),
     INDEX idx_label (label),
-    INDEX idx_image_path (image_path(255))
+    INDEX idx_image_path (image_path(255)),
+    INDEX idx_store_timestamp (store_timestamp)
 );
 
@@ -0,0 +1,186 @@
+"""
+Pipeline d'entrée tf.data pour l'entraînement.
+
+Lecture et décodage des images en parallèle (`num_parallel_calls=AUTOTUNE`),
+images décodées gardées en mémoire (`cache()`), augmentation appliquée par
+lot dans le graphe TensorFlow (voir augmentation.py) et `prefetch()` pour
+recouvrir préparation des données et calcul du modèle.
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+
+from augmentation import augment_batch
+from image_cache import build_manifest
+
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def stratified_split(
+    paths: List[str],
+    labels: List[int],
+    validation_split: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sépare train/validation par classe, de façon stable.
+    
+    Dans chaque classe, les images sont ordonnées par hash de leur nom :
+    la répartition ne dépend ni de l'ordre de listage ni d'une graine, et
+    l'ajout d'images ne déplace qu'une minorité des images existantes.
+    
+    Args:
+        paths: Chemins des images
+        labels: Indice de classe de chaque image
+        validation_split: Fraction de validation (par classe)
+    
+    Returns:
+        (indices d'entraînement, indices de validation)
+    """
+    labels = np.asarray(labels)
+    keys = [hashlib.md5(f"{label}/{Path(path).name}".encode()).hexdigest() for path, label in zip(paths, labels)]
+    train, validation = [], []
+    for label in np.unique(labels):
+        members = sorted(np.flatnonzero(labels == label), key=lambda i: keys[i])
+        split = int(validation_split * len(members))
+        validation.extend(members[:split])
+        train.extend(members[split:])
+    return np.sort(np.asarray(train, dtype=np.int64)), np.sort(np.asarray(validation, dtype=np.int64))
+
+
+def _readable(path: str) -> bool:
+    """En-tête d'image lisible (lecture de l'en-tête seulement, sans décodage)."""
+    try:
+        with Image.open(path):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+def _decode(path: tf.Tensor, img_size: tuple) -> tf.Tensor:
+    """Lit et décode une image (RGB, resize nearest comme flow_from_directory), en uint8."""
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    image = tf.image.resize(image, img_size, method="nearest")
+    image = tf.cast(image, tf.uint8)
+    image.set_shape((*img_size, 3))
+    return image
+
+
+def make_dataset(
+    paths: List[str],
+    labels: List[int],
+    img_size: tuple,
+    batch_size: int = 32,
+    training: bool = False,
+    augmentation: Optional[Dict] = None,
+    seed: Optional[int] = None,
+    cache: bool = True
+) -> tf.data.Dataset:
+    """
+    Construit le pipeline d'un sous-ensemble d'images.
+    
+    Args:
+        paths: Chemins des images
+        labels: Labels binaires (0/1)
+        img_size: Taille cible (hauteur, largeur)
+        batch_size: Taille des lots
+        training: Mélanger à chaque epoch
+        augmentation: Paramètres d'augmentation (None : aucune)
+        seed: Graine du mélange
+        cache: Garder les images décodées (uint8) en mémoire après la première epoch
+    
+    Returns:
+        Dataset de lots (images float32 [0, 1], labels float32)
+    """
+    dataset = tf.data.Dataset.from_tensor_slices((list(paths), np.asarray(labels, dtype=np.float32)))
+    dataset = dataset.map(lambda path, label: (_decode(path, img_size), label), num_parallel_calls=AUTOTUNE)
+    dataset = dataset.ignore_errors()
+    if cache:
+        dataset = dataset.cache()
+    if training:
+        dataset = dataset.shuffle(max(1, len(paths)), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(
+        lambda images, labels: (tf.cast(images, tf.float32) * (1.0 / 255.0), labels),
+        num_parallel_calls=AUTOTUNE
+    )
+    if augmentation:
+        dataset = dataset.map(
+            lambda images, labels: (augment_batch(images, **augmentation), labels),
+            num_parallel_calls=AUTOTUNE
+        )
+    return dataset.prefetch(AUTOTUNE)
+
+
+def load_datasets(
+    data_dir: Path,
+    img_size: tuple,
+    validation_split: float,
+    batch_size: int = 32,
+    augmentation: Optional[Dict] = None,
+    exclude: Optional[set] = None,
+    seed: Optional[int] = None,
+    train_subset: Optional[set] = None,
+    splits: Optional[Dict[str, str]] = None
+) -> Tuple[tf.data.Dataset, tf.data.Dataset]:
+    """
+    Datasets d'entraînement et de validation d'un dossier organisé par classe.
+    
+    Les datasets exposent `class_indices` et `samples` comme les générateurs
+    Keras qu'ils remplacent, `paths` et `labels` (images du sous-ensemble et
+    indice de classe de chacune).
+    
+    Les fichiers dont l'en-tête est illisible sont écartés (et comptés) avant
+    la séparation. Une image corrompue au-delà de l'en-tête n'est écartée
+    qu'au décodage (`ignore_errors`) : `samples` est alors un majorant.
+    
+    Args:
+        data_dir: Dossier des images (un sous-dossier par classe)
+        img_size: Taille cible (hauteur, largeur)
+        validation_split: Fraction de validation
+        batch_size: Taille des lots
+        augmentation: Paramètres d'augmentation des images d'entraînement
+        exclude: Chemins d'images à écarter
+        seed: Graine du mélange
+        train_subset: Images d'entraînement retenues (None : toutes) ; la
+            séparation train/validation n'en dépend pas (ex: warm start)
+        splits: Sous-ensemble de chaque image ({chemin: "train" | "validation"},
+            voir dataset_manifest) ; None : `stratified_split`
+    
+    Returns:
+        (train_dataset, validation_dataset)
+    """
+    exclude = exclude or set()
+    manifest = [e for e in build_manifest(data_dir) if e["path"] not in exclude]
+    unreadable = {e["path"] for e in manifest if not _readable(e["path"])}
+    if unreadable:
+        print(f"⚠️  {len(unreadable)} images illisibles écartées (ex: {min(unreadable)})")
+        manifest = [e for e in manifest if e["path"] not in unreadable]
+    classes = sorted({e["label"] for e in manifest})
+    class_indices = {label: i for i, label in enumerate(classes)}
+    paths = [e["path"] for e in manifest]
+    labels = [class_indices[e["label"]] for e in manifest]
+    if splits is not None:
+        is_validation = np.asarray([splits.get(path) == "validation" for path in paths], dtype=bool)
+        train_indices, validation_indices = np.flatnonzero(~is_validation), np.flatnonzero(is_validation)
+    else:
+        train_indices, validation_indices = stratified_split(paths, labels, validation_split)
+    if train_subset is not None:
+        train_indices = np.asarray([i for i in train_indices if paths[i] in train_subset], dtype=np.int64)
+    
+    datasets = []
+    for indices, training in [(train_indices, True), (validation_indices, False)]:
+        dataset = make_dataset(
+            [paths[i] for i in indices], [labels[i] for i in indices], img_size, batch_size,
+            training=training, augmentation=augmentation if training else None, seed=seed
+        )
+        dataset.class_indices = class_indices
+        dataset.samples = len(indices)
+        dataset.paths = [paths[i] for i in indices]
+        dataset.labels = [labels[i] for i in indices]
+        datasets.append(dataset)
+    return tuple(datasets)
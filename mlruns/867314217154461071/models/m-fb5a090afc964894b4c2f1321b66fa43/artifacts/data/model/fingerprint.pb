@@ -0,0 +1 @@
+ǿΩ|ʟ2ƒ2 μתa(X2
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Variantes d'architecture du classifieur (pissenlit vs herbe).
+
+- "baseline" : 3 blocs Conv2D + Flatten -> Dense(128) (≈11M paramètres en 224x224,
+  presque tous dans la couche Dense)
+- "gap" : mêmes blocs, tête GlobalAveragePooling2D -> Dense(128)
+- "separable" : blocs 2 et 3 en convolutions séparables en profondeur
+  (depthwise + pointwise, BatchNormalization), tête GlobalAveragePooling2D
+
+Le nombre de filtres de chaque bloc est multiplié par `width_multiplier`.
+Toutes les variantes gardent la couche Dense(128) utilisée pour les
+embeddings (voir feature_embeddings.py).
+"""
+from tensorflow import keras
+from tensorflow.keras import layers
+
+
+ARCHITECTURES = ["baseline", "gap", "separable"]
+BLOCK_FILTERS = [32, 64, 128]
+EMBEDDING_UNITS = 128
+
+
+def _filters(filters: int, width_multiplier: float) -> int:
+    """Filtres d'un bloc après application du multiplicateur (au moins 8)."""
+    return max(8, int(round(filters * width_multiplier)))
+
+
+def build_model(
+    input_shape: tuple,
+    architecture: str = "baseline",
+    width_multiplier: float = 1.0,
+    num_classes: int = 1
+) -> keras.Model:
+    """
+    Construit (sans compiler) une variante du modèle.
+    
+    Args:
+        input_shape: Forme d'entrée (hauteur, largeur, canaux)
+        architecture: Variante (voir ARCHITECTURES)
+        width_multiplier: Multiplicateur du nombre de filtres des blocs convolutionnels
+        num_classes: Nombre de sorties (1 : classification binaire, sigmoid)
+    
+    Returns:
+        Modèle Keras
+    """
+    if architecture not in ARCHITECTURES:
+        raise ValueError(f"Architecture inconnue: {architecture} (attendu: {', '.join(ARCHITECTURES)})")
+    filters = [_filters(f, width_multiplier) for f in BLOCK_FILTERS]
+    
+    blocks = []
+    for i, block_filters in enumerate(filters):
+        # Le premier bloc reste une convolution standard (3 canaux d'entrée seulement)
+        if architecture == "separable" and i > 0:
+            # Normalisation avant ReLU, sans quoi ces blocs apprennent mal ; momentum
+            # réduit : le dataset ne fait que quelques dizaines de pas par entraînement
+            blocks.append(layers.SeparableConv2D(block_filters, (3, 3), use_bias=False))
+            blocks.append(layers.BatchNormalization(momentum=0.9))
+            blocks.append(layers.ReLU())
+        else:
+            blocks.append(layers.Conv2D(block_filters, (3, 3), activation='relu'))
+        blocks.append(layers.MaxPooling2D(2, 2))
+    
+    head = layers.Flatten() if architecture == "baseline" else layers.GlobalAveragePooling2D()
+    activation = 'sigmoid' if num_classes == 1 else 'softmax'
+    name = architecture if width_multiplier == 1.0 else f"{architecture}_x{width_multiplier:g}"
+    return keras.Sequential([
+        keras.Input(shape=input_shape),
+        *blocks,
+        head,
+        layers.Dense(EMBEDDING_UNITS, activation='relu'),
+        layers.Dropout(0.5),
+        layers.Dense(num_classes, activation=activation),
+    ], name=name)
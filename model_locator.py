@@ -0,0 +1,259 @@
+"""
+Localisation des modèles enregistrés, sans parcourir mlruns.
+
+Le chemin des artefacts d'un modèle est résolu par l'API MLflow à partir
+d'un identifiant de run ou d'une version du registre : le coût ne dépend
+pas du nombre de runs accumulés dans mlruns.
+
+Après chaque enregistrement, train.py met à jour un index compact
+(`mlruns/model_index.json`, copié dans Minio sous
+`models/<modèle>/index.json`) :
+
+    {"name": ..., "latest": "3",
+     "versions": {"3": {"path": "1/<run_id>/artifacts/model", "run_id": ...,
+                        "created": <ms>, "s3_path": "models/<modèle>/<run_id>"}}}
+
+Les chemins sous le dossier de l'index y sont relatifs : l'index reste
+valide quand mlruns est copié ailleurs (image Docker, artefact CI). Les
+entrypoints et les DAGs lisent cet index (une lecture de fichier) via la
+ligne de commande :
+
+    python model_locator.py path                 # chemin local du dernier modèle
+    python model_locator.py download --output D  # copie Minio du dernier modèle
+    python model_locator.py update               # reconstruit l'entrée depuis le registre
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    from mlflow.tracking import MlflowClient
+    from mlflow.utils.file_utils import local_file_uri_to_path
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+
+MODEL_NAME = "dandelion_vs_grass_classifier"
+PRODUCTION_ALIAS = "production"
+INDEX_FILE = "model_index.json"
+DEFAULT_INDEX = Path("mlruns") / INDEX_FILE
+
+
+def s3_index_key(name: str = MODEL_NAME) -> str:
+    """Clé Minio de la copie de l'index."""
+    return f"models/{name}/index.json"
+
+
+def get_model_version(client, name: str = MODEL_NAME, version: Optional[str] = None):
+    """
+    Version du registre : celle demandée, à défaut l'alias `production`, à
+    défaut la dernière version enregistrée.
+    
+    Returns:
+        ModelVersion MLflow, None si aucun modèle n'est enregistré
+    """
+    if version is not None:
+        return client.get_model_version(name, str(version))
+    try:
+        return client.get_model_version_by_alias(name, PRODUCTION_ALIAS)
+    except Exception:
+        # Une seule version lue, quel que soit le nombre de versions
+        versions = client.search_model_versions(
+            f"name='{name}'", max_results=1, order_by=["version_number DESC"]
+        )
+        return versions[0] if versions else None
+
+
+def resolve_version_uri(client, model_version) -> str:
+    """
+    URI des artefacts d'une version du registre (dossier contenant MLmodel).
+    
+    Les versions enregistrées depuis un run ont pour source ce dossier ;
+    celles créées par `log_model` (MLflow 3) pointent vers un LoggedModel.
+    """
+    source = model_version.source
+    if source.startswith("models:/"):
+        model_id = model_version.model_id or source[len("models:/"):].split("/")[0]
+        return client.get_logged_model(model_id).artifact_location
+    return source
+
+
+def resolve_run_uri(client, run_id: str, artifact_path: str = "model") -> str:
+    """
+    URI des artefacts du modèle d'un run.
+    
+    Args:
+        client: MlflowClient
+        run_id: Identifiant du run
+        artifact_path: Chemin du modèle dans les artefacts du run
+    """
+    run = client.get_run(run_id)
+    if any(f.path.endswith("MLmodel") for f in client.list_artifacts(run_id, artifact_path)):
+        return f"{run.info.artifact_uri.rstrip('/')}/{artifact_path}"
+    # Modèle loggé par log_model (MLflow 3) : LoggedModel rattaché au run
+    models = client.search_logged_models(
+        [run.info.experiment_id], filter_string=f"source_run_id='{run_id}'", max_results=1
+    )
+    if not models:
+        raise FileNotFoundError(f"Aucun modèle '{artifact_path}' dans le run {run_id}")
+    return models[0].artifact_location
+
+
+def read_index(path: Path = DEFAULT_INDEX) -> Dict:
+    """Lit l'index (structure vide s'il n'existe pas)."""
+    path = Path(path)
+    if not path.exists():
+        return {"name": MODEL_NAME, "latest": None, "versions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_index(index: Dict, path: Path):
+    """Écrit l'index de façon atomique (fichier temporaire puis os.replace)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _relative_path(uri: str, root: Path) -> str:
+    """Chemin local relatif au dossier de l'index si possible, URI sinon."""
+    if "://" in uri and not uri.startswith("file:"):
+        return uri
+    local = Path(local_file_uri_to_path(uri)).resolve()
+    try:
+        return str(local.relative_to(root.resolve()))
+    except ValueError:
+        return str(local)
+
+
+def update_index(
+    client,
+    name: str = MODEL_NAME,
+    version: Optional[str] = None,
+    path: Path = DEFAULT_INDEX,
+    s3_path: Optional[str] = None
+) -> Dict:
+    """
+    Ajoute (ou remplace) l'entrée d'une version du registre dans l'index.
+    
+    Args:
+        client: MlflowClient
+        name: Nom du modèle enregistré
+        version: Version (défaut : alias production, à défaut la dernière)
+        path: Fichier de l'index
+        s3_path: Préfixe Minio de la copie du modèle (défaut : param `s3_model_path` du run)
+    
+    Returns:
+        Entrée de la version {"version", "path", "run_id", "created", "s3_path"}
+    """
+    path = Path(path)
+    model_version = get_model_version(client, name, version)
+    if model_version is None:
+        raise LookupError(f"Aucune version enregistrée pour {name}")
+    if s3_path is None and model_version.run_id:
+        s3_path = client.get_run(model_version.run_id).data.params.get("s3_model_path")
+    
+    entry = {
+        "path": _relative_path(resolve_version_uri(client, model_version), path.parent),
+        "run_id": model_version.run_id,
+        "created": model_version.creation_timestamp,
+        "s3_path": s3_path,
+    }
+    index = read_index(path)
+    index["name"] = name
+    index["versions"][str(model_version.version)] = entry
+    index["latest"] = max(index["versions"], key=int)
+    _write_index(index, path)
+    return {"version": str(model_version.version), **entry}
+
+
+def lookup(index: Dict, version: Optional[str] = None) -> Dict:
+    """
+    Entrée d'une version de l'index (défaut : la dernière).
+    
+    Returns:
+        {"version", "path", "run_id", "created", "s3_path"}
+    """
+    version = str(version) if version is not None else index.get("latest")
+    if version is None or version not in index["versions"]:
+        raise LookupError(f"Version {version} absente de l'index")
+    return {"version": version, **index["versions"][version]}
+
+
+def local_model_path(version: Optional[str] = None, path: Path = DEFAULT_INDEX) -> str:
+    """
+    Dossier local (ou URI distante) du modèle d'une version de l'index.
+    
+    Sans index, l'entrée est reconstruite depuis le registre MLflow.
+    """
+    path = Path(path)
+    if not path.exists() or (version is not None and str(version) not in read_index(path)["versions"]):
+        if not MLFLOW_AVAILABLE:
+            raise FileNotFoundError(f"Index {path} absent et MLflow non disponible")
+        update_index(MlflowClient(), version=version, path=path)
+    entry = lookup(read_index(path), version)
+    if "://" in entry["path"] or os.path.isabs(entry["path"]):
+        return entry["path"]
+    return str(path.parent / entry["path"])
+
+
+def publish_index(minio_client, path: Path = DEFAULT_INDEX, name: str = MODEL_NAME) -> bool:
+    """Copie l'index dans Minio (lu par entrypoint_s3.sh sans lister le bucket)."""
+    return minio_client.upload_file(str(path), s3_index_key(name))
+
+
+def download_model(
+    minio_client,
+    local_dir: str,
+    version: Optional[str] = None,
+    name: str = MODEL_NAME
+) -> Dict:
+    """
+    Télécharge la copie Minio d'une version d'après l'index publié dans Minio.
+    
+    Returns:
+        Entrée de la version
+    """
+    index_path = Path(local_dir) / INDEX_FILE
+    if not minio_client.download_file(s3_index_key(name), str(index_path)):
+        raise FileNotFoundError(f"Index {s3_index_key(name)} absent de Minio")
+    entry = lookup(read_index(index_path), version)
+    if not entry.get("s3_path"):
+        raise LookupError(f"Version {entry['version']} sans copie Minio")
+    if not minio_client.download_directory(entry["s3_path"], local_dir):
+        raise FileNotFoundError(f"Aucun fichier sous {entry['s3_path']}")
+    return entry
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    
+    parser = argparse.ArgumentParser(description="Localisation des modèles enregistrés")
+    parser.add_argument("command", choices=["path", "download", "update"],
+                        help="path: chemin local, download: copie Minio, update: entrée depuis le registre")
+    parser.add_argument("--version", default=None, help="Version du registre (défaut : la dernière)")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX), help="Fichier de l'index")
+    parser.add_argument("--output", default="mlruns_model", help="Dossier de destination (download)")
+    args = parser.parse_args()
+    
+    try:
+        if args.command == "path":
+            print(local_model_path(args.version, Path(args.index)))
+        elif args.command == "download":
+            from utils_s3 import get_minio_client
+            
+            entry = download_model(get_minio_client(), args.output, args.version)
+            print(f"✅ Modèle v{entry['version']} téléchargé depuis {entry['s3_path']}", file=sys.stderr)
+            print(args.output)
+        else:
+            entry = update_index(MlflowClient(), version=args.version, path=Path(args.index))
+            print(f"✅ Index {args.index}: v{entry['version']} -> {entry['path']}")
+    except Exception as e:
+        print(f"❌ {str(e)}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,169 @@
+"""
+Phase post-entraînement exécutée comme un graphe d'étapes concurrentes.
+
+Après `model.fit`, le logging MLflow, l'enregistrement du modèle, l'upload
+Minio et l'extraction des features sont indépendants pour la plupart :
+chaque étape déclare ses dépendances et démarre dès qu'elles ont réussi,
+dans un pool de threads (les étapes attendent surtout des E/S : serveur
+MLflow, Minio, pool de processus du feature store).
+
+Une étape en échec n'interrompt pas les autres : ses dépendantes sont
+sautées et le rapport donne le statut, la durée et l'erreur de chaque
+étape.
+
+Les étapes n'utilisent pas l'API « fluent » de MLflow (run actif propre à
+chaque thread) mais `MlflowClient` avec l'identifiant du run.
+"""
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from mlflow.entities import Metric
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+
+SUCCESS, FAILED, SKIPPED = "success", "failed", "skipped"
+# Limite de métriques par appel log_batch (API REST MLflow)
+MAX_METRICS_PER_BATCH = 1000
+
+
+class StageGraph:
+    """Étapes nommées avec dépendances, exécutées en parallèle dès que possible."""
+    
+    def __init__(self, max_workers: int = 4):
+        """
+        Args:
+            max_workers: Nombre d'étapes exécutées simultanément
+        """
+        self.max_workers = max_workers
+        self.stages = {}
+    
+    def add(self, name: str, func: Callable[[], object], after: Iterable[str] = ()) -> "StageGraph":
+        """
+        Ajoute une étape.
+        
+        Args:
+            name: Nom de l'étape (clé du rapport)
+            func: Fonction sans argument ; sa valeur de retour est gardée dans le rapport
+            after: Étapes qui doivent avoir réussi avant de démarrer celle-ci
+        """
+        if name in self.stages:
+            raise ValueError(f"Étape déjà définie: {name}")
+        after = list(after)
+        unknown = [d for d in after if d not in self.stages]
+        if unknown:
+            # Les dépendances doivent précéder l'étape : pas de cycle possible
+            raise ValueError(f"Dépendances inconnues pour {name}: {unknown}")
+        self.stages[name] = (func, after)
+        return self
+    
+    def run(self) -> Dict[str, Dict]:
+        """
+        Exécute le graphe.
+        
+        Returns:
+            {étape: {"status": "success" | "failed" | "skipped", "seconds",
+            "started" (secondes depuis le début du graphe), "result", "error"}}
+        """
+        report = {}
+        pending = dict(self.stages)
+        running = {}
+        start = time.perf_counter()
+        
+        def execute(name, func):
+            started = time.perf_counter()
+            entry = {"status": SUCCESS, "started": started - start, "result": None, "error": None}
+            try:
+                entry["result"] = func()
+            except Exception as e:
+                entry["status"] = FAILED
+                entry["error"] = f"{type(e).__name__}: {e}"
+                entry["traceback"] = traceback.format_exc()
+            entry["seconds"] = time.perf_counter() - started
+            return entry
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="post-training") as pool:
+            while pending or running:
+                for name, (func, after) in list(pending.items()):
+                    failed = [d for d in after if d in report and report[d]["status"] != SUCCESS]
+                    if failed:
+                        report[name] = {
+                            "status": SKIPPED, "started": None, "seconds": 0.0, "result": None,
+                            "error": f"dépendance en échec: {', '.join(failed)}",
+                        }
+                        del pending[name]
+                    elif all(d in report for d in after):
+                        running[pool.submit(execute, name, func)] = name
+                        del pending[name]
+                if not running:
+                    # Sauts en cascade : réévaluer les étapes restantes
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report[running.pop(future)] = future.result()
+        
+        return {name: report[name] for name in self.stages}
+
+
+def print_report(report: Dict[str, Dict]):
+    """Affiche le statut et la durée de chaque étape."""
+    icons = {SUCCESS: "✅", FAILED: "❌", SKIPPED: "⏭️ "}
+    for name, entry in report.items():
+        line = f"   {icons[entry['status']]} {name}: {entry['status']}"
+        if entry["status"] != SKIPPED:
+            line += f" ({entry['seconds']:.1f}s)"
+        if entry["error"]:
+            line += f" - {entry['error']}"
+        print(line)
+
+
+def report_summary(report: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Rapport sérialisable en JSON (sans les valeurs de retour ni les tracebacks)."""
+    return {
+        name: {k: entry.get(k) for k in ["status", "started", "seconds", "error"]}
+        for name, entry in report.items()
+    }
+
+
+def history_metrics(
+    history: Dict[str, List[float]],
+    timestamp: Optional[int] = None,
+    epochs: Optional[List[int]] = None
+) -> List["Metric"]:
+    """
+    Métriques MLflow d'un historique Keras (une par epoch et par métrique).
+    
+    Les clés Keras sont renommées comme dans les runs existants : `loss` et
+    `accuracy` deviennent `train_loss` et `train_accuracy`.
+    
+    Args:
+        history: `History.history` ({"loss": [...], "val_loss": [...], ...})
+        timestamp: Horodatage en millisecondes (défaut : maintenant)
+        epochs: Numéro de chaque epoch (`History.epoch`, décalé après une
+            reprise) ; défaut : 0, 1, ...
+    """
+    timestamp = timestamp if timestamp is not None else int(time.time() * 1000)
+    metrics = []
+    for key, values in history.items():
+        name = key if key.startswith("val_") else f"train_{key}"
+        for i, value in enumerate(values):
+            metrics.append(Metric(name, float(value), timestamp, epochs[i] if epochs else i))
+    return metrics
+
+
+def log_metrics_batched(client, run_id: str, metrics: List["Metric"]) -> int:
+    """
+    Logge des métriques en quelques appels `log_batch` au lieu d'un appel par valeur.
+    
+    Returns:
+        Nombre d'appels au serveur MLflow
+    """
+    calls = 0
+    for i in range(0, len(metrics), MAX_METRICS_PER_BATCH):
+        client.log_batch(run_id, metrics=metrics[i:i + MAX_METRICS_PER_BATCH])
+        calls += 1
+    return calls
@@ -3,6 +3,7 @@ Tests unitaires pour le pipeline MLOps
 Tests des fonctions individuelles sans dépendances externes
 """
 import unittest
+import tempfile
 import sys
 from pathlib import Path
 import numpy as np
@@ -53,6 +54,1412 @@ class TestFeatureStore(unittest.TestCase):
             self.assertIsNotNone(store)
         except Exception:
             self.skipTest("Feature Store non disponible ou erreur")
+    
+    def test_feature_store_append_only_segments(self):
+        """Test que chaque ajout crée un segment sans réécrire la base"""
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir, compaction_fanout=4)
+            for i in range(3):
+                store.add_features(f"img_{i}.jpg", "grass", {"mean_r": float(i)})
+            
+            self.assertFalse(store.features_file.exists())
+            self.assertEqual(len(list(store.segments_dir.glob("seg-*.parquet"))), 3)
+            self.assertEqual(len(store.df), 3)
+            
+            # Le 4e segment déclenche la fusion en un segment de niveau 1
+            store.add_features("img_3.jpg", "grass", {"mean_r": 3.0})
+            segments = list(store.segments_dir.glob("seg-*.parquet"))
+            self.assertEqual(len(segments), 1)
+            self.assertTrue(segments[0].name.startswith("seg-L1-"))
+    
+    def test_feature_store_auto_compaction(self):
+        """Test la compaction automatique au-delà de `compaction_rows` lignes non compactées"""
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir, compaction_rows=3)
+            store.add_features("a.jpg", "grass", {"mean_r": 1.0})
+            store.add_features("b.jpg", "grass", {"mean_r": 2.0})
+            self.assertEqual(len(store._segment_frames), 2)
+            
+            # Mise à jour : les versions remplacées sont lues segment par segment
+            store.add_features("a.jpg", "grass", {"mean_r": 10.0})
+            self.assertEqual(store._segment_frames, [])
+            self.assertEqual(list(store.segments_dir.glob("seg-*.parquet")), [])
+            self.assertEqual(sorted(FeatureStore(tmp_dir).df["mean_r"].tolist()), [2.0, 10.0])
+            self.assertEqual(store.get_statistics()["total_features"], 2)
+    
+    def test_feature_store_upsert_and_delete(self):
+        """Test que la dernière écriture gagne et que les tombstones sont persistées"""
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features("a.jpg", "grass", {"mean_r": 1.0})
+            store.add_features("b.jpg", "dandelion", {"mean_r": 2.0})
+            store.add_features("a.jpg", "grass", {"mean_r": 10.0})
+            self.assertTrue(store.delete_features("b.jpg"))
+            
+            reloaded = FeatureStore(tmp_dir)
+            self.assertEqual(len(reloaded.df), 1)
+            self.assertEqual(reloaded.get_features("a.jpg")["mean_r"].tolist(), [10.0])
+            self.assertTrue(reloaded.get_features("b.jpg").empty)
+    
+    def test_feature_store_compaction(self):
+        """Test que la compaction fusionne segments et tombstones dans la base"""
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features("a.jpg", "grass", {"mean_r": 1.0})
+            store.add_features("b.jpg", "dandelion", {"mean_r": 2.0})
+            store.delete_features("a.jpg")
+            store.compact()
+            
+            self.assertEqual(len(list(store.dataset_dir.glob("label=*/ingest_date=*/part-*.parquet"))), 2)
+            self.assertEqual(list(store.segments_dir.glob("seg-*.parquet")), [])
+            self.assertFalse(store.tombstones_file.exists())
+            
+            reloaded = FeatureStore(tmp_dir)
+            self.assertEqual(reloaded.df["image_path"].tolist(), ["b.jpg"])
+            self.assertNotIn("_seq", reloaded.df.columns)
+    
+    def test_feature_store_add_batch_dedupes(self):
+        """Test l'ajout en lot : dédoublonnage par image_hash et un seul segment"""
+        import pandas as pd
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            batch = pd.DataFrame({
+                "image_path": ["a.jpg", "b.jpg", "a.jpg"],
+                "label": ["grass", "dandelion", "grass"],
+                "mean_r": [1.0, 2.0, 3.0],
+            })
+            self.assertEqual(store.add_features_batch(batch), 2)
+            self.assertEqual(len(list(store.segments_dir.glob("seg-*.parquet"))), 1)
+            self.assertEqual(store.get_features("a.jpg")["mean_r"].tolist(), [3.0])
+            
+            rows = [{"image_path": "c.jpg", "label": "grass", "features": {"mean_r": 4.0}}]
+            self.assertEqual(store.add_features_batch(rows), 1)
+            self.assertEqual(len(FeatureStore(tmp_dir).df), 3)
+    
+    def test_feature_store_writer_session(self):
+        """Test que la session d'écriture ne persiste qu'à la sortie du bloc"""
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            with store.writer() as writer:
+                for i in range(5):
+                    writer.add(f"img_{i}.jpg", "grass", {"mean_r": float(i)})
+                self.assertEqual(list(store.segments_dir.glob("seg-*.parquet")), [])
+            self.assertEqual(writer.committed, 5)
+            self.assertEqual(len(list(store.segments_dir.glob("seg-*.parquet"))), 1)
+            
+            # Une exception dans le bloc annule les ajouts bufferisés
+            with self.assertRaises(RuntimeError):
+                with store.writer() as writer:
+                    writer.add("img_x.jpg", "grass", {"mean_r": 0.0})
+                    raise RuntimeError("boom")
+            self.assertEqual(len(store.df), 5)
+    
+    def test_feature_store_indexed_lookups(self):
+        """Test les recherches indexées par image, label et en lot"""
+        from feature_store import FeatureStore, _image_hash
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features_batch([
+                {"image_path": f"img_{i}.jpg", "label": "grass" if i % 2 else "dandelion",
+                 "features": {"mean_r": float(i)}}
+                for i in range(6)
+            ])
+            
+            one = store.get_features("img_3.jpg", columns=["label", "mean_r"])
+            self.assertEqual(list(one.columns), ["label", "mean_r"])
+            self.assertEqual(one["mean_r"].tolist(), [3.0])
+            self.assertTrue(store.get_features("img_3.jpg", label="dandelion").empty)
+            self.assertTrue(store.get_features("missing.jpg").empty)
+            self.assertEqual(store.get_features(label="grass")["mean_r"].tolist(), [1.0, 3.0, 5.0])
+            
+            hashes = [_image_hash("img_4.jpg"), "unknown", _image_hash("img_0.jpg")]
+            self.assertEqual(store.get_many(hashes)["image_path"].tolist(), ["img_4.jpg", "img_0.jpg"])
+            
+            # Les index suivent les nouvelles écritures
+            store.add_features("img_3.jpg", "grass", {"mean_r": 30.0})
+            self.assertEqual(store.get_features("img_3.jpg")["mean_r"].tolist(), [30.0])
+            
+            # Le DataFrame renvoyé sans filtre est une copie de la vue interne
+            everything = store.get_features()
+            everything["mean_r"] = -1.0
+            everything.drop(columns=["label"], inplace=True)
+            self.assertEqual(store.get_features("img_3.jpg")["mean_r"].tolist(), [30.0])
+            self.assertEqual(sorted(store.get_features(label="grass")["mean_r"].tolist()), [1.0, 5.0, 30.0])
+    
+    def test_feature_store_partitioned_pushdown_queries(self):
+        """Test les requêtes label/colonnes/date poussées au scan de la base partitionnée"""
+        import time
+        import pandas as pd
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features_batch(pd.DataFrame({"image_path": ["old.jpg"], "label": ["grass"], "mean_r": [1.0]}))
+            time.sleep(0.01)
+            since = store.snapshot()
+            # Un horodatage fourni par l'appelant est remplacé par celui de l'ingestion
+            store.add_features_batch(pd.DataFrame({
+                "image_path": ["new_1.jpg", "new_2.jpg"],
+                "label": ["grass", "dandelion"],
+                "timestamp": ["2020-01-01T00:00:00.000000"] * 2,
+                "mean_r": [2.0, 3.0],
+            }))
+            store.compact()
+            partitions = {p.relative_to(store.dataset_dir).parts[:2]
+                          for p in store.dataset_dir.rglob("*.parquet")}
+            self.assertIn(("label=grass", f"ingest_date={since[:10]}"), partitions)
+            
+            # La base n'est pas chargée à l'ouverture
+            reloaded = FeatureStore(tmp_dir)
+            grass = reloaded.get_features(label="grass", columns=["image_path", "mean_r"], since=since)
+            self.assertIsNone(reloaded._df)
+            self.assertEqual(list(grass.columns), ["image_path", "mean_r"])
+            self.assertEqual(grass["image_path"].tolist(), ["new_1.jpg"])
+            self.assertEqual(reloaded.get_features("new_2.jpg")["label"].tolist(), ["dandelion"])
+    
+    def test_feature_store_snapshot_reads(self):
+        """Test les lectures à une date donnée après mise à jour et suppression"""
+        import time
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features("a.jpg", "grass", {"mean_r": 1.0})
+            store.add_features("b.jpg", "grass", {"mean_r": 2.0})
+            store.compact()
+            snapshot = store.snapshot()
+            time.sleep(0.01)
+            store.add_features("a.jpg", "dandelion", {"mean_r": 10.0})
+            store.delete_features("b.jpg")
+            store.compact()
+            
+            reloaded = FeatureStore(tmp_dir)
+            now = reloaded.get_features(columns=["image_path", "label", "mean_r"])
+            self.assertEqual(now.values.tolist(), [["a.jpg", "dandelion", 10.0]])
+            before = reloaded.get_features(label="grass", as_of=snapshot, columns=["image_path", "mean_r"])
+            self.assertEqual(sorted(before.values.tolist()), [["a.jpg", 1.0], ["b.jpg", 2.0]])
+            
+            # vacuum supprime l'historique mais garde l'état courant
+            reloaded.vacuum()
+            self.assertEqual(FeatureStore(tmp_dir).df["mean_r"].tolist(), [10.0])
+    
+    def test_feature_store_migrates_legacy_file(self):
+        """Test la migration de l'ancien features.parquet vers le dataset partitionné"""
+        import pandas as pd
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pd.DataFrame({
+                "image_hash": ["h1"], "image_path": ["a.jpg"], "label": ["grass"],
+                "timestamp": ["2024-01-01T00:00:00"], "mean_r": [1.0],
+            }).to_parquet(Path(tmp_dir) / "features.parquet")
+            store = FeatureStore(tmp_dir)
+            self.assertFalse(store.features_file.exists())
+            self.assertEqual(store.get_features(label="grass")["image_path"].tolist(), ["a.jpg"])
+    
+    def test_feature_store_running_statistics(self):
+        """Test les agrégats maintenus à chaque écriture (comptes, moyenne/variance)"""
+        import numpy as np
+        from feature_store import FeatureStore, merge_statistics
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            rng = np.random.default_rng(0)
+            values = rng.normal(10.0, 3.0, 50)
+            store.add_features_batch([
+                {"image_path": f"{i}.jpg", "label": "grass" if i % 2 else "dandelion",
+                 "features": {"mean_r": float(v), "file_size": 100 + i}}
+                for i, v in enumerate(values)
+            ])
+            store.add_features("0.jpg", "grass", {"mean_r": 99.0, "file_size": 1})
+            store.delete_features("1.jpg")
+            store.compact()
+            
+            live = store.df
+            stats = FeatureStore(tmp_dir).get_statistics(by_label=True)
+            self.assertEqual(stats["total_features"], 49)
+            self.assertEqual(stats["labels"], live["label"].value_counts().to_dict())
+            self.assertNotIn("file_size", stats["features"])
+            self.assertAlmostEqual(stats["features"]["mean_r"]["mean"], live["mean_r"].mean())
+            self.assertAlmostEqual(stats["features"]["mean_r"]["std"], live["mean_r"].std(ddof=0))
+            grass = live[live["label"] == "grass"]["mean_r"]
+            self.assertAlmostEqual(stats["features_by_label"]["grass"]["mean_r"]["std"], grass.std(ddof=0))
+            
+            # Agrégats fusionnables entre stores (shards)
+            with tempfile.TemporaryDirectory() as other_dir:
+                other = FeatureStore(other_dir)
+                other.add_features("z.jpg", "grass", {"mean_r": 0.0})
+                merged = merge_statistics(store.get_statistics(raw=True), other.get_statistics(raw=True))
+                self.assertEqual(merged["labels"]["grass"], stats["labels"]["grass"] + 1)
+                self.assertEqual(merged["moments"]["grass"]["mean_r"][0], len(grass) + 1)
+    
+    def test_feature_store_arrow_backend(self):
+        """Test le backend Arrow IPC mappé en mémoire et la migration depuis Parquet"""
+        import pyarrow as pa
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features_batch([
+                {"image_path": f"{i}.jpg", "label": "grass" if i % 2 else "dandelion", "features": {"mean_r": float(i)}}
+                for i in range(100)
+            ])
+            store.compact()
+            expected = store.get_features(label="grass", columns=["image_path", "mean_r"])
+            
+            with self.assertRaises(ValueError):
+                FeatureStore(tmp_dir, backend="arrow")
+            store.migrate_backend("arrow")
+            self.assertTrue(list(store.dataset_dir.rglob("*.arrow")))
+            self.assertFalse(list(store.dataset_dir.rglob("*.parquet")))
+            
+            reloaded = FeatureStore(tmp_dir)
+            self.assertEqual(reloaded.backend, "arrow")
+            result = reloaded.get_features(label="grass", columns=["image_path", "mean_r"])
+            self.assertEqual(sorted(result.values.tolist()), sorted(expected.values.tolist()))
+            
+            # Lecture sans copie : les colonnes pointent dans les fichiers mappés
+            allocated = pa.total_allocated_bytes()
+            table = reloaded.get_table(label="grass", columns=["image_path", "mean_r"])
+            self.assertEqual(table.num_rows, 50)
+            self.assertEqual(pa.total_allocated_bytes(), allocated)
+            
+            # Les écritures suivantes restent au format Arrow
+            reloaded.add_features("new.jpg", "grass", {"mean_r": -1.0})
+            self.assertEqual(reloaded.get_table(label="grass").num_rows, 51)
+            reloaded.compact()
+            self.assertEqual(len(FeatureStore(tmp_dir, backend="arrow").get_features(label="grass")), 51)
+
+
+class TestFeatureStoreSync(unittest.TestCase):
+    """Tests de la synchronisation vers la table SQL (SQLite à la place de MySQL)"""
+    
+    def test_incremental_sync(self):
+        """Test la réplication incrémentale (upserts, suppressions, watermark)"""
+        try:
+            from sqlalchemy import select
+            from feature_sync import FeatureStoreSync, FEATURE_TABLE
+        except ImportError as e:
+            self.skipTest(f"SQLAlchemy non disponible: {e}")
+        import time
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(str(Path(tmp_dir) / "store"))
+            store.add_features_batch([
+                {"image_path": f"{i}.jpg", "label": "grass", "features": {"mean_r": float(i), "file_size": 10}}
+                for i in range(25)
+            ])
+            sync = FeatureStoreSync(store, f"sqlite:///{tmp_dir}/features.db", chunk_size=10)
+            self.assertEqual(sync.sync()["upserted"], 25)
+            
+            def table_rows():
+                with sync.engine.connect() as conn:
+                    rows = conn.execute(select(FEATURE_TABLE.c.image_path, FEATURE_TABLE.c.label,
+                                               FEATURE_TABLE.c.features)).all()
+                return {path: (label, features) for path, label, features in rows}
+            
+            self.assertEqual(len(table_rows()), 25)
+            self.assertEqual(table_rows()["3.jpg"], ("grass", {"mean_r": 3.0}))
+            
+            # Seules les modifications depuis le watermark sont renvoyées
+            time.sleep(0.01)
+            store.add_features("3.jpg", "dandelion", {"mean_r": 30.0})
+            store.delete_features("4.jpg")
+            store.compact()
+            summary = sync.sync()
+            self.assertEqual((summary["upserted"], summary["deleted"]), (1, 1))
+            rows = table_rows()
+            self.assertEqual(len(rows), 24)
+            self.assertEqual(rows["3.jpg"], ("dandelion", {"mean_r": 30.0}))
+            self.assertEqual(sync.sync()["upserted"], 0)
+            
+            # Resynchronisation complète : les lignes absentes du store sont supprimées
+            with sync.engine.begin() as conn:
+                conn.execute(FEATURE_TABLE.insert().values(
+                    image_hash="x" * 32, image_path="orphan.jpg", label="grass", store_timestamp="0"
+                ))
+            self.assertEqual(sync.sync(full=True)["deleted"], 1)
+            self.assertEqual(len(table_rows()), 24)
+    
+    def test_sync_resumes_inside_same_timestamp_batch(self):
+        """Test la reprise d'une synchronisation interrompue au milieu d'un lot de même horodatage"""
+        try:
+            import pandas as pd
+            from sqlalchemy import event, func, select
+            from feature_sync import FeatureStoreSync, FEATURE_TABLE
+        except ImportError as e:
+            self.skipTest(f"SQLAlchemy non disponible: {e}")
+        from feature_store import FeatureStore
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(str(Path(tmp_dir) / "store"))
+            # Lot DataFrame : toutes les lignes ont le même horodatage
+            store.add_features_batch(pd.DataFrame({
+                "image_path": [f"{i}.jpg" for i in range(25)],
+                "label": ["grass"] * 25,
+                "mean_r": [float(i) for i in range(25)],
+            }))
+            sync = FeatureStoreSync(store, f"sqlite:///{tmp_dir}/features.db", chunk_size=10)
+            
+            upserts = []
+            
+            def interrupt(conn, cursor, statement, parameters, context, executemany):
+                if statement.startswith("INSERT"):
+                    upserts.append(statement)
+                    if len(upserts) == 2:
+                        raise KeyboardInterrupt
+            
+            event.listen(sync.engine, "before_cursor_execute", interrupt)
+            with self.assertRaises(KeyboardInterrupt):
+                sync.sync()
+            event.remove(sync.engine, "before_cursor_execute", interrupt)
+            
+            def count():
+                with sync.engine.connect() as conn:
+                    return conn.execute(select(func.count()).select_from(FEATURE_TABLE)).scalar()
+            
+            # Premier lot committé, watermark au milieu des lignes de même horodatage
+            self.assertEqual(count(), 10)
+            self.assertEqual(sync.sync()["upserted"], 15)
+            self.assertEqual(count(), 25)
+            self.assertEqual(sync.sync()["upserted"], 0)
+            
+            # Un lot horodaté dans le passé par l'appelant est tout de même répliqué
+            store.add_features_batch(pd.DataFrame({
+                "image_path": ["late.jpg"], "label": ["grass"],
+                "timestamp": ["2020-01-01T00:00:00"], "mean_r": [1.0],
+            }))
+            self.assertEqual(sync.sync()["upserted"], 1)
+            self.assertEqual(count(), 26)
+
+
+class TestEmbeddings(unittest.TestCase):
+    """Tests des embeddings CNN stockés dans le Feature Store"""
+    
+    def test_store_embeddings_fixed_size(self):
+        """Test le stockage en colonne Arrow de taille fixe, par version de modèle"""
+        import numpy as np
+        import pyarrow as pa
+        from feature_store import FeatureStore, embedding_matrix
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features_batch([
+                {"image_path": p, "label": "grass", "features": {"mean_r": 1.0}} for p in ["a.jpg", "b.jpg"]
+            ])
+            first = np.arange(256, dtype=np.float32).reshape(2, 128)
+            store.add_embeddings(["a.jpg", "b.jpg"], ["grass", "grass"], first, model_version="v1")
+            store.add_embeddings(["a.jpg"], ["grass"], first[:1] + 1, model_version="v1")
+            store.add_embeddings(["a.jpg"], ["grass"], np.zeros((1, 128)), model_version="v2")
+            store.delete_features("b.jpg")
+            
+            table = FeatureStore(tmp_dir).get_embeddings(model_version="v1")
+            self.assertEqual(table.schema.field("embedding").type, pa.list_(pa.float32(), 128))
+            matrix = embedding_matrix(table)
+            self.assertEqual((matrix.shape, matrix.dtype), ((1, 128), np.float32))
+            np.testing.assert_array_equal(matrix[0], first[0] + 1)
+            # Par défaut : dernière version écrite
+            self.assertEqual(store.get_embeddings().column("model_version").to_pylist(), ["v2"])
+    
+    def test_extract_embeddings_streaming(self):
+        """Test l'extraction par lots jusqu'à la couche Dense(128)"""
+        try:
+            from tensorflow import keras
+            from feature_embeddings import extract_embeddings
+        except ImportError as e:
+            self.skipTest(f"TensorFlow non disponible: {e}")
+        import numpy as np
+        from PIL import Image
+        from feature_store import FeatureStore, embedding_matrix
+        model = keras.Sequential([
+            keras.layers.Conv2D(4, (3, 3), activation='relu', input_shape=(16, 16, 3)),
+            keras.layers.Flatten(),
+            keras.layers.Dense(128, activation='relu'),
+            keras.layers.Dropout(0.5),
+            keras.layers.Dense(1, activation='sigmoid'),
+        ])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for i in range(7):
+                path = Path(tmp_dir) / f"{i}.jpg"
+                Image.fromarray(np.full((20, 20, 3), i * 30, dtype=np.uint8)).save(path)
+                paths.append(str(path))
+            broken = Path(tmp_dir) / "broken.jpg"
+            broken.write_bytes(b"not an image")
+            paths.insert(3, str(broken))
+            
+            store = FeatureStore(str(Path(tmp_dir) / "store"))
+            store.add_features_batch([{"image_path": p, "label": "grass", "features": {}} for p in paths])
+            summary = extract_embeddings(model, paths, ["grass"] * len(paths), store, model_version="run-1",
+                                         img_size=(16, 16), batch_size=3, chunk_size=4)
+            self.assertEqual((summary["stored"], summary["errors"]), (7, 1))
+            
+            table = store.get_embeddings()
+            self.assertEqual(sorted(table.column("image_path").to_pylist()), sorted(p for p in paths if p != str(broken)))
+            embedding = keras.Model(model.inputs, model.layers[2].output)
+            image = np.asarray(Image.open(paths[0]).convert("RGB").resize((16, 16), Image.NEAREST), np.float32) / 255.0
+            position = table.column("image_path").to_pylist().index(paths[0])
+            np.testing.assert_allclose(embedding_matrix(table)[position], embedding(image[None]).numpy()[0], rtol=1e-5)
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Tests de l'index de similarité vectorielle"""
+    
+    def setUp(self):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        centers = rng.normal(scale=3.0, size=(20, 16))
+        self.vectors = (centers[rng.integers(0, 20, 2000)] + rng.normal(size=(2000, 16))).astype(np.float32)
+        self.ids = np.array([f"img{i}" for i in range(len(self.vectors))])
+        self.queries = self.vectors[:20] + 0.01
+        distances = ((self.queries[:, None, :] - self.vectors[None]) ** 2).sum(axis=-1)
+        self.truth = self.ids[np.argsort(distances, axis=1)[:, :5]]
+    
+    def test_exact_index(self):
+        """Test la recherche exacte par blocs et la persistance mmap"""
+        import numpy as np
+        from vector_index import build_index, load_index
+        index = build_index(self.vectors[:1500], self.ids[:1500], kind="exact", block_size=256)
+        index.add(self.vectors[1500:], self.ids[1500:])
+        _, found = index.search(self.queries, k=5)
+        np.testing.assert_array_equal(found, self.truth)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index.save(tmp_dir)
+            loaded = load_index(tmp_dir)
+            self.assertIsInstance(loaded.vectors, np.memmap)
+            np.testing.assert_array_equal(loaded.search(self.queries, k=5)[1], self.truth)
+    
+    def test_ivfpq_index(self):
+        """Test l'index approché IVF-PQ (rappel, ajout incrémental, rechargement)"""
+        import numpy as np
+        from vector_index import IVFPQIndex, load_index
+        index = IVFPQIndex(nlist=16, m=8, nprobe=4, refine=4).train(self.vectors)
+        index.add(self.vectors[:1000], self.ids[:1000]).add(self.vectors[1000:], self.ids[1000:])
+        _, found = index.search(self.queries, k=5)
+        recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(found, self.truth)])
+        self.assertGreater(recall, 0.9)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index.save(tmp_dir)
+            loaded = load_index(tmp_dir)
+            np.testing.assert_array_equal(loaded.search(self.queries, k=5)[1], found)
+            loaded.add(self.queries, ["q"] * len(self.queries))
+            self.assertEqual(loaded.search(self.queries[:1], k=1)[1][0, 0], "q")
+    
+    def test_vectors_from_store(self):
+        """Test l'indexation des colonnes numériques du Feature Store (standardisées)"""
+        import numpy as np
+        from feature_store import FeatureStore
+        from vector_index import build_index, vectors_from_store
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = FeatureStore(tmp_dir)
+            store.add_features_batch([
+                {"image_path": f"{i}.jpg", "label": "grass",
+                 "features": {"mean_r": float(i), "width": 100 + 10 * i, "file_size": 999}}
+                for i in range(10)
+            ])
+            ids, vectors = vectors_from_store(store)
+            self.assertEqual(vectors.shape, (10, 2))
+            np.testing.assert_allclose(vectors.mean(axis=0), 0.0, atol=1e-5)
+            _, found = build_index(vectors, ids).search(vectors[3], k=1)
+            self.assertEqual(found[0, 0], ids[3])
+
+
+class TestImageCache(unittest.TestCase):
+    """Tests du cache d'images décodées (shards memmap)"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp_dir.name) / "data"
+        self.cache_dir = Path(self.tmp_dir.name) / "cache"
+        rng = np.random.default_rng(0)
+        for label in ["dandelion", "grass"]:
+            (self.data_dir / label).mkdir(parents=True)
+            for i in range(5):
+                array = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+                Image.fromarray(array).save(self.data_dir / label / f"{i}.png")
+        (self.data_dir / "grass" / "broken.jpg").write_bytes(b"pas une image")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_cache_matches_decoding_and_is_reused(self):
+        """Test que le cache contient les images décodées et qu'il est réutilisé tel quel"""
+        from image_cache import build_image_cache
+        cache = build_image_cache(self.data_dir, (32, 32), self.cache_dir, shard_size=3)
+        self.assertEqual(len(cache), 10)
+        self.assertEqual(len(cache.shards), 4)
+        self.assertIsInstance(cache.shards[0], np.memmap)
+        self.assertEqual(cache.class_indices, {"dandelion": 0, "grass": 1})
+        
+        indices = [7, 0, 4, 3]
+        expected = np.stack([
+            np.asarray(Image.open(cache.paths[i]).convert("RGB").resize((32, 32), Image.NEAREST))
+            for i in indices
+        ])
+        np.testing.assert_array_equal(cache.take(indices), expected)
+        self.assertEqual(build_image_cache(self.data_dir, (32, 32), self.cache_dir).key, cache.key)
+    
+    def test_cache_invalidation(self):
+        """Test qu'une image modifiée ou une autre taille cible reconstruit le cache"""
+        import os
+        from image_cache import build_image_cache
+        first = build_image_cache(self.data_dir, (32, 32), self.cache_dir)
+        resized = build_image_cache(self.data_dir, (24, 24), self.cache_dir)
+        self.assertNotEqual(resized.key, first.key)
+        self.assertEqual(resized.take([0]).shape, (1, 24, 24, 3))
+        
+        path = self.data_dir / "dandelion" / "0.png"
+        Image.fromarray(np.zeros((40, 50, 3), dtype=np.uint8)).save(path)
+        os.utime(path, ns=(0, 0))
+        rebuilt = build_image_cache(self.data_dir, (24, 24), self.cache_dir)
+        self.assertNotEqual(rebuilt.key, resized.key)
+        self.assertEqual(int(rebuilt.take([0]).max()), 0)
+        # Les caches obsolètes du dataset sont supprimés
+        self.assertEqual([p.name for p in self.cache_dir.iterdir()], [rebuilt.key])
+    
+    def test_cached_sequence(self):
+        """Test le découpage train/validation et les lots normalisés lus dans le cache"""
+        from image_cache import build_image_cache, split_indices, CachedImageSequence
+        cache = build_image_cache(self.data_dir, (32, 32), self.cache_dir)
+        excluded = {cache.paths[9]}
+        train, validation = split_indices(cache, 0.4, exclude=excluded)
+        self.assertEqual(list(validation), [0, 1, 5])
+        self.assertEqual(len(train), 6)
+        self.assertNotIn(9, train)
+        
+        sequence = CachedImageSequence(cache, train, batch_size=4, shuffle=True, seed=0)
+        self.assertEqual(len(sequence), 2)
+        images, labels = sequence[0]
+        self.assertEqual(images.shape, (4, 32, 32, 3))
+        self.assertEqual(images.dtype, np.float32)
+        self.assertLessEqual(float(images.max()), 1.0)
+        np.testing.assert_array_equal(labels, cache.labels[sequence.order[:4]])
+        np.testing.assert_allclose(images[0], cache.take(sequence.order[:1])[0] / 255.0, rtol=1e-6)
+
+
+class TestInputPipeline(unittest.TestCase):
+    """Tests du pipeline d'entrée tf.data"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp_dir.name) / "data"
+        rng = np.random.default_rng(0)
+        for label in ["dandelion", "grass"]:
+            (self.data_dir / label).mkdir(parents=True)
+            for i in range(10):
+                value = 50 if label == "dandelion" else 200
+                array = np.full((40, 50, 3), value, dtype=np.uint8) + rng.integers(0, 5, (40, 50, 3), dtype=np.uint8)
+                Image.fromarray(array).save(self.data_dir / label / f"{i}.png")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_stratified_split_is_stable(self):
+        """Test que la séparation est stratifiée et indépendante de l'ordre des images"""
+        from input_pipeline import stratified_split
+        paths = [f"data/{label}/{i}.jpg" for label in ["a", "b"] for i in range(50)]
+        labels = [0] * 50 + [1] * 50
+        train, validation = stratified_split(paths, labels, 0.2)
+        self.assertEqual(len(validation), 20)
+        self.assertEqual(sum(labels[i] for i in validation), 10)
+        self.assertEqual(len(set(train) | set(validation)), 100)
+        
+        reordered = list(reversed(range(100)))
+        _, validation_reordered = stratified_split([paths[i] for i in reordered], [labels[i] for i in reordered], 0.2)
+        self.assertEqual({paths[reordered[i]] for i in validation_reordered}, {paths[i] for i in validation})
+    
+    def test_load_datasets(self):
+        """Test les datasets train/validation (lots normalisés, labels, exclusions)"""
+        from input_pipeline import load_datasets
+        excluded = {str(self.data_dir / "grass" / "0.png")}
+        train, validation = load_datasets(
+            self.data_dir, (24, 24), 0.2, batch_size=4,
+            augmentation={"rotation_range": 20, "horizontal_flip": True}, exclude=excluded, seed=0
+        )
+        self.assertEqual(train.class_indices, {"dandelion": 0, "grass": 1})
+        self.assertEqual((train.samples, validation.samples), (16, 3))
+        
+        batches = list(validation)
+        images = np.concatenate([x.numpy() for x, _ in batches])
+        labels = np.concatenate([y.numpy() for _, y in batches])
+        self.assertEqual(images.shape, (3, 24, 24, 3))
+        np.testing.assert_array_equal(images.mean(axis=(1, 2, 3)) > 0.5, labels == 1)
+        self.assertEqual(sum(len(y) for _, y in train), 16)
+    
+    def test_unreadable_images_are_not_counted(self):
+        """Test que les fichiers illisibles sont écartés avant le comptage des images"""
+        from input_pipeline import load_datasets
+        corrupt = self.data_dir / "grass" / "corrupt.png"
+        corrupt.write_bytes(b"not an image")
+        train, validation = load_datasets(self.data_dir, (24, 24), 0.2, batch_size=4, seed=0)
+        self.assertEqual(train.samples + validation.samples, 20)
+        self.assertNotIn(str(corrupt), train.paths + validation.paths)
+        self.assertEqual(sum(len(y) for _, y in train), train.samples)
+
+
+class TestAugmentation(unittest.TestCase):
+    """Tests de l'augmentation par lot (TensorFlow et NumPy)"""
+    
+    AUGMENTATION = {
+        "rotation_range": 20, "width_shift_range": 0.2, "height_shift_range": 0.2,
+        "horizontal_flip": True, "zoom_range": 0.2,
+    }
+    
+    def test_augment_batch(self):
+        """Test l'augmentation par lot : identité sans paramètres, miroir exact sinon"""
+        from augmentation import augment_batch
+        images = np.random.default_rng(0).random((6, 16, 20, 3)).astype(np.float32)
+        np.testing.assert_allclose(augment_batch(images).numpy(), images, atol=1e-5)
+        flipped = augment_batch(images, horizontal_flip=True).numpy()
+        for original, result in zip(images, flipped):
+            self.assertTrue(np.allclose(result, original, atol=1e-5) or np.allclose(result, original[:, ::-1], atol=1e-5))
+        rotated = augment_batch(images, rotation_range=20, zoom_range=0.2, width_shift_range=0.2).numpy()
+        self.assertEqual(rotated.shape, images.shape)
+    
+    def test_numpy_warp_matches_tensorflow(self):
+        """Test que la déformation NumPy vectorisée est identique à ImageProjectiveTransformV3"""
+        import tensorflow as tf
+        from augmentation import sample_transforms, warp_batch
+        rng = np.random.default_rng(0)
+        images = rng.integers(0, 256, (8, 24, 30, 3)).astype(np.uint8)
+        transforms = sample_transforms(8, 24, 30, rng, **self.AUGMENTATION)
+        expected = tf.raw_ops.ImageProjectiveTransformV3(
+            images=images.astype(np.float32), transforms=transforms, output_shape=[24, 30],
+            fill_value=0.0, interpolation="BILINEAR", fill_mode="NEAREST"
+        ).numpy()
+        # uint8 : virgule fixe 8 bits (écart <= 2 niveaux) ; float32 : identique
+        warped = warp_batch(images, transforms)
+        self.assertEqual(warped.dtype, np.uint8)
+        np.testing.assert_allclose(warped, expected, atol=2.0)
+        np.testing.assert_allclose(warp_batch(images.astype(np.float32), transforms), expected, atol=1e-2)
+    
+    def test_transform_distribution(self):
+        """Test les lois des transformations (mêmes bornes que ImageDataGenerator)"""
+        from augmentation import sample_transforms
+        transforms = sample_transforms(20000, 100, 200, np.random.default_rng(0), **self.AUGMENTATION)
+        a0, a1, a2, b0, b1, b2 = transforms[:, :6].T
+        # Matrice linéaire = R · Z · F : angle, zooms et miroir retrouvés depuis les colonnes
+        zx, zy = np.hypot(a0, b0), np.hypot(a1, b1)
+        theta = np.degrees(np.arctan2(-a1, b1))
+        self.assertTrue(np.all(np.abs(theta) <= 20.0 + 1e-3))
+        self.assertTrue(np.all((zx >= 0.8 - 1e-5) & (zx <= 1.2 + 1e-5)))
+        self.assertTrue(np.all((zy >= 0.8 - 1e-5) & (zy <= 1.2 + 1e-5)))
+        self.assertAlmostEqual(float(np.mean(a0 * b1 - a1 * b0 < 0)), 0.5, delta=0.02)
+        self.assertAlmostEqual(float(np.std(theta)), 20.0 / np.sqrt(3.0), delta=0.3)
+    
+    def test_sequence_augments_batches(self):
+        """Test l'augmentation des lots lus dans le cache memmap"""
+        from image_cache import build_image_cache, CachedImageSequence
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_dir = Path(tmp_dir) / "data"
+            (data_dir / "grass").mkdir(parents=True)
+            for i in range(4):
+                Image.fromarray(np.full((20, 20, 3), 60 * i, dtype=np.uint8)).save(data_dir / "grass" / f"{i}.png")
+            cache = build_image_cache(data_dir, (16, 16), Path(tmp_dir) / "cache")
+            sequence = CachedImageSequence(cache, np.arange(4), batch_size=4, augmentation=self.AUGMENTATION, seed=0)
+            images, _ = sequence[0]
+            # Images uniformes : invariantes par transformation affine
+            np.testing.assert_allclose(images, cache.take(np.arange(4)) / 255.0, atol=1e-5)
+
+
+class TestModelArchitectures(unittest.TestCase):
+    """Tests des variantes d'architecture du classifieur"""
+    
+    def test_variants_shrink_the_model(self):
+        """Test que les têtes GAP, les blocs séparables et le multiplicateur réduisent les paramètres"""
+        from model_architectures import build_model
+        params = {
+            (architecture, width): build_model((224, 224, 3), architecture, width).count_params()
+            for architecture in ["baseline", "gap", "separable"] for width in [1.0, 0.5]
+        }
+        self.assertGreater(params[("baseline", 1.0)], 10_000_000)
+        self.assertLess(params[("gap", 1.0)], params[("baseline", 1.0)] / 50)
+        self.assertLess(params[("separable", 1.0)], params[("gap", 1.0)])
+        for architecture in ["baseline", "gap", "separable"]:
+            self.assertLess(params[(architecture, 0.5)], params[(architecture, 1.0)])
+        with self.assertRaises(ValueError):
+            build_model((224, 224, 3), "resnet")
+    
+    def test_variants_keep_embedding_layer(self):
+        """Test que chaque variante produit une probabilité et garde la couche Dense(128) des embeddings"""
+        from model_architectures import build_model, ARCHITECTURES
+        from feature_embeddings import build_embedding_model
+        images = np.random.default_rng(0).random((2, 64, 64, 3), dtype=np.float32)
+        for architecture in ARCHITECTURES:
+            model = build_model((64, 64, 3), architecture, 0.5)
+            predictions = model.predict(images, verbose=0)
+            self.assertEqual(predictions.shape, (2, 1))
+            self.assertTrue(np.all((predictions >= 0) & (predictions <= 1)))
+            self.assertEqual(build_embedding_model(model).output_shape, (None, 128))
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+    """Tests de la recherche d'hyperparamètres (successive halving)"""
+    
+    def test_rungs_and_brackets(self):
+        """Test des paliers du successive halving et des brackets Hyperband"""
+        from hyperparameter_search import successive_halving_rungs, hyperband_brackets
+        self.assertEqual(successive_halving_rungs(27, 1, 9, 3), [(27, 1), (9, 3), (3, 9)])
+        self.assertEqual(successive_halving_rungs(4, 1, 9, 3), [(4, 1), (1, 3)])
+        self.assertEqual(successive_halving_rungs(8, 3, 4, 2), [(8, 3), (4, 4)])
+        self.assertEqual(hyperband_brackets(9, 3), [(9, 1), (5, 3), (3, 9)])
+    
+    def test_sample_configurations(self):
+        """Test que les tirages sont reproductibles et restent dans l'espace de recherche"""
+        from hyperparameter_search import sample_configurations, SEARCH_SPACE
+        configurations = sample_configurations(20, seed=1)
+        self.assertEqual(configurations, sample_configurations(20, seed=1))
+        low, high = SEARCH_SPACE["learning_rate"]
+        for configuration in configurations:
+            self.assertIn(configuration["architecture"], SEARCH_SPACE["architecture"])
+            self.assertIn(configuration["batch_size"], SEARCH_SPACE["batch_size"])
+            self.assertTrue(low <= configuration["learning_rate"] <= high)
+    
+    def test_search_prunes_trials(self):
+        """Test qu'une petite recherche (dans le processus courant) élague et mène le meilleur essai au budget maximal"""
+        from hyperparameter_search import HyperparameterSearch, MLFLOW_AVAILABLE
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as tmp:
+            if MLFLOW_AVAILABLE:
+                # Suivi et registre temporaires : jamais le ./mlruns du dépôt
+                import mlflow
+                self.addCleanup(mlflow.set_registry_uri, mlflow.get_registry_uri())
+                self.addCleanup(mlflow.set_tracking_uri, mlflow.get_tracking_uri())
+                mlflow.set_tracking_uri((Path(tmp) / "mlruns").as_uri())
+                mlflow.set_registry_uri((Path(tmp) / "mlruns").as_uri())
+            for i in range(12):
+                label = ["dandelion", "grass"][i % 2]
+                (Path(tmp) / "data" / label).mkdir(parents=True, exist_ok=True)
+                array = rng.integers(0, 256, (40, 40, 3), dtype=np.uint8)
+                Image.fromarray(array).save(Path(tmp) / "data" / label / f"{i}.png")
+            search = HyperparameterSearch(
+                Path(tmp) / "data", img_size=(32, 32), max_epochs=2, eta=2,
+                workers=1, cache_dir=Path(tmp) / "cache", index_path=Path(tmp) / "model_index.json"
+            )
+            best = search.run(trials=4)
+            self.assertEqual(len(search.trials), 4)
+            self.assertEqual(best["epochs"], 2)
+            # Modèles des essais supprimés en fin de recherche
+            self.assertFalse(search.checkpoint_dir.exists())
+            self.assertEqual(sorted(t["epochs"] for t in search.trials), [1, 1, 2, 2])
+
+
+class TestWarmStart(unittest.TestCase):
+    """Tests du ré-entraînement incrémental (warm start)"""
+    
+    def test_plan_warm_start(self):
+        """Test de la séparation nouvelles images / rejeu d'anciennes images"""
+        from warm_start import plan_warm_start
+        paths = [f"data/grass/{i}.jpg" for i in range(20)]
+        trained = set(paths[:15]) | {"data/grass/deleted.jpg"}
+        new, replay = plan_warm_start(paths, trained, replay_ratio=2.0, seed=0)
+        self.assertEqual(new, paths[15:])
+        self.assertEqual(len(replay), 10)
+        self.assertTrue(set(replay) <= set(paths[:15]))
+        self.assertEqual(replay, plan_warm_start(paths, trained, replay_ratio=2.0, seed=0)[1])
+        # Rejeu minimal, borné par le nombre d'anciennes images
+        self.assertEqual(len(plan_warm_start(paths, trained, min_replay=32)[1]), 15)
+        self.assertEqual(plan_warm_start(paths, set(paths)), ([], []))
+    
+    def test_target_metric_stopping(self):
+        """Test que l'entraînement s'arrête dès que la cible est atteinte"""
+        from tensorflow import keras
+        from warm_start import TargetMetricStopping
+        model = keras.Sequential([keras.Input(shape=(2,)), keras.layers.Dense(1, activation="sigmoid")])
+        model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+        x = np.array([[0.0, 1.0], [1.0, 0.0]] * 8, dtype=np.float32)
+        y = np.array([0.0, 1.0] * 8, dtype=np.float32)
+        stopping = TargetMetricStopping(target=0.0)
+        history = model.fit(x, y, epochs=5, validation_data=(x, y), callbacks=[stopping], verbose=0)
+        self.assertEqual(len(history.history["loss"]), 1)
+        self.assertEqual(stopping.stopped_epoch, 0)
+    
+    def test_train_subset_keeps_validation(self):
+        """Test que la restriction des images d'entraînement ne change pas la validation"""
+        from input_pipeline import load_datasets
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(10):
+                label = ["dandelion", "grass"][i % 2]
+                (Path(tmp) / label).mkdir(exist_ok=True)
+                Image.new("RGB", (8, 8), color=(i * 20, 100, 0)).save(Path(tmp) / label / f"{i}.png")
+            train, validation = load_datasets(tmp, (8, 8), 0.4, batch_size=4)
+            subset = set(train.paths[:2])
+            warm_train, warm_validation = load_datasets(tmp, (8, 8), 0.4, batch_size=4, train_subset=subset)
+            self.assertEqual(warm_train.paths, train.paths[:2])
+            self.assertEqual(warm_validation.paths, validation.paths)
+            self.assertEqual(sum(len(labels) for _, labels in warm_train), 2)
+
+
+class TestDatasetManifest(unittest.TestCase):
+    """Tests du manifeste du dataset (hash du contenu, répartition persistante)"""
+    
+    def _write_images(self, root: Path, count: int, start: int = 0):
+        rng = np.random.default_rng(start)
+        for i in range(start, start + count):
+            label = ["dandelion", "grass"][i % 2]
+            (root / label).mkdir(parents=True, exist_ok=True)
+            Image.fromarray(rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)).save(root / label / f"{i:03d}.png")
+    
+    def test_assign_split_depends_on_content_only(self):
+        """Test que la répartition suit le hash du contenu, dans la proportion demandée"""
+        import hashlib
+        from dataset_manifest import assign_split
+        hashes = [hashlib.md5(str(i).encode()).hexdigest() for i in range(4000)]
+        splits = [assign_split(h, 0.2) for h in hashes]
+        self.assertAlmostEqual(splits.count("validation") / len(splits), 0.2, delta=0.03)
+        self.assertEqual(splits, [assign_split(h, 0.2) for h in hashes])
+        # Augmenter la fraction ne fait que basculer des images train vers validation
+        self.assertTrue(all(assign_split(h, 0.3) == "validation" for h, s in zip(hashes, splits) if s == "validation"))
+    
+    def test_incremental_update_keeps_splits(self):
+        """Test que l'ajout d'images ne déplace pas les autres et que seuls les fichiers modifiés sont relus"""
+        import os
+        from dataset_manifest import update_manifest, load_manifest, manifest_path
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "data"
+            self._write_images(data_dir, 30)
+            first = update_manifest(data_dir, 0.3)
+            self.assertEqual(len(first), 30)
+            self.assertEqual(set(first["split"]), {"train", "validation"})
+            self.assertTrue((first["width"] == 8).all() and (first["height"] == 6).all())
+            
+            self._write_images(data_dir, 10, start=30)
+            (data_dir / "grass" / "001.png").unlink()
+            # Même taille et même mtime : fichier considéré inchangé, pas relu
+            touched = data_dir / "dandelion" / "000.png"
+            stat = touched.stat()
+            content = bytearray(touched.read_bytes())
+            content[-1] ^= 0xFF
+            touched.write_bytes(bytes(content))
+            os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            
+            second = update_manifest(data_dir, 0.3)
+            self.assertEqual(len(second), 39)
+            before = dict(zip(first["image_path"], first["split"]))
+            after = dict(zip(second["image_path"], second["split"]))
+            self.assertTrue(all(after[path] == split for path, split in before.items() if path in after))
+            self.assertEqual(
+                second.set_index("image_path").loc[str(touched), "content_hash"],
+                first.set_index("image_path").loc[str(touched), "content_hash"]
+            )
+            reloaded = load_manifest(manifest_path(data_dir))
+            self.assertEqual(list(reloaded["image_path"]), list(second["image_path"]))
+            self.assertEqual(reloaded.attrs["validation_split"], 0.3)
+    
+    def test_loaders_follow_manifest(self):
+        """Test que le cache memmap et tf.data utilisent la répartition du manifeste"""
+        from dataset_manifest import update_manifest, manifest_splits
+        from image_cache import build_image_cache, split_indices
+        from input_pipeline import load_datasets
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "data"
+            self._write_images(data_dir, 20)
+            manifest = update_manifest(data_dir, 0.3)
+            splits = manifest_splits(manifest)
+            expected = sorted(manifest.loc[manifest["split"] == "validation", "image_path"])
+            
+            _, validation = load_datasets(data_dir, (6, 8), 0.3, batch_size=4, splits=splits)
+            self.assertEqual(sorted(validation.paths), expected)
+            cache = build_image_cache(data_dir, (6, 8), Path(tmp) / "cache")
+            train_indices, validation_indices = split_indices(cache, 0.3, splits=splits)
+            self.assertEqual(sorted(cache.paths[i] for i in validation_indices), expected)
+            self.assertEqual(len(train_indices) + len(validation_indices), 20)
+
+
+class TestTrainingProfiler(unittest.TestCase):
+    """Tests du profil des pas d'entraînement (attente des données / calcul)"""
+    
+    def test_profiler_detects_input_bound_training(self):
+        """Test qu'un pipeline d'entrée lent est vu comme de l'attente des données"""
+        import time
+        from tensorflow import keras
+        from training_profiler import TrainingProfiler
+        
+        class SlowSequence(keras.utils.Sequence):
+            def __len__(self):
+                return 6
+            
+            def __getitem__(self, index):
+                time.sleep(0.03)
+                rng = np.random.default_rng(index)
+                return rng.random((8, 4), dtype=np.float32), (rng.random(8) > 0.5).astype(np.float32)
+        
+        model = keras.Sequential([keras.Input(shape=(4,)), keras.layers.Dense(1, activation="sigmoid")])
+        model.compile(optimizer="adam", loss="binary_crossentropy", metrics=["accuracy"])
+        profiler = TrainingProfiler(log_to_mlflow=False)
+        model.fit(SlowSequence(), epochs=2, verbose=0, callbacks=[profiler])
+        
+        self.assertEqual(len(profiler.epochs), 2)
+        self.assertIsNotNone(profiler.first_step_seconds)
+        last = profiler.epochs[-1]
+        for key in ["step_time_ms", "data_wait_ms", "compute_ms", "images_per_sec", "epoch_seconds"]:
+            self.assertIn(key, last)
+        self.assertGreater(last["data_wait_ms"], 20.0)
+        self.assertGreater(last["data_wait_ratio"], 0.5)
+        self.assertAlmostEqual(last["step_time_ms"], last["data_wait_ms"] + last["compute_ms"], places=6)
+        # Les variables d'horodatage ne font pas partie du modèle
+        self.assertEqual(len(model.weights), 2)
+
+
+class TestPostTraining(unittest.TestCase):
+    """Tests du graphe d'étapes post-entraînement"""
+    
+    def test_stages_run_concurrently_after_dependencies(self):
+        """Test que les étapes indépendantes se chevauchent et attendent leurs dépendances"""
+        import threading
+        import time
+        from post_training import StageGraph, SUCCESS
+        
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+        graph = StageGraph(max_workers=3)
+        graph.add("export", lambda: order.append("export") or "model")
+        # Ne réussissent que si elles s'exécutent en même temps
+        graph.add("register", lambda: barrier.wait() is not None and order.append("register"), after=["export"])
+        graph.add("upload", lambda: barrier.wait() is not None and order.append("upload"), after=["export"])
+        graph.add("report", lambda: time.sleep(0.01) or len(order), after=["register", "upload"])
+        report = graph.run()
+        
+        self.assertEqual(list(report), ["export", "register", "upload", "report"])
+        self.assertTrue(all(entry["status"] == SUCCESS for entry in report.values()))
+        self.assertEqual(order[0], "export")
+        self.assertEqual(report["export"]["result"], "model")
+        self.assertEqual(report["report"]["result"], 3)
+        self.assertGreater(report["report"]["seconds"], 0.0)
+    
+    def test_failure_skips_dependents_only(self):
+        """Test qu'une étape en échec saute ses dépendantes sans arrêter les autres"""
+        from post_training import StageGraph, FAILED, SKIPPED, SUCCESS, report_summary
+        
+        def fail():
+            raise RuntimeError("minio indisponible")
+        
+        graph = StageGraph()
+        graph.add("upload", fail)
+        graph.add("deploy", lambda: "ok", after=["upload"])
+        graph.add("notify", lambda: "ok", after=["deploy"])
+        graph.add("features", lambda: 42)
+        report = graph.run()
+        
+        self.assertEqual(report["upload"]["status"], FAILED)
+        self.assertIn("minio indisponible", report["upload"]["error"])
+        self.assertEqual(report["deploy"]["status"], SKIPPED)
+        self.assertEqual(report["notify"]["status"], SKIPPED)
+        self.assertEqual(report["features"]["status"], SUCCESS)
+        self.assertEqual(report["features"]["result"], 42)
+        # Rapport loggé dans MLflow : sérialisable en JSON
+        import json
+        json.dumps(report_summary(report))
+        
+        with self.assertRaises(ValueError):
+            StageGraph().add("register", lambda: None, after=["export"])
+
+
+class TestModelLocator(unittest.TestCase):
+    """Tests de l'index des modèles enregistrés"""
+    
+    def test_index_lookup_relative_paths(self):
+        """Test la lecture de l'index et la résolution des chemins relatifs"""
+        from model_locator import _write_index, local_model_path, lookup, read_index
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index_path = Path(tmp) / "mlruns" / "model_index.json"
+            self.assertEqual(read_index(index_path)["versions"], {})
+            _write_index({
+                "name": "dandelion_vs_grass_classifier",
+                "latest": "10",
+                "versions": {
+                    "9": {"path": "1/abc/artifacts/model", "run_id": "abc", "created": 1, "s3_path": None},
+                    "10": {"path": "s3://bucket/1/def/artifacts/model", "run_id": "def", "created": 2,
+                           "s3_path": "models/dandelion_vs_grass_classifier/def"},
+                },
+            }, index_path)
+            
+            self.assertEqual(lookup(read_index(index_path))["run_id"], "def")
+            self.assertEqual(lookup(read_index(index_path), 9)["version"], "9")
+            with self.assertRaises(LookupError):
+                lookup(read_index(index_path), "11")
+            # Chemin relatif au dossier de l'index (mlruns copié dans l'image Docker), URI distante inchangée
+            self.assertEqual(local_model_path("9", index_path), str(index_path.parent / "1/abc/artifacts/model"))
+            self.assertEqual(local_model_path(path=index_path), "s3://bucket/1/def/artifacts/model")
+    
+    def test_update_index_from_registry(self):
+        """Test l'indexation d'une version enregistrée dans un registre MLflow local"""
+        try:
+            import mlflow
+            from mlflow.tracking import MlflowClient
+        except ImportError:
+            self.skipTest("MLflow non disponible")
+        from model_locator import local_model_path, update_index
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            mlruns = Path(tmp) / "mlruns"
+            client = MlflowClient(tracking_uri=mlruns.as_uri(), registry_uri=mlruns.as_uri())
+            experiment_id = client.create_experiment("locator")
+            run = client.create_run(experiment_id)
+            model_dir = Path(tmp) / "model"
+            model_dir.mkdir()
+            (model_dir / "MLmodel").write_text("flavors: {}\n")
+            client.log_artifacts(run.info.run_id, str(model_dir), "model")
+            client.create_registered_model("locator_model")
+            client.create_model_version("locator_model", f"{run.info.artifact_uri}/model", run.info.run_id)
+            
+            entry = update_index(client, "locator_model", path=mlruns / "model_index.json", s3_path="models/x")
+            self.assertEqual(entry["version"], "1")
+            self.assertEqual(entry["run_id"], run.info.run_id)
+            self.assertFalse(Path(entry["path"]).is_absolute())
+            self.assertTrue((Path(local_model_path(path=mlruns / "model_index.json")) / "MLmodel").exists())
+
+
+class TestTrainingCheckpoints(unittest.TestCase):
+    """Tests de la reprise de l'entraînement depuis un point de reprise"""
+    
+    def test_keras_internals_are_available(self):
+        """Test la présence des attributs privés de BackupAndRestore utilisés par ResumableBackup"""
+        from tensorflow import keras
+        from training_checkpoints import KERAS_INTERNALS
+        
+        class Inspect(keras.callbacks.BackupAndRestore):
+            def on_train_batch_end(self, batch, logs=None):
+                self.seen = {
+                    "BackupAndRestore": [n for n in KERAS_INTERNALS["BackupAndRestore"] if hasattr(self, n)],
+                    "WorkerTrainingState": [
+                        n for n in KERAS_INTERNALS["WorkerTrainingState"] if hasattr(self._training_state, n)
+                    ],
+                }
+                super().on_train_batch_end(batch, logs)
+        
+        model = keras.Sequential([keras.Input(shape=(3,)), keras.layers.Dense(1)])
+        model.compile(optimizer="adam", loss="mse")
+        with tempfile.TemporaryDirectory() as tmp:
+            callback = Inspect(tmp, save_freq=1)
+            model.fit(np.zeros((4, 3)), np.zeros(4), batch_size=4, verbose=0, callbacks=[callback])
+        self.assertEqual(callback.seen, KERAS_INTERNALS)
+    
+    def test_resume_after_interruption_from_storage(self):
+        """Test la reprise sur un autre nœud depuis le stockage, avec rétention des K derniers"""
+        import shutil
+        from tensorflow import keras
+        from training_checkpoints import LocalStorage, ResumableBackup, list_checkpoints, read_checkpoint_state
+        
+        class Batches(keras.utils.Sequence):
+            def __len__(self):
+                return 8
+            
+            def __getitem__(self, index):
+                rng = np.random.default_rng(index)
+                return rng.random((4, 3), dtype=np.float32), (rng.random(4) > 0.5).astype(np.float32)
+        
+        class Interrupt(keras.callbacks.Callback):
+            def on_train_batch_end(self, batch, logs=None):
+                if int(self.model.optimizer.iterations.numpy()) == 10:
+                    raise KeyboardInterrupt
+        
+        def create():
+            model = keras.Sequential([keras.Input(shape=(3,)), keras.layers.Dense(1, activation="sigmoid")])
+            model.compile(optimizer="adam", loss="binary_crossentropy")
+            return model
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = LocalStorage(Path(tmp) / "bucket")
+            backup_dir = str(Path(tmp) / "node")
+            prefix = "checkpoints/test"
+            
+            first = ResumableBackup(
+                backup_dir, storage, prefix, save_steps=3, keep=2, restore=False, metadata={"run_id": "abc"}
+            )
+            with self.assertRaises(KeyboardInterrupt):
+                create().fit(Batches(), epochs=3, verbose=0, callbacks=[first, Interrupt()])
+            first.wait_for_uploads()
+            # Points de reprise aux pas 3, 6 et 9 : seuls les 2 derniers sont conservés
+            self.assertEqual(list_checkpoints(storage, prefix), ["ckpt-0000000006", "ckpt-0000000009"])
+            
+            # Nouveau nœud : rien en local, reprise depuis le stockage
+            shutil.rmtree(backup_dir)
+            state = read_checkpoint_state(backup_dir, storage, prefix)
+            self.assertEqual((state["epoch"], state["batch"], state["step"]), (1, 0, 9))
+            self.assertEqual(state["run_id"], "abc")
+            
+            model = create()
+            resumed = ResumableBackup(backup_dir, storage, prefix, save_steps=3, keep=2)
+            history = model.fit(Batches(), epochs=3, verbose=0, callbacks=[resumed])
+            
+            self.assertEqual(resumed.resumed_from["step"], 9)
+            # État de l'optimiseur restauré : 9 pas repris + 15 pas restants
+            self.assertEqual(int(model.optimizer.iterations.numpy()), 24)
+            self.assertEqual(history.epoch, [1, 2])
+            # Entraînement terminé : points de reprise effacés
+            self.assertEqual(storage.list_files(prefix), [])
+            self.assertIsNone(read_checkpoint_state(backup_dir, storage, prefix))
+
+
+class TestDataParallel(unittest.TestCase):
+    """Tests de l'entraînement data-parallel multi-processus"""
+    
+    def test_cluster_configuration(self):
+        """Test le TF_CONFIG, la répartition des cœurs et la mise à l'échelle du learning rate"""
+        from distributed_training import assign_cores, available_cores, scaled_learning_rate, tf_config
+        config = tf_config([2222, 2223], 1)
+        self.assertEqual(config["cluster"]["worker"], ["localhost:2222", "localhost:2223"])
+        self.assertEqual(config["task"], {"type": "worker", "index": 1})
+        
+        cores = available_cores()
+        assigned = assign_cores(2, 1)
+        self.assertEqual([len(c) for c in assigned], [1, 1])
+        self.assertTrue(all(set(c) <= set(cores) for c in assigned))
+        if len(cores) >= 2:
+            self.assertEqual(set(assigned[0]) & set(assigned[1]), set())
+        self.assertAlmostEqual(scaled_learning_rate(1e-3, 4), 4e-3)
+    
+    def test_learning_rate_warmup(self):
+        """Test la montée du learning rate de la valeur de base à la valeur mise à l'échelle"""
+        from distributed_training import warmup_learning_rate
+        rates = [warmup_learning_rate(epoch, 1e-3, 8, 2) for epoch in range(4)]
+        np.testing.assert_allclose(rates, [1e-3, 4.5e-3, 8e-3, 8e-3])
+        self.assertAlmostEqual(warmup_learning_rate(0, 1e-3, 4, 0), 4e-3)
+        self.assertAlmostEqual(warmup_learning_rate(0, 1e-3, 1, 1), 1e-3)
+    
+    def test_two_workers_train_on_localhost(self):
+        """Test un entraînement sur 2 processus : lot global, learning rate et modèle du chief"""
+        from tensorflow import keras
+        from distributed_training import train_data_parallel
+        from input_pipeline import load_datasets
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = Path(tmp) / "data"
+            rng = np.random.default_rng(0)
+            for label in ["dandelion", "grass"]:
+                (data_dir / label).mkdir(parents=True)
+                for i in range(10):
+                    value = 50 if label == "dandelion" else 200
+                    array = np.full((40, 50, 3), value, dtype=np.uint8) + rng.integers(0, 5, (40, 50, 3), dtype=np.uint8)
+                    Image.fromarray(array).save(data_dir / label / f"{i}.png")
+            train, validation = load_datasets(data_dir, (24, 24), 0.2, batch_size=4, seed=0)
+            
+            result = train_data_parallel({
+                "train_paths": train.paths, "train_labels": train.labels,
+                "val_paths": validation.paths, "val_labels": validation.labels,
+                "img_size": (24, 24), "per_worker_batch": 4, "epochs": 2,
+                "architecture": "gap", "width_multiplier": 0.25, "seed": 0,
+            }, num_workers=2, output_dir=str(Path(tmp) / "output"))
+            
+            self.assertEqual(result["num_workers"], 2)
+            self.assertEqual(result["global_batch_size"], 8)
+            self.assertAlmostEqual(result["learning_rate"], 2e-3)
+            # 16 images d'entraînement / lot global de 8
+            self.assertEqual(result["steps_per_epoch"], 2)
+            self.assertEqual(result["epoch"], [0, 1])
+            self.assertEqual(len(result["history"]["val_loss"]), 2)
+            self.assertGreater(result["images_per_sec"], 0)
+            model = keras.models.load_model(result["model_path"])
+            self.assertEqual(model.predict(np.zeros((1, 24, 24, 3), dtype=np.float32), verbose=0).shape, (1, 1))
+
+
+class TestImageDedup(unittest.TestCase):
+    """Tests des hashes perceptuels et de la détection de quasi-doublons"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self.tmp_dir.name)
+        # Scène lisse (bruit basse fréquence), sa copie réduite/recompressée et son miroir
+        rng = np.random.default_rng(0)
+        coarse = Image.fromarray(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8))
+        scene = np.asarray(coarse.resize((320, 240), Image.BICUBIC))
+        Image.fromarray(scene).save(self.tmp / "scene.jpg", quality=95)
+        Image.fromarray(scene).resize((160, 120)).save(self.tmp / "scene_small.jpg", quality=60)
+        Image.fromarray(np.ascontiguousarray(scene[:, ::-1])).save(self.tmp / "mirror.jpg")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_perceptual_hashes_are_robust(self):
+        """Test que les hashes résistent au redimensionnement/recompression mais séparent les images"""
+        from feature_store import extract_image_features
+        from image_dedup import hamming_distance
+        features = {name: extract_image_features(str(self.tmp / f"{name}.jpg")) for name in ["scene", "scene_small", "mirror"]}
+        for column in ["dhash", "phash"]:
+            hashes = {name: int(f[column], 16) for name, f in features.items()}
+            self.assertLessEqual(hamming_distance(hashes["scene"], hashes["scene_small"]), 4)
+            self.assertGreater(hamming_distance(hashes["scene"], hashes["mirror"]), 10)
+    
+    def test_bktree_matches_brute_force(self):
+        """Test que les requêtes du BK-tree renvoient exactement les voisins du parcours exhaustif"""
+        from image_dedup import BKTree, hamming_distance
+        rng = np.random.default_rng(0)
+        base = [int(v) for v in rng.integers(0, 2**63, 50, dtype=np.int64)]
+        hashes = [h ^ (1 << int(bit)) for h in base for bit in rng.integers(0, 64, 5)] + base
+        tree = BKTree()
+        for i, h in enumerate(hashes):
+            tree.add(h, i)
+        self.assertEqual(len(tree), len(hashes))
+        for query in hashes[::7]:
+            for radius in (0, 2, 8):
+                expected = {i for i, h in enumerate(hashes) if hamming_distance(query, h) <= radius}
+                self.assertEqual({i for _, i in tree.query(query, radius)}, expected)
+    
+    def test_groups_do_not_chain(self):
+        """Test qu'une chaîne de hashes proches deux à deux ne forme pas un seul groupe"""
+        from image_dedup import find_duplicate_groups, hamming_distance
+        hashes = ["0000000000000000", "000000000000000f", None, "00000000000000ff", "0000000000000fff"]
+        groups = find_duplicate_groups(hashes, radius=4)
+        self.assertEqual(groups, [0, 0, 2, 3, 3])
+        for position, group in enumerate(groups):
+            if hashes[position] is not None:
+                self.assertLessEqual(hamming_distance(int(hashes[position], 16), int(hashes[group], 16)), 4)
+    
+    def test_dedup_report_and_filter(self):
+        """Test le rapport de quasi-doublons du store et le filtre d'entraînement"""
+        from feature_store import FeatureStore, extract_features_incremental
+        from image_dedup import dedup_report, filter_duplicates
+        paths = [str(self.tmp / f"{name}.jpg") for name in ["scene", "scene_small", "mirror"]]
+        store = FeatureStore(str(self.tmp / "store"))
+        extract_features_incremental(paths, labels=["dandelion", "grass", "dandelion"], store=store, workers=1)
+        
+        report = dedup_report(store, radius=4)
+        self.assertEqual(sorted(report["image_path"]), sorted(paths[:2]))
+        kept = report.loc[report["keep"], "image_path"].tolist()
+        self.assertEqual(len(kept), 1)
+        self.assertTrue(report["label_conflict"].all())
+        self.assertEqual(report.loc[~report["keep"], "duplicate_of"].tolist(), kept)
+        
+        remaining = filter_duplicates(paths, report)
+        self.assertEqual(len(remaining), 2)
+        self.assertIn(paths[2], remaining)
+
+
+class TestImageFeatures(unittest.TestCase):
+    """Tests pour l'extraction des features d'une image"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.array = rng.integers(0, 256, (600, 800, 3), dtype=np.uint8)
+        self.image_path = str(Path(self.tmp_dir.name) / "image.jpg")
+        Image.fromarray(self.array).save(self.image_path)
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_full_resolution_moments_match_numpy(self):
+        """Test que les moments RGB sont identiques au calcul NumPy canal par canal"""
+        from feature_store import extract_image_features
+        features = extract_image_features(self.image_path, draft_size=None)
+        decoded = np.array(Image.open(self.image_path).convert('RGB'))
+        for c, channel in enumerate("rgb"):
+            self.assertAlmostEqual(features[f"mean_{channel}"], float(np.mean(decoded[:, :, c])), places=6)
+            self.assertAlmostEqual(features[f"std_{channel}"], float(np.std(decoded[:, :, c])), places=6)
+    
+    def test_draft_decoding_keeps_original_size(self):
+        """Test que le décodage réduit conserve la taille d'origine dans les features"""
+        from feature_store import extract_image_features
+        features = extract_image_features(self.image_path, draft_size=128)
+        self.assertEqual((features["width"], features["height"]), (800, 600))
+        self.assertAlmostEqual(features["mean_g"], float(np.mean(self.array[:, :, 1])), delta=2.0)
+    
+    def test_extra_features(self):
+        """Test les extracteurs additionnels et l'enregistrement d'un extracteur"""
+        from feature_store import extract_image_features, register_feature_extractor, FEATURE_EXTRACTORS
+        
+        @register_feature_extractor("pixel_count")
+        def pixel_count(rgb, histogram):
+            return {"pixel_count": float(histogram[0].sum())}
+        
+        try:
+            features = extract_image_features(
+                self.image_path,
+                extra_features=["color_hist", "hsv", "edge_density", "pixel_count"],
+                draft_size=None
+            )
+        finally:
+            FEATURE_EXTRACTORS.pop("pixel_count")
+        
+        self.assertAlmostEqual(sum(features[f"hist_r_{i}"] for i in range(8)), 1.0)
+        self.assertIn("mean_h", features)
+        self.assertTrue(0.0 <= features["edge_density"] <= 1.0)
+        self.assertEqual(features["pixel_count"], 800 * 600)
+
+
+class TestParallelFeatureExtraction(unittest.TestCase):
+    """Tests pour l'extraction parallèle des features"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.image_dir = Path(self.tmp_dir.name) / "images"
+        self.image_dir.mkdir()
+        self.paths = []
+        for i, color in enumerate(["green", "yellow", "blue", "red", "white"]):
+            path = self.image_dir / f"{i:08d}.jpg"
+            Image.new('RGB', (64, 48), color=color).save(path)
+            self.paths.append(str(path))
+        # Fichier corrompu : doit être capturé sans interrompre le lot
+        self.broken_path = self.image_dir / "broken.jpg"
+        self.broken_path.write_bytes(b"not a jpeg")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_errors_are_captured_per_file(self):
+        """Test qu'une image illisible est reportée sans bloquer les autres"""
+        from feature_store import extract_features_parallel
+        summary = extract_features_parallel(
+            self.paths + [str(self.broken_path)], workers=1, task_size=2, progress=False
+        )
+        self.assertEqual(summary["processed"], 6)
+        self.assertEqual(len(summary["features"]), 5)
+        self.assertEqual(list(summary["errors"]), [str(self.broken_path)])
+    
+    def test_parallel_extraction_streams_into_store(self):
+        """Test l'écriture par lots dans le Feature Store avec un pool de processus"""
+        from feature_store import FeatureStore, extract_features_parallel
+        store = FeatureStore(Path(self.tmp_dir.name) / "store")
+        labels = ["grass"] * len(self.paths)
+        summary = extract_features_parallel(
+            self.paths, labels=labels, workers=2, store=store,
+            chunk_size=2, task_size=1, progress=False
+        )
+        self.assertEqual(summary["stored"], 5)
+        self.assertEqual(summary["errors"], {})
+        self.assertEqual(len(store.df), 5)
+        self.assertEqual(set(store.df["width"]), {64})
+    
+    def test_incremental_extraction_skips_unchanged(self):
+        """Test que seules les images nouvelles ou modifiées sont réextraites"""
+        import os
+        import shutil
+        from feature_store import FeatureStore, extract_features_incremental, plan_incremental_extraction
+        store = FeatureStore(Path(self.tmp_dir.name) / "store")
+        labels = ["grass"] * len(self.paths)
+        options = {"workers": 1, "progress": False}
+        
+        first = extract_features_incremental(self.paths, labels, store, **options)
+        self.assertEqual(first["stored"], 5)
+        
+        second = extract_features_incremental(self.paths, labels, store, **options)
+        self.assertEqual((second["unchanged"], second["reused"], second["processed"]), (5, 0, 0))
+        
+        # mtime modifié sans changement de contenu : hash identique, pas de décodage
+        stat = os.stat(self.paths[0])
+        os.utime(self.paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        # Copie sous un nouveau chemin : features réutilisées via le hash de contenu
+        copy_path = str(self.image_dir / "copy.jpg")
+        shutil.copy(self.paths[1], copy_path)
+        # Contenu modifié sur place : réextraction
+        Image.new('RGB', (32, 32), color='black').save(self.paths[2])
+        
+        # Planification sans charger la vue complète du store
+        reopened = FeatureStore(Path(self.tmp_dir.name) / "store")
+        plan = plan_incremental_extraction(reopened, self.paths + [copy_path], labels + ["grass"])
+        self.assertEqual((plan["unchanged"], len(plan["reuse"]), len(plan["extract"])), (3, 2, 1))
+        self.assertIsNone(reopened._df)
+        
+        third = extract_features_incremental(self.paths + [copy_path], labels + ["grass"], store, **options)
+        self.assertEqual((third["unchanged"], third["reused"], third["processed"]), (3, 2, 1))
+        self.assertEqual(store.get_features(self.paths[2])["width"].tolist(), [32])
+        self.assertEqual(
+            store.get_features(copy_path)["mean_r"].tolist(),
+            store.get_features(self.paths[1])["mean_r"].tolist()
+        )
 
 
 class TestS3Utils(unittest.TestCase):
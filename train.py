@@ -3,15 +3,25 @@ Script d'entraînement pour classification binaire d'images (pissenlit vs herbe)
 Utilise TensorFlow/Keras avec MLflow pour le tracking et Minio pour le stockage S3.
 """
 import os
+import re
+import shutil
+import tempfile
+import time
 import mlflow
 import mlflow.tensorflow
+from mlflow.entities import Metric
+from mlflow.tracking import MlflowClient
 import numpy as np
 from pathlib import Path
 from tensorflow import keras
-from tensorflow.keras import layers
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from sklearn.model_selection import train_test_split
 
+from augmentation import AUGMENTATION
+from model_architectures import build_model
+from model_locator import MODEL_NAME, DEFAULT_INDEX, publish_index, update_index
+from post_training import StageGraph, history_metrics, log_metrics_batched, print_report, report_summary
+
 # Import pour S3/Minio et Feature Store
 try:
     from utils_s3 import get_minio_client
@@ -21,12 +31,73 @@ except ImportError:
     print("⚠️  utils_s3 non disponible, S3/Minio désactivé")
 
 try:
-    from feature_store import FeatureStore, extract_image_features
+    from feature_store import FeatureStore, extract_features_incremental
     FEATURE_STORE_AVAILABLE = True
 except ImportError:
     FEATURE_STORE_AVAILABLE = False
     print("⚠️  feature_store non disponible, Feature Store désactivé")
 
+try:
+    from feature_sync import get_feature_store_sync
+    FEATURE_SYNC_AVAILABLE = True
+except ImportError:
+    FEATURE_SYNC_AVAILABLE = False
+    print("⚠️  feature_sync non disponible, synchronisation MySQL désactivée")
+
+try:
+    from feature_embeddings import extract_embeddings
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+try:
+    from image_cache import DEFAULT_CACHE_DIR, build_image_cache, build_manifest, split_indices, CachedImageSequence
+    IMAGE_CACHE_AVAILABLE = True
+except ImportError:
+    IMAGE_CACHE_AVAILABLE = False
+
+try:
+    from input_pipeline import load_datasets
+    TF_DATA_AVAILABLE = True
+except ImportError:
+    TF_DATA_AVAILABLE = False
+
+try:
+    from image_dedup import dedup_report
+    DEDUP_AVAILABLE = True
+except ImportError:
+    DEDUP_AVAILABLE = False
+
+try:
+    from training_profiler import TrainingProfiler
+    PROFILER_AVAILABLE = True
+except ImportError:
+    PROFILER_AVAILABLE = False
+
+try:
+    from training_checkpoints import ResumableBackup, read_checkpoint_state
+    CHECKPOINTS_AVAILABLE = True
+except ImportError:
+    CHECKPOINTS_AVAILABLE = False
+
+try:
+    from distributed_training import train_data_parallel
+    DATA_PARALLEL_AVAILABLE = True
+except ImportError:
+    DATA_PARALLEL_AVAILABLE = False
+
+try:
+    from dataset_manifest import update_manifest, manifest_path, manifest_splits, manifest_digest
+    DATASET_MANIFEST_AVAILABLE = True
+except ImportError:
+    DATASET_MANIFEST_AVAILABLE = False
+
+try:
+    from warm_start import TRAINED_IMAGES_ARTIFACT, load_base_model, plan_warm_start, TargetMetricStopping
+    WARM_START_AVAILABLE = True
+except ImportError:
+    WARM_START_AVAILABLE = False
+
 # Configuration
 DATA_DIR = Path("data")
 IMG_SIZE = (224, 224)
@@ -34,32 +105,118 @@ BATCH_SIZE = 32
 EPOCHS = 10
 VALIDATION_SPLIT = 0.2
 RANDOM_STATE = 42
+# Architecture du modèle (voir benchmarks/benchmark_architectures.py)
+ARCHITECTURE = "baseline"
+WIDTH_MULTIPLIER = 1.0
+# Pipeline d'entrée : "tfdata" (input_pipeline), "cache" (image_cache, memmap)
+# ou "generator" (flow_from_directory, décodage à chaque epoch)
+INPUT_PIPELINE = "tfdata" if TF_DATA_AVAILABLE else "cache" if IMAGE_CACHE_AVAILABLE else "generator"
+CACHE_DIR = DEFAULT_CACHE_DIR if IMAGE_CACHE_AVAILABLE else None
+# Warm start (python train.py --warm-start) : affinage du modèle enregistré
+# sur les nouvelles images + un rejeu d'anciennes images
+WARM_START_EPOCHS = 5
+WARM_START_LEARNING_RATE = 1e-4
+REPLAY_RATIO = 1.0
+# Trace TensorFlow Profiler loggée dans MLflow sur ces pas (début, fin), ex: (10, 15) ;
+# le profil attente des données / calcul est loggé à chaque entraînement
+PROFILE_TRACE_STEPS = None
+# Points de reprise (python train.py --resume) : tous les N pas et toutes les M minutes,
+# copiés dans Minio sous checkpoints/<modèle>/<clé>, les K derniers conservés
+CHECKPOINT_DIR = Path("checkpoints")
+CHECKPOINT_STEPS = 100
+CHECKPOINT_MINUTES = 10
+CHECKPOINT_KEEP = 3
+# Clé des points de reprise : exécution du DAG Airflow (identique entre les tentatives d'une tâche)
+CHECKPOINT_KEY = re.sub(r"[^A-Za-z0-9_.-]", "_", os.getenv("AIRFLOW_CTX_DAG_RUN_ID", "manual"))
+# Entraînement data-parallel (python train.py --workers N, pipeline "tfdata") : N processus
+# locaux, BATCH_SIZE images par processus et learning rate multiplié par N
+WORKERS = 1
+# Étapes post-entraînement simultanées et uploads Minio simultanés
+POST_TRAINING_WORKERS = 4
+S3_UPLOAD_WORKERS = 8
 
 # Classes
 CLASSES = ["dandelion", "grass"]
 
 
-def load_and_prepare_data(data_dir: Path, img_size: tuple, validation_split: float):
+def load_and_prepare_data(
+    data_dir: Path,
+    img_size: tuple,
+    validation_split: float,
+    exclude: set = None,
+    pipeline: str = "generator",
+    cache_dir: Path = None,
+    train_subset: set = None,
+    splits: dict = None
+):
     """
     Charge et prépare les données d'images pour l'entraînement.
     
+    Args:
+        exclude: Chemins d'images à écarter (ex: quasi-doublons, voir image_dedup)
+        pipeline: "generator" (flow_from_directory), "cache" (images décodées une
+            seule fois et relues par memmap, voir image_cache) ou "tfdata"
+            (décodage parallèle, cache mémoire et prefetch, voir input_pipeline)
+        cache_dir: Dossier du cache d'images décodées (pipeline "cache")
+        train_subset: Images d'entraînement retenues, sans changer la séparation
+            train/validation (warm start, pipelines "tfdata" et "cache")
+        splits: Sous-ensemble de chaque image ({chemin: "train" | "validation"},
+            voir dataset_manifest) ; None : séparation par fraction
+    
     Returns:
         train_generator, validation_generator: Générateurs Keras pour train/val
     """
+    if pipeline == "tfdata":
+        return load_datasets(
+            data_dir, img_size, validation_split, BATCH_SIZE,
+            augmentation=AUGMENTATION, exclude=exclude, seed=RANDOM_STATE,
+            train_subset=train_subset, splits=splits
+        )
+    
+    if pipeline == "cache":
+        cache = build_image_cache(data_dir, img_size, cache_dir or DEFAULT_CACHE_DIR)
+        train_indices, validation_indices = split_indices(cache, validation_split, exclude, splits)
+        if train_subset is not None:
+            train_indices = [i for i in train_indices if cache.paths[i] in train_subset]
+        train_generator = CachedImageSequence(
+            cache, train_indices, BATCH_SIZE, shuffle=True,
+            augmentation=AUGMENTATION, seed=RANDOM_STATE
+        )
+        validation_generator = CachedImageSequence(cache, validation_indices, BATCH_SIZE)
+        return train_generator, validation_generator
+    
     # Créer le générateur d'images avec augmentation de données
     datagen = ImageDataGenerator(
         rescale=1.0 / 255.0,  # Normalisation [0, 1]
         validation_split=validation_split,
-        rotation_range=20,
-        width_shift_range=0.2,
-        height_shift_range=0.2,
-        horizontal_flip=True,
-        zoom_range=0.2,
+        **AUGMENTATION,
     )
     
+    if exclude or splits is not None:
+        # Liste explicite des images conservées (mêmes classes que flow_from_directory)
+        import pandas as pd
+        exclude = exclude or set()
+        rows = [
+            {"filename": str(path), "class": class_dir.name}
+            for class_dir in sorted(p for p in Path(data_dir).iterdir() if p.is_dir())
+            for path in sorted(class_dir.iterdir())
+            if path.suffix.lower() in {".jpg", ".jpeg", ".png", ".bmp"} and str(path) not in exclude
+        ]
+        frame = pd.DataFrame(rows, columns=["filename", "class"])
+        flow = lambda **kwargs: datagen.flow_from_dataframe(frame, x_col="filename", y_col="class", **kwargs)
+        if splits is not None:
+            # Répartition du manifeste : un DataFrame par sous-ensemble (validation_split ignoré)
+            is_validation = frame["filename"].map(splits).eq("validation")
+            frames = {"training": frame[~is_validation], "validation": frame[is_validation]}
+            classes = sorted(frame["class"].unique())
+            flow = lambda subset, **kwargs: datagen.flow_from_dataframe(
+                frames[subset], x_col="filename", y_col="class", classes=classes, **kwargs
+            )
+    else:
+        flow = lambda **kwargs: datagen.flow_from_directory(data_dir, **kwargs)
+    
     # Générateur d'entraînement
-    train_generator = datagen.flow_from_directory(
-        data_dir,
+    train_generator = flow(
         target_size=img_size,
         batch_size=BATCH_SIZE,
         class_mode='binary',
@@ -69,8 +226,7 @@ def load_and_prepare_data(data_dir: Path, img_size: tuple, validation_split: flo
     )
     
     # Générateur de validation
-    validation_generator = datagen.flow_from_directory(
-        data_dir,
+    validation_generator = flow(
         target_size=img_size,
         batch_size=BATCH_SIZE,
         class_mode='binary',
@@ -82,32 +238,24 @@ def load_and_prepare_data(data_dir: Path, img_size: tuple, validation_split: flo
     return train_generator, validation_generator
 
 
-def create_model(input_shape: tuple, num_classes: int = 1):
+def create_model(
+    input_shape: tuple,
+    num_classes: int = 1,
+    architecture: str = "baseline",
+    width_multiplier: float = 1.0
+):
     """
     Crée un modèle CNN simple pour la classification binaire.
     
+    Args:
+        architecture: Variante (voir model_architectures : "baseline" Flatten,
+            "gap" GlobalAveragePooling, "separable" convolutions séparables)
+        width_multiplier: Multiplicateur du nombre de filtres
+    
     Returns:
         model: Modèle Keras compilé
     """
-    model = keras.Sequential([
-        # Bloc convolutionnel 1
-        layers.Conv2D(32, (3, 3), activation='relu', input_shape=input_shape),
-        layers.MaxPooling2D(2, 2),
-        
-        # Bloc convolutionnel 2
-        layers.Conv2D(64, (3, 3), activation='relu'),
-        layers.MaxPooling2D(2, 2),
-        
-        # Bloc convolutionnel 3
-        layers.Conv2D(128, (3, 3), activation='relu'),
-        layers.MaxPooling2D(2, 2),
-        
-        # Flatten et couches denses
-        layers.Flatten(),
-        layers.Dense(128, activation='relu'),
-        layers.Dropout(0.5),
-        layers.Dense(1, activation='sigmoid')  # Binary classification
-    ])
+    model = build_model(input_shape, architecture, width_multiplier, num_classes)
     
     # Compiler le modèle
     model.compile(
@@ -119,8 +267,281 @@ def create_model(input_shape: tuple, num_classes: int = 1):
     return model
 
 
-def main():
-    """Fonction principale d'entraînement."""
+def prepare_warm_start(data_dir: Path, input_shape: tuple, exclude: set = None):
+    """
+    Prépare un warm start : modèle enregistré de départ et images à entraîner.
+    
+    Args:
+        data_dir: Dossier des images
+        input_shape: Entrée attendue du modèle
+        exclude: Chemins d'images écartés
+    
+    Returns:
+        Dict de warm_start.load_base_model complété par "new_images" et
+        "replay_images", None si le warm start est impossible (entraînement complet)
+    """
+    if not WARM_START_AVAILABLE or INPUT_PIPELINE == "generator":
+        print("⚠️  Warm start indisponible (pipeline tfdata ou cache requis), entraînement complet")
+        return None
+    try:
+        base = load_base_model(MlflowClient(), MODEL_NAME)
+    except Exception as e:
+        print(f"⚠️  Modèle de départ non chargé: {str(e)}, entraînement complet")
+        return None
+    if base is None:
+        print("⚠️  Aucun modèle enregistré, entraînement complet")
+        return None
+    if tuple(base["model"].input_shape[1:]) != tuple(input_shape):
+        print(f"⚠️  Entrée du modèle v{base['version']} {base['model'].input_shape[1:]} != {input_shape}, entraînement complet")
+        return None
+    
+    exclude = exclude or set()
+    paths = [e["path"] for e in build_manifest(data_dir) if e["path"] not in exclude]
+    base["new_images"], base["replay_images"] = plan_warm_start(
+        paths, base["trained_images"], REPLAY_RATIO, min_replay=BATCH_SIZE, seed=RANDOM_STATE
+    )
+    return base
+
+
+def _training_paths(train_gen) -> list:
+    """Images d'entraînement d'un générateur, quel que soit le pipeline."""
+    if IMAGE_CACHE_AVAILABLE and isinstance(train_gen, CachedImageSequence):
+        return [train_gen.cache.paths[i] for i in train_gen.indices]
+    if hasattr(train_gen, "filepaths"):
+        return list(train_gen.filepaths)
+    return list(train_gen.paths)
+
+
+def _feature_store_images(manifest) -> tuple:
+    """Images à passer au feature store : (chemins, labels, hash du contenu ou None)."""
+    if manifest is not None:
+        # Images et hash du contenu du manifeste (fichiers inchangés non relus)
+        content_hashes = dict(zip(manifest["image_path"], manifest["content_hash"]))
+        return list(manifest["image_path"]), list(manifest["label"]), content_hashes
+    image_paths, image_labels = [], []
+    for class_name in CLASSES:
+        class_dir = DATA_DIR / class_name
+        if class_dir.exists():
+            for img_path in sorted(class_dir.glob("*.jpg")):
+                image_paths.append(str(img_path))
+                image_labels.append(class_name)
+    return image_paths, image_labels, None
+
+
+def run_post_training(
+    model: keras.Model,
+    history: keras.callbacks.History,
+    final_metrics: dict,
+    run_id: str,
+    manifest=None,
+    trained_images: set = None
+) -> dict:
+    """
+    Phase post-entraînement en graphe d'étapes concurrentes (voir post_training).
+    
+    Le modèle est sérialisé une seule fois au format MLflow ; la copie est
+    ensuite loggée et enregistrée dans le registre pendant qu'elle est
+    uploadée vers Minio. Les métriques partent en quelques `log_batch` et
+    l'extraction des features démarre dès la fin de l'entraînement.
+    
+    Args:
+        model: Modèle entraîné
+        history: Historique de model.fit
+        final_metrics: Métriques de l'évaluation finale
+        run_id: Run MLflow de l'entraînement
+        manifest: Manifeste du dataset (voir dataset_manifest), None si indisponible
+        trained_images: Images vues par le modèle (artefact du warm start)
+    
+    Returns:
+        Rapport par étape (statut, durée, erreur)
+    """
+    client = MlflowClient()
+    export_dir = Path(tempfile.mkdtemp(prefix="model-export-")) / "model"
+    graph = StageGraph(max_workers=POST_TRAINING_WORKERS)
+    
+    def log_tracking():
+        # Historique par epoch et métriques finales (step 0, comme mlflow.log_metrics)
+        timestamp = int(time.time() * 1000)
+        metrics = history_metrics(history.history, timestamp, history.epoch)
+        metrics += [Metric(key, float(value), timestamp, 0) for key, value in final_metrics.items()]
+        log_metrics_batched(client, run_id, metrics)
+        if trained_images is not None:
+            client.log_dict(run_id, {"images": sorted(trained_images)}, TRAINED_IMAGES_ARTIFACT)
+        return len(metrics)
+    
+    def export_model():
+        mlflow.tensorflow.save_model(model, str(export_dir))
+        return str(export_dir)
+    
+    outputs = {}
+    
+    def register_model():
+        client.log_artifacts(run_id, str(export_dir), "model")
+        version = outputs["version"] = mlflow.register_model(f"runs:/{run_id}/model", MODEL_NAME).version
+        print(f"✅ Modèle enregistré dans MLflow: {MODEL_NAME} v{version} (run {run_id})")
+        return version
+    
+    def upload_model():
+        s3_prefix = outputs["s3_path"] = f"models/{MODEL_NAME}/{run_id}"
+        count = get_minio_client().upload_directory(str(export_dir), s3_prefix, workers=S3_UPLOAD_WORKERS)
+        if not count:
+            raise RuntimeError(f"Aucun fichier uploadé vers {s3_prefix}")
+        client.log_param(run_id, "s3_model_path", s3_prefix)
+        print(f"✅ Modèle uploadé vers S3: {s3_prefix} ({count} fichiers)")
+        return s3_prefix
+    
+    def index_model():
+        # Index version -> chemin des artefacts, lu par les entrypoints et les DAGs (voir model_locator)
+        entry = update_index(client, MODEL_NAME, outputs["version"], DEFAULT_INDEX, outputs.get("s3_path"))
+        if S3_AVAILABLE:
+            publish_index(get_minio_client(), DEFAULT_INDEX)
+        print(f"✅ Index des modèles: v{entry['version']} -> {entry['path']}")
+        return entry["path"]
+    
+    graph.add("metrics", log_tracking)
+    graph.add("export", export_model)
+    graph.add("register", register_model, after=["export"])
+    if S3_AVAILABLE:
+        graph.add("upload", upload_model, after=["export"])
+    # Publié une fois le modèle enregistré et copié dans Minio : l'index ne désigne que des modèles servables
+    graph.add("index", index_model, after=["register", "upload"] if S3_AVAILABLE else ["register"])
+    
+    if FEATURE_STORE_AVAILABLE:
+        image_paths, image_labels, content_hashes = _feature_store_images(manifest)
+        stores = {}
+        
+        def extract_features():
+            feature_store = stores["features"] = FeatureStore()
+            # Images nouvelles ou modifiées seulement (pool de processus)
+            summary = extract_features_incremental(
+                image_paths,
+                labels=image_labels,
+                store=feature_store,
+                content_hashes=content_hashes
+            )
+            print(f"✅ {summary['stored'] + summary['reused']} features extraites et stockées")
+            # Compacter dans la base partitionnée et figer la version des features
+            feature_store.compact()
+            stats = feature_store.get_statistics()
+            client.log_param(run_id, "feature_store_snapshot", feature_store.snapshot())
+            client.log_param(run_id, "feature_store_total", stats.get("total_features", 0))
+            # Référence pour la détection de dérive (moments par label, sans scan)
+            client.log_dict(run_id, feature_store.get_statistics(by_label=True), "feature_store_statistics.json")
+            return summary
+        
+        def extract_model_embeddings():
+            # Embeddings 128-d du modèle entraîné (avant-dernière couche), versionnés par run
+            summary = extract_embeddings(
+                model, image_paths, image_labels, stores["features"],
+                model_version=run_id, img_size=IMG_SIZE, batch_size=BATCH_SIZE
+            )
+            client.log_param(run_id, "feature_store_embeddings", summary["stored"])
+            return summary["stored"]
+        
+        def sync_features():
+            # Répliquer les modifications dans la table MySQL feature_store
+            return get_feature_store_sync(stores["features"]).sync()
+        
+        graph.add("features", extract_features)
+        sync_after = ["features"]
+        if EMBEDDINGS_AVAILABLE:
+            # Après l'export : pas d'inférence pendant la sérialisation du modèle
+            graph.add("embeddings", extract_model_embeddings, after=["features", "export"])
+            sync_after = ["embeddings"]
+        if FEATURE_SYNC_AVAILABLE:
+            graph.add("sync", sync_features, after=sync_after)
+    
+    start = time.perf_counter()
+    report = graph.run()
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(export_dir.parent, ignore_errors=True)
+    
+    print(f"\n⏱️  Post-entraînement: {elapsed:.1f}s")
+    print_report(report)
+    for name, entry in report.items():
+        if entry["status"] == "failed":
+            print(f"⚠️  Étape {name}:\n{entry['traceback']}")
+    try:
+        client.log_metric(run_id, "post_training_seconds", elapsed)
+        client.log_dict(run_id, report_summary(report), "post_training_report.json")
+    except Exception as e:
+        print(f"⚠️  Rapport post-entraînement non loggé: {str(e)}")
+    return report
+
+
+def create_checkpoint_callback(resume: bool = False) -> tuple:
+    """
+    Points de reprise de l'entraînement (local + Minio, voir training_checkpoints).
+    
+    Args:
+        resume: Reprendre depuis le dernier point de reprise ; sinon les
+            points de reprise existants pour CHECKPOINT_KEY sont effacés
+    
+    Returns:
+        (callback, état du point de reprise restauré ou None)
+    """
+    storage = None
+    if S3_AVAILABLE:
+        try:
+            storage = get_minio_client()
+        except Exception as e:
+            print(f"⚠️  Minio non disponible ({str(e)}), points de reprise locaux seulement")
+    backup_dir = str(CHECKPOINT_DIR / CHECKPOINT_KEY)
+    prefix = f"checkpoints/{MODEL_NAME}/{CHECKPOINT_KEY}"
+    callback = ResumableBackup(
+        backup_dir, storage, prefix,
+        save_steps=CHECKPOINT_STEPS, save_minutes=CHECKPOINT_MINUTES, keep=CHECKPOINT_KEEP,
+        restore=resume
+    )
+    state = read_checkpoint_state(backup_dir, storage, prefix) if resume else None
+    if resume and state is None:
+        print("⚠️  Aucun point de reprise, entraînement depuis le début")
+    return callback, state
+
+
+def fit_data_parallel(train_gen, val_gen, epochs: int, workers: int, run_id: str) -> tuple:
+    """
+    Entraînement sur plusieurs processus locaux (voir distributed_training).
+    
+    Le chief logge le profil d'entraînement dans le run `run_id` ; le modèle
+    qu'il a sauvegardé est rechargé ici pour l'évaluation et le post-entraînement.
+    
+    Returns:
+        (modèle entraîné, keras.callbacks.History reconstitué)
+    """
+    result = train_data_parallel({
+        "train_paths": list(train_gen.paths), "train_labels": list(train_gen.labels),
+        "val_paths": list(val_gen.paths), "val_labels": list(val_gen.labels),
+        "img_size": IMG_SIZE, "per_worker_batch": BATCH_SIZE, "epochs": epochs,
+        "architecture": ARCHITECTURE, "width_multiplier": WIDTH_MULTIPLIER,
+        "augmentation": AUGMENTATION, "seed": RANDOM_STATE, "run_id": run_id,
+    }, workers)
+    mlflow.log_params({
+        "num_workers": result["num_workers"],
+        "threads_per_worker": result["threads_per_worker"],
+        "global_batch_size": result["global_batch_size"],
+        "learning_rate": result["learning_rate"],
+    })
+    if result["images_per_sec"] is not None:
+        print(f"   - Débit global: {result['images_per_sec']:.1f} images/s sur {result['num_workers']} processus")
+    
+    model = keras.models.load_model(result["model_path"])
+    history = keras.callbacks.History()
+    history.history, history.epoch = result["history"], result["epoch"]
+    return model, history
+
+
+def main(warm_start: bool = False, resume: bool = False, workers: int = WORKERS):
+    """
+    Fonction principale d'entraînement.
+    
+    Args:
+        warm_start: Affiner le modèle enregistré sur les nouvelles images (plus
+            un rejeu d'anciennes) au lieu d'entraîner depuis zéro
+        resume: Reprendre un entraînement interrompu depuis son dernier point
+            de reprise (même run MLflow)
+        workers: Nombre de processus d'entraînement data-parallel
+    """
     print("=" * 60)
     print("Entraînement du modèle de classification d'images")
     print("=" * 60)
@@ -132,22 +553,68 @@ def main():
             "Veuillez d'abord exécuter download_data.py"
         )
     
+    # Manifeste du dataset : hash du contenu et répartition train/validation persistante
+    manifest = None
+    if DATASET_MANIFEST_AVAILABLE:
+        try:
+            manifest = update_manifest(DATA_DIR, VALIDATION_SPLIT)
+        except Exception as e:
+            print(f"⚠️  Manifeste du dataset impossible: {str(e)}")
+    
+    # Quasi-doublons connus du Feature Store (hashes perceptuels des runs précédents)
+    duplicates = None
+    if FEATURE_STORE_AVAILABLE and DEDUP_AVAILABLE:
+        try:
+            duplicates = dedup_report(FeatureStore())
+        except Exception as e:
+            print(f"⚠️  Rapport de quasi-doublons impossible: {str(e)}")
+    excluded = set(duplicates.loc[~duplicates["keep"], "image_path"]) if duplicates is not None else set()
+    
+    input_shape = (*IMG_SIZE, 3)  # (224, 224, 3) pour RGB
+    base = prepare_warm_start(DATA_DIR, input_shape, excluded) if warm_start else None
+    train_subset = None
+    if base is not None:
+        print(f"\n🔁 Warm start depuis {MODEL_NAME} v{base['version']}: "
+              f"{len(base['new_images'])} nouvelles images, {len(base['replay_images'])} rejouées")
+        if not base["new_images"]:
+            print("⏭️  Aucune nouvelle image, modèle enregistré conservé")
+            return
+        train_subset = set(base["new_images"]) | set(base["replay_images"])
+    if workers > 1 and (not DATA_PARALLEL_AVAILABLE or INPUT_PIPELINE != "tfdata" or base is not None or resume):
+        print("⚠️  Entraînement data-parallel limité au pipeline tfdata, sans warm start ni reprise: un seul processus")
+        workers = 1
+    
     # Charger les données
     print("\n1. Chargement et préparation des données...")
     train_gen, val_gen = load_and_prepare_data(
         DATA_DIR, 
         IMG_SIZE, 
-        VALIDATION_SPLIT
+        VALIDATION_SPLIT,
+        exclude=excluded,
+        pipeline=INPUT_PIPELINE,
+        cache_dir=CACHE_DIR,
+        train_subset=train_subset,
+        splits=manifest_splits(manifest) if manifest is not None else None
     )
     
     print(f"   - Classes: {train_gen.class_indices}")
     print(f"   - Images d'entraînement: {train_gen.samples}")
     print(f"   - Images de validation: {val_gen.samples}")
+    if excluded:
+        print(f"   - Quasi-doublons écartés: {len(excluded)}")
     
     # Créer le modèle
     print("\n2. Création du modèle...")
-    input_shape = (*IMG_SIZE, 3)  # (224, 224, 3) pour RGB
-    model = create_model(input_shape)
+    if base is not None:
+        # Affinage du modèle enregistré : learning rate réduit, nouvel état d'optimiseur
+        model = base["model"]
+        model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=WARM_START_LEARNING_RATE),
+            loss='binary_crossentropy',
+            metrics=['accuracy']
+        )
+    else:
+        model = create_model(input_shape, architecture=ARCHITECTURE, width_multiplier=WIDTH_MULTIPLIER)
     model.summary()
     
     # Configurer MLflow
@@ -160,29 +627,71 @@ def main():
         patience=3,
         restore_best_weights=True
     )
+    callbacks = [early_stopping]
+    if PROFILER_AVAILABLE:
+        callbacks.append(TrainingProfiler(trace_steps=PROFILE_TRACE_STEPS))
+    epochs = EPOCHS
+    if base is not None:
+        # Arrêt dès que le modèle retrouve l'accuracy de la version précédente
+        epochs = WARM_START_EPOCHS
+        if base["metrics"].get("val_accuracy") is not None:
+            callbacks.append(TargetMetricStopping(base["metrics"]["val_accuracy"]))
+    checkpoint, checkpoint_state = None, None
+    if CHECKPOINTS_AVAILABLE and workers == 1:
+        checkpoint, checkpoint_state = create_checkpoint_callback(resume)
+        callbacks.append(checkpoint)
     
-    # Entraînement avec MLflow
-    with mlflow.start_run():
+    # Entraînement avec MLflow (run de l'entraînement interrompu en cas de reprise)
+    resumed_run_id = checkpoint_state.get("run_id") if checkpoint_state else None
+    with mlflow.start_run(run_id=resumed_run_id):
         print("\n4. Début de l'entraînement...")
+        run_id = mlflow.active_run().info.run_id
+        if checkpoint is not None:
+            checkpoint.metadata["run_id"] = run_id
         
-        # Log des paramètres
-        mlflow.log_params({
-            "batch_size": BATCH_SIZE,
-            "epochs": EPOCHS,
-            "img_size": f"{IMG_SIZE[0]}x{IMG_SIZE[1]}",
-            "validation_split": VALIDATION_SPLIT,
-            "optimizer": "adam",
-            "loss": "binary_crossentropy",
-        })
+        # Log des paramètres (déjà loggés par le run repris : MLflow refuse de les modifier)
+        if resumed_run_id is None:
+            mlflow.log_params({
+                "batch_size": BATCH_SIZE,
+                "epochs": epochs,
+                "img_size": f"{IMG_SIZE[0]}x{IMG_SIZE[1]}",
+                "validation_split": VALIDATION_SPLIT,
+                "optimizer": "adam",
+                "architecture": ARCHITECTURE,
+                "width_multiplier": WIDTH_MULTIPLIER,
+                "num_params": model.count_params(),
+                "loss": "binary_crossentropy",
+                "excluded_duplicates": len(excluded),
+                "input_pipeline": INPUT_PIPELINE,
+                "image_cache": train_gen.cache.key if INPUT_PIPELINE == "cache" else "none",
+                "warm_start": base is not None,
+                "dataset_manifest": manifest_digest(manifest) if manifest is not None else "none",
+            })
+            if manifest is not None:
+                mlflow.log_artifact(str(manifest_path(DATA_DIR)))
+            if base is not None:
+                mlflow.log_params({
+                    "base_model_version": base["version"],
+                    "new_images": len(base["new_images"]),
+                    "replay_images": len(base["replay_images"]),
+                    "learning_rate": WARM_START_LEARNING_RATE,
+                })
+            if duplicates is not None and not duplicates.empty:
+                mlflow.log_text(duplicates.to_csv(index=False), "dedup_report.csv")
         
         # Entraîner le modèle
-        history = model.fit(
-            train_gen,
-            epochs=EPOCHS,
-            validation_data=val_gen,
-            callbacks=[early_stopping],
-            verbose=1
-        )
+        if workers > 1:
+            model, history = fit_data_parallel(train_gen, val_gen, epochs, workers, run_id)
+        else:
+            history = model.fit(
+                train_gen,
+                epochs=epochs,
+                validation_data=val_gen,
+                callbacks=callbacks,
+                verbose=1
+            )
+        if checkpoint is not None and checkpoint.resumed_from is not None:
+            mlflow.set_tag("resumed_from_step", checkpoint.resumed_from["step"])
         
         # Évaluer le modèle
         print("\n5. Évaluation du modèle...")
@@ -191,122 +700,14 @@ def main():
         print(f"   - Validation Loss: {val_loss:.4f}")
         print(f"   - Validation Accuracy: {val_accuracy:.4f}")
         
-        # Log des métriques finales
-        mlflow.log_metrics({
-            "val_loss": val_loss,
-            "val_accuracy": val_accuracy,
-        })
-        
-        # Log de l'historique d'entraînement
-        for epoch in range(len(history.history['loss'])):
-            mlflow.log_metric("train_loss", history.history['loss'][epoch], step=epoch)
-            mlflow.log_metric("train_accuracy", history.history['accuracy'][epoch], step=epoch)
-            mlflow.log_metric("val_loss", history.history['val_loss'][epoch], step=epoch)
-            mlflow.log_metric("val_accuracy", history.history['val_accuracy'][epoch], step=epoch)
-        
-        # Enregistrer le modèle dans MLflow
-        print("\n6. Enregistrement du modèle dans MLflow...")
-        mlflow.tensorflow.log_model(
-            model,
-            artifact_path="model",
-            registered_model_name="dandelion_vs_grass_classifier"
-        )
-        
-        run_id = mlflow.active_run().info.run_id
-        print("\nOK - Modele enregistre avec succes dans MLflow!")
-        print(f"OK - Run ID: {run_id}")
-        
-        # Upload vers Minio/S3 si disponible
-        if S3_AVAILABLE:
-            print("\n7. Upload du modèle vers Minio/S3...")
-            try:
-                minio_client = get_minio_client()
-                mlruns_dir = Path("mlruns")
-                # Chercher le modèle dans la structure MLflow réelle
-                # Structure: mlruns/experiment_id/models/m-*/artifacts/data/model/
-                model_path = None
-                
-                # D'abord chercher dans la structure directe du run
-                for exp_dir in mlruns_dir.glob("[0-9]*"):
-                    if exp_dir.is_dir():
-                        models_dir = exp_dir / "models"
-                        if models_dir.exists():
-                            # Chercher le modèle avec le run_id dans le chemin
-                            for model_dir in models_dir.glob(f"m-*"):
-                                potential_path = model_dir / "artifacts" / "data" / "model"
-                                if potential_path.exists() and (potential_path / "saved_model.pb").exists():
-                                    # Vérifier si c'est le bon run en comparant les timestamps
-                                    model_path = potential_path
-                                    break
-                
-                # Fallback: chercher le modèle le plus récent dans models/
-                if not model_path:
-                    models_dir = mlruns_dir / "models" / "dandelion_vs_grass_classifier"
-                    if models_dir.exists():
-                        versions = sorted(models_dir.glob("version-*"), key=lambda x: int(x.name.split("-")[1]), reverse=True)
-                        if versions:
-                            latest_version = versions[0]
-                            # Chercher dans la structure exp_id/models/m-*/artifacts/data/model/
-                            for exp_dir in mlruns_dir.glob("[0-9]*"):
-                                models_exp_dir = exp_dir / "models"
-                                if models_exp_dir.exists():
-                                    for model_dir in models_exp_dir.glob("m-*"):
-                                        potential_path = model_dir / "artifacts" / "data" / "model"
-                                        if potential_path.exists() and (potential_path / "saved_model.pb").exists():
-                                            model_path = potential_path
-                                            break
-                                if model_path:
-                                    break
-                
-                if model_path and model_path.exists():
-                    # Utiliser le model_id (m-...) comme identifiant
-                    model_id = model_path.parent.parent.name if model_path.parent.parent.name.startswith("m-") else run_id
-                    s3_prefix = f"models/dandelion_vs_grass_classifier/{model_id}"
-                    count = minio_client.upload_directory(str(model_path), s3_prefix)
-                    print(f"✅ Modèle uploadé vers S3: {s3_prefix} ({count} fichiers)")
-                    
-                    # Log l'URL S3 dans MLflow
-                    mlflow.log_param("s3_model_path", s3_prefix)
-                else:
-                    print("⚠️  Chemin modèle MLflow non trouvé pour upload S3")
-                    print("   Structure attendue: mlruns/experiment_id/models/m-*/artifacts/data/model/")
-            except Exception as e:
-                print(f"⚠️  Erreur upload S3: {str(e)}")
-                import traceback
-                traceback.print_exc()
-        
-        # Feature Store: Extraire et stocker les features
-        if FEATURE_STORE_AVAILABLE:
-            print("\n8. Extraction et stockage des features...")
-            try:
-                feature_store = FeatureStore()
-                
-                # Extraire les features de quelques images d'exemple
-                data_dir = Path("data")
-                sample_count = 0
-                max_samples = 20  # Limiter pour ne pas ralentir l'entraînement
-                
-                for class_name in CLASSES:
-                    class_dir = data_dir / class_name
-                    if class_dir.exists():
-                        for img_path in list(class_dir.glob("*.jpg"))[:max_samples//2]:
-                            features = extract_image_features(str(img_path))
-                            if features:
-                                feature_store.add_features(
-                                    image_path=str(img_path),
-                                    label=class_name,
-                                    features=features
-                                )
-                                sample_count += 1
-                
-                print(f"✅ {sample_count} features extraites et stockées")
-                
-                # Log statistiques feature store dans MLflow
-                stats = feature_store.get_statistics()
-                mlflow.log_param("feature_store_total", stats.get("total_features", 0))
-                
-            except Exception as e:
-                print(f"⚠️  Erreur feature store: {str(e)}")
+        # Phase post-entraînement : logging, enregistrement, upload et features en parallèle
+        print("\n6. Post-entraînement (MLflow, Minio, feature store)...")
+        final_metrics = {"val_loss": val_loss, "val_accuracy": val_accuracy}
+        trained_images = None
+        if WARM_START_AVAILABLE:
+            # Images vues par le modèle (cumulées depuis le modèle de départ), pour le prochain warm start
+            trained_images = set(_training_paths(train_gen)) | (base["trained_images"] if base is not None else set())
+        run_post_training(model, history, final_metrics, run_id, manifest, trained_images)
     
     print("\n" + "=" * 60)
     print("Entraînement terminé!")
@@ -314,4 +715,14 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Entraînement du classifieur pissenlit vs herbe")
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Affiner le modèle enregistré sur les nouvelles images (entraînement complet à défaut)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reprendre l'entraînement interrompu depuis son dernier point de reprise")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Processus d'entraînement data-parallel (pipeline tfdata)")
+    args = parser.parse_args()
+    main(warm_start=args.warm_start, resume=args.resume, workers=args.workers)
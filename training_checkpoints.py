@@ -0,0 +1,290 @@
+"""
+Reprise de l'entraînement après interruption (tâche Airflow tuée ou relancée).
+
+`ResumableBackup` étend `keras.callbacks.BackupAndRestore` :
+- point de reprise tous les N pas et/ou toutes les M minutes : poids, état
+  de l'optimiseur et position dans les données (epoch et pas en cours),
+- écrit localement puis copié dans Minio en arrière-plan (l'entraînement
+  n'attend pas l'upload), seuls les K derniers étant conservés,
+- au démarrage avec reprise, le dernier point de reprise (local, à défaut
+  Minio) est restauré et `fit` continue au pas suivant.
+
+L'epoch interrompue est terminée avec les pas restants, sur un nouveau
+tirage du mélange des données : les lots ne sont pas rejoués dans le même
+ordre.
+
+Un point de reprise Minio est complet quand son `state.json` (uploadé en
+dernier) existe : `<prefix>/ckpt-<pas>/{checkpoint, ckpt-*.index,
+ckpt-*.data-*, state.json}`.
+"""
+import json
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import tensorflow as tf
+from tensorflow import keras
+
+
+STATE_FILE = "state.json"
+# Sous-dossier où BackupAndRestore écrit le point de reprise du chief
+CHIEF_DIR = "chief"
+
+
+def checkpoint_name(step: int) -> str:
+    """Nom d'un point de reprise (ordre lexicographique = ordre chronologique)."""
+    return f"ckpt-{step:010d}"
+
+
+class LocalStorage:
+    """
+    Stockage des points de reprise dans un dossier local, avec l'interface
+    de MinioClient utilisée ici (développement sans Minio, tests).
+    """
+    
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Dossier jouant le rôle du bucket
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def upload_file(self, local_path: str, s3_path: str) -> bool:
+        """Copie un fichier sous la clé `s3_path`."""
+        target = self.root / s3_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(local_path, target)
+        return True
+    
+    def upload_directory(self, local_dir: str, s3_prefix: str = "", workers: int = 1) -> int:
+        """Copie un dossier sous le préfixe `s3_prefix`."""
+        files = [p for p in Path(local_dir).rglob("*") if p.is_file()]
+        for file_path in files:
+            self.upload_file(str(file_path), f"{s3_prefix}/{file_path.relative_to(local_dir).as_posix()}")
+        return len(files)
+    
+    def download_file(self, s3_path: str, local_path: str) -> bool:
+        """Copie le fichier d'une clé, False s'il n'existe pas."""
+        if not (self.root / s3_path).is_file():
+            return False
+        Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.root / s3_path, local_path)
+        return True
+    
+    def download_directory(self, s3_prefix: str, local_dir: str) -> int:
+        """Copie les fichiers d'un préfixe dans un dossier local."""
+        source = self.root / s3_prefix
+        if not source.is_dir():
+            return 0
+        shutil.copytree(source, local_dir, dirs_exist_ok=True)
+        return sum(1 for p in source.rglob("*") if p.is_file())
+    
+    def list_files(self, prefix: str = "") -> list:
+        """Clés commençant par `prefix`."""
+        keys = (p.relative_to(self.root).as_posix() for p in self.root.rglob("*") if p.is_file())
+        return sorted(k for k in keys if k.startswith(prefix))
+    
+    def delete_prefix(self, s3_prefix: str) -> int:
+        """Supprime les fichiers d'un préfixe."""
+        keys = self.list_files(s3_prefix.rstrip("/") + "/")
+        shutil.rmtree(self.root / s3_prefix, ignore_errors=True)
+        return len(keys)
+
+
+def list_checkpoints(storage, prefix: str) -> List[str]:
+    """Points de reprise complets d'un préfixe, du plus ancien au plus récent."""
+    prefix = prefix.rstrip("/") + "/"
+    names = set()
+    for key in storage.list_files(prefix):
+        name, _, filename = key[len(prefix):].partition("/")
+        if filename == STATE_FILE:
+            names.add(name)
+    return sorted(names)
+
+
+def latest_checkpoint_state(storage, prefix: str) -> Optional[Dict]:
+    """
+    État du dernier point de reprise complet d'un préfixe.
+    
+    Returns:
+        {"name", "epoch", "batch", "step", "created", ...métadonnées}, None si aucun
+    """
+    names = list_checkpoints(storage, prefix)
+    if not names:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        local_state = Path(tmp) / STATE_FILE
+        if not storage.download_file(f"{prefix}/{names[-1]}/{STATE_FILE}", str(local_state)):
+            return None
+        return {"name": names[-1], **json.loads(local_state.read_text())}
+
+
+def read_checkpoint_state(backup_dir: str, storage=None, prefix: Optional[str] = None) -> Optional[Dict]:
+    """
+    État du point de reprise qui sera restauré : local s'il existe, à défaut Minio.
+    
+    Returns:
+        État du point de reprise (voir latest_checkpoint_state), None si aucun
+    """
+    local_state = Path(backup_dir) / STATE_FILE
+    if local_state.exists() and tf.train.latest_checkpoint(str(Path(backup_dir) / CHIEF_DIR)):
+        return json.loads(local_state.read_text())
+    if storage is not None and prefix:
+        return latest_checkpoint_state(storage, prefix)
+    return None
+
+
+# Attributs privés de tf.keras 2.15 (keras/src/callbacks.py, BackupAndRestore, et
+# keras/src/distribute/worker_training_state.py, WorkerTrainingState) dont dépend
+# ResumableBackup ; vérifiés par TestTrainingCheckpoints à chaque montée de version
+KERAS_INTERNALS = {
+    "BackupAndRestore": ["_batches_count", "_current_epoch", "_training_state", "_backup"],
+    "WorkerTrainingState": ["_ckpt_saved_epoch", "_ckpt_saved_batch", "backup_if_preempted"],
+}
+
+
+class ResumableBackup(keras.callbacks.BackupAndRestore):
+    """
+    Points de reprise périodiques, copiés dans Minio, restaurés au démarrage de fit.
+    
+    Étend le fonctionnement interne de BackupAndRestore (voir KERAS_INTERNALS).
+    """
+    
+    def __init__(
+        self,
+        backup_dir: str,
+        storage=None,
+        prefix: Optional[str] = None,
+        save_steps: Optional[int] = None,
+        save_minutes: Optional[float] = None,
+        keep: int = 3,
+        restore: bool = True,
+        metadata: Optional[Dict] = None,
+        delete_checkpoint: bool = True
+    ):
+        """
+        Args:
+            backup_dir: Dossier local des points de reprise
+            storage: MinioClient (ou LocalStorage) ; None : points de reprise locaux seulement
+            prefix: Préfixe des points de reprise dans le stockage
+            save_steps: Point de reprise tous les `save_steps` pas
+            save_minutes: Point de reprise toutes les `save_minutes` minutes
+            keep: Nombre de points de reprise conservés dans le stockage
+            restore: Reprendre depuis le dernier point de reprise ; False :
+                les points de reprise existants sont effacés
+            metadata: Ajouté à `state.json` (ex: {"run_id": ...} pour rouvrir le run MLflow)
+            delete_checkpoint: Effacer les points de reprise à la fin de l'entraînement
+        """
+        if not save_steps and not save_minutes:
+            raise ValueError("save_steps ou save_minutes doit être défini")
+        if storage is not None and not prefix:
+            raise ValueError("prefix est requis avec un stockage")
+        # save_freq entier : reprise au pas près (et non à l'epoch)
+        super().__init__(backup_dir, save_freq=save_steps or 1, delete_checkpoint=delete_checkpoint)
+        self.storage = storage
+        self.prefix = prefix.rstrip("/") if prefix else None
+        self.save_steps = save_steps
+        self.save_seconds = save_minutes * 60.0 if save_minutes else None
+        self.keep = keep
+        self.restore = restore
+        self.metadata = dict(metadata or {})
+        self.resumed_from = None
+        self.upload_errors = []
+        self._uploads = None
+    
+    @property
+    def _chief_dir(self) -> Path:
+        return Path(self.backup_dir) / CHIEF_DIR
+    
+    def _is_chief(self) -> bool:
+        return self.model.distribute_strategy.extended.should_checkpoint
+    
+    def on_train_begin(self, logs=None):
+        if not self.restore:
+            shutil.rmtree(self.backup_dir, ignore_errors=True)
+            if self.storage is not None and self._is_chief():
+                self.storage.delete_prefix(self.prefix)
+        elif self.storage is not None and tf.train.latest_checkpoint(str(self._chief_dir)) is None:
+            # Nouveau nœud ou disque effacé : rapatrier le dernier point de reprise
+            state = latest_checkpoint_state(self.storage, self.prefix)
+            if state is not None:
+                self.storage.download_directory(f"{self.prefix}/{state['name']}", str(self._chief_dir))
+                (self._chief_dir / STATE_FILE).replace(Path(self.backup_dir) / STATE_FILE)
+                print(f"✅ Point de reprise {state['name']} téléchargé depuis {self.prefix}")
+        
+        super().on_train_begin(logs)
+        epoch = int(self._training_state._ckpt_saved_epoch.numpy())
+        batch = int(self._training_state._ckpt_saved_batch.numpy())
+        if epoch >= 0:
+            self.resumed_from = {"epoch": epoch, "batch": batch, "step": int(self.model.optimizer.iterations.numpy())}
+            print(f"🔁 Reprise de l'entraînement: epoch {epoch + 1}, après le pas {batch + 1} "
+                  f"({self.resumed_from['step']} pas déjà faits)")
+        self._uploads = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-upload")
+        self._last_save = time.monotonic()
+    
+    def on_train_batch_end(self, batch, logs=None):
+        self._training_state.backup_if_preempted()
+        self._batches_count += 1
+        due = (
+            (self.save_steps and self._batches_count >= self.save_steps)
+            or (self.save_seconds and time.monotonic() - self._last_save >= self.save_seconds)
+        )
+        if due:
+            self._backup(epoch=self._current_epoch, batch=batch)
+    
+    def _backup(self, epoch, batch=0):
+        super()._backup(epoch, batch)
+        self._batches_count = 0
+        self._last_save = time.monotonic()
+        if not self._is_chief():
+            return
+        step = int(self.model.optimizer.iterations.numpy())
+        state = {"epoch": int(epoch), "batch": int(batch), "step": step, "created": time.time(), **self.metadata}
+        (Path(self.backup_dir) / STATE_FILE).write_text(json.dumps(state))
+        if self.storage is None:
+            return
+        # Copie figée : le point de reprise local est remplacé au prochain pas de sauvegarde
+        name = checkpoint_name(step)
+        staged = Path(self.backup_dir) / "staging" / name
+        shutil.rmtree(staged, ignore_errors=True)
+        staged.mkdir(parents=True)
+        latest = Path(tf.train.latest_checkpoint(str(self._chief_dir)))
+        for file_path in [self._chief_dir / "checkpoint", *latest.parent.glob(f"{latest.name}.*")]:
+            shutil.copy2(file_path, staged / file_path.name)
+        (staged.parent / f"{name}.json").write_text(json.dumps(state))
+        self._uploads.submit(self._upload, name, staged)
+    
+    def _upload(self, name: str, staged: Path):
+        """Upload d'un point de reprise (thread d'arrière-plan) puis rétention des K derniers."""
+        try:
+            self.storage.upload_directory(str(staged), f"{self.prefix}/{name}")
+            # state.json en dernier : marque le point de reprise comme complet
+            self.storage.upload_file(str(staged.parent / f"{name}.json"), f"{self.prefix}/{name}/{STATE_FILE}")
+            for old in list_checkpoints(self.storage, self.prefix)[:-self.keep]:
+                self.storage.delete_prefix(f"{self.prefix}/{old}")
+        except Exception as e:
+            self.upload_errors.append(f"{name}: {e}")
+            print(f"⚠️  Upload du point de reprise {name} impossible: {str(e)}")
+        finally:
+            shutil.rmtree(staged, ignore_errors=True)
+            (staged.parent / f"{name}.json").unlink(missing_ok=True)
+    
+    def wait_for_uploads(self):
+        """Attend la fin des uploads en cours."""
+        if self._uploads is not None:
+            self._uploads.shutdown(wait=True)
+            self._uploads = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-upload")
+    
+    def on_train_end(self, logs=None):
+        self._uploads.shutdown(wait=True)
+        self._uploads = None
+        if self.delete_checkpoint:
+            if self.storage is not None and self._is_chief():
+                self.storage.delete_prefix(self.prefix)
+            shutil.rmtree(Path(self.backup_dir) / "staging", ignore_errors=True)
+            (Path(self.backup_dir) / STATE_FILE).unlink(missing_ok=True)
+        super().on_train_end(logs)
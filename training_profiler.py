@@ -0,0 +1,202 @@
+"""
+Profil des pas d'entraînement Keras : attente des données contre calcul.
+
+`model.fit` ne distingue pas le temps passé à attendre le lot suivant
+(pipeline d'entrée) du temps de calcul : le lot est lu dans la fonction
+d'entraînement compilée. `train_step` est donc enveloppé pour horodater
+(`tf.timestamp`) l'instant où les tenseurs du lot sont disponibles ; le
+callback compare cet instant au début et à la fin de chaque pas.
+
+Par epoch : durée moyenne d'un pas, attente des données, calcul, part
+d'attente, images/sec, durée de l'epoch et pic de mémoire résidente (RSS),
+loggés comme métriques MLflow. Une trace TensorFlow Profiler peut en plus
+être enregistrée sur quelques pas et loggée comme artefact.
+
+Le surcoût est de deux opérations et d'une lecture de variable par pas :
+le callback peut rester actif en production.
+"""
+import sys
+import tempfile
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+import tensorflow as tf
+from tensorflow import keras
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    # Windows
+    RESOURCE_AVAILABLE = False
+
+try:
+    import mlflow
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+
+# Variables d'horodatage par modèle (hors attributs du modèle : ni suivies, ni sauvegardées)
+_INSTRUMENTED = weakref.WeakKeyDictionary()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus (Mo), None si indisponible."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilo-octets sous Linux, octets sous macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def instrument_model(model: keras.Model) -> Dict[str, tf.Variable]:
+    """
+    Enveloppe `model.train_step` pour horodater l'arrivée de chaque lot.
+    
+    Sans effet si le modèle est déjà instrumenté ; sinon la fonction
+    d'entraînement compilée est invalidée pour être retracée.
+    
+    Returns:
+        Variables {"data_ready" (secondes epoch, float64), "batch_size"}
+    """
+    state = _INSTRUMENTED.get(model)
+    if state is not None:
+        return state
+    
+    # Variables locales à chaque réplique (lues sur la première) : compatibles
+    # avec les stratégies de distribution
+    with model.distribute_strategy.scope():
+        state = {
+            name: tf.Variable(
+                0, dtype=dtype, trainable=False,
+                synchronization=tf.VariableSynchronization.ON_READ,
+                aggregation=tf.VariableAggregation.ONLY_FIRST_REPLICA,
+            )
+            for name, dtype in [("data_ready", tf.float64), ("batch_size", tf.int64)]
+        }
+    original = model.train_step
+    
+    def train_step(data):
+        tensors = tf.nest.flatten(data)
+        with tf.control_dependencies(tensors):
+            stamped = [
+                state["data_ready"].assign(tf.timestamp()),
+                state["batch_size"].assign(tf.cast(tf.shape(tensors[0])[0], tf.int64)),
+            ]
+        # Le calcul du pas ne démarre qu'après l'horodatage
+        with tf.control_dependencies(stamped):
+            data = tf.nest.map_structure(tf.identity, data)
+        return original(data)
+    
+    model.train_step = train_step
+    model.train_function = None
+    _INSTRUMENTED[model] = state
+    return state
+
+
+class TrainingProfiler(keras.callbacks.Callback):
+    """Mesure attente des données / calcul par pas, débit et mémoire, par epoch."""
+    
+    def __init__(
+        self,
+        log_to_mlflow: bool = True,
+        trace_steps: Optional[Tuple[int, int]] = None,
+        trace_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            log_to_mlflow: Logger les métriques (et la trace) dans le run MLflow actif
+            trace_steps: Pas globaux (début, fin inclus) à tracer avec TensorFlow
+                Profiler, ex: (10, 15) ; None : pas de trace
+            trace_dir: Dossier de la trace (défaut : dossier temporaire)
+        """
+        super().__init__()
+        self.log_to_mlflow = log_to_mlflow and MLFLOW_AVAILABLE
+        self.trace_steps = trace_steps
+        self.trace_dir = trace_dir
+        self.epochs = []
+        self.first_step_seconds = None
+        self._state = None
+        self._tracing = False
+    
+    def set_model(self, model):
+        super().set_model(model)
+        # Appelé par fit avant la construction de la fonction d'entraînement
+        self._state = instrument_model(model)
+    
+    def on_train_begin(self, logs=None):
+        self.epochs = []
+        self.first_step_seconds = None
+        self._global_step = 0
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._waits, self._computes = [], []
+        self._images = 0
+    
+    def on_train_batch_begin(self, batch, logs=None):
+        if self.trace_steps and self._global_step == self.trace_steps[0] and not self._tracing:
+            self.trace_dir = self.trace_dir or tempfile.mkdtemp(prefix="tf-profile-")
+            tf.profiler.experimental.start(self.trace_dir)
+            self._tracing = True
+        self._batch_start = time.time()
+    
+    def on_train_batch_end(self, batch, logs=None):
+        data_ready = float(self._state["data_ready"].read_value())
+        images = int(self._state["batch_size"].read_value())
+        end = time.time()
+        if self._global_step == 0:
+            # Premier pas : traçage et compilation de la fonction d'entraînement
+            self.first_step_seconds = end - self._batch_start
+        else:
+            self._waits.append(min(max(0.0, data_ready - self._batch_start), end - self._batch_start))
+            self._computes.append(max(0.0, end - max(data_ready, self._batch_start)))
+            self._images += images
+        if self._tracing and self._global_step >= self.trace_steps[1]:
+            self._stop_trace()
+        self._global_step += 1
+    
+    def _stop_trace(self):
+        tf.profiler.experimental.stop()
+        self._tracing = False
+        print(f"✅ Trace TensorFlow Profiler: {self.trace_dir}")
+        if self.log_to_mlflow and mlflow.active_run():
+            mlflow.log_artifacts(self.trace_dir, artifact_path="profiler")
+    
+    def on_epoch_end(self, epoch, logs=None):
+        steps = len(self._waits)
+        wait, compute = sum(self._waits), sum(self._computes)
+        metrics = {
+            "epoch_seconds": time.perf_counter() - self._epoch_start,
+        }
+        if steps:
+            metrics.update({
+                "step_time_ms": 1000.0 * (wait + compute) / steps,
+                "data_wait_ms": 1000.0 * wait / steps,
+                "compute_ms": 1000.0 * compute / steps,
+                "data_wait_ratio": wait / max(wait + compute, 1e-9),
+                "images_per_sec": self._images / max(wait + compute, 1e-9),
+            })
+        rss = peak_rss_mb()
+        if rss is not None:
+            metrics["peak_rss_mb"] = rss
+        self.epochs.append(metrics)
+        if self.log_to_mlflow and mlflow.active_run():
+            mlflow.log_metrics(metrics, step=epoch)
+    
+    def on_train_end(self, logs=None):
+        if self._tracing:
+            self._stop_trace()
+        profiled = [e for e in self.epochs if "step_time_ms" in e]
+        if not profiled:
+            return
+        ratio = sum(e["data_wait_ratio"] for e in profiled) / len(profiled)
+        throughput = sum(e["images_per_sec"] for e in profiled) / len(profiled)
+        bound = "l'entrée (pipeline de données)" if ratio > 0.5 else "le calcul"
+        rss = f", pic RSS {profiled[-1]['peak_rss_mb']:.0f} Mo" if "peak_rss_mb" in profiled[-1] else ""
+        print(f"⏱️  Profil: {ratio:.0%} du temps en attente des données, {throughput:.1f} images/sec{rss} "
+              f"-> limité par {bound}")
+        if self.log_to_mlflow and mlflow.active_run() and self.first_step_seconds is not None:
+            mlflow.log_metric("first_step_seconds", self.first_step_seconds)
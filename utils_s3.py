@@ -4,6 +4,7 @@ Utils pour interagir avec Minio (S3 compatible)
 import boto3
 from botocore.client import Config
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
@@ -66,13 +67,14 @@ class MinioClient:
             print(f"❌ Erreur upload: {str(e)}")
             return False
     
-    def upload_directory(self, local_dir: str, s3_prefix: str = "") -> int:
+    def upload_directory(self, local_dir: str, s3_prefix: str = "", workers: int = 1) -> int:
         """
         Upload un dossier entier vers Minio.
         
         Args:
             local_dir: Dossier local
             s3_prefix: Préfixe S3 (ex: "models/v1/")
+            workers: Nombre d'uploads simultanés (le client boto3 est thread-safe)
             
         Returns:
             Nombre de fichiers uploadés
@@ -82,13 +84,18 @@ class MinioClient:
             print(f"❌ Dossier non trouvé: {local_dir}")
             return 0
         
-        count = 0
+        uploads = []
         for file_path in local_path.rglob("*"):
             if file_path.is_file():
                 relative_path = file_path.relative_to(local_path)
                 s3_key = f"{s3_prefix}/{relative_path}".replace("\\", "/")
-                if self.upload_file(str(file_path), s3_key):
-                    count += 1
+                uploads.append((str(file_path), s3_key))
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                count = sum(pool.map(lambda upload: self.upload_file(*upload), uploads))
+        else:
+            count = sum(self.upload_file(*upload) for upload in uploads)
         
         print(f"✅ {count} fichiers uploadés vers {s3_prefix}")
         return count
@@ -113,6 +120,50 @@ class MinioClient:
             print(f"❌ Erreur download: {str(e)}")
             return False
     
+    def download_directory(self, s3_prefix: str, local_dir: str) -> int:
+        """
+        Télécharge tous les fichiers d'un préfixe depuis Minio.
+        
+        Args:
+            s3_prefix: Préfixe S3 (ex: "models/v1")
+            local_dir: Dossier local de destination
+            
+        Returns:
+            Nombre de fichiers téléchargés
+        """
+        prefix = s3_prefix.rstrip("/") + "/"
+        count = 0
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                local_path = Path(local_dir) / obj['Key'][len(prefix):]
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                self.client.download_file(self.bucket_name, obj['Key'], str(local_path))
+                count += 1
+        
+        print(f"✅ {count} fichiers téléchargés depuis {s3_prefix}")
+        return count
+    
+    def delete_prefix(self, s3_prefix: str) -> int:
+        """
+        Supprime tous les fichiers d'un préfixe.
+        
+        Args:
+            s3_prefix: Préfixe S3 (ex: "checkpoints/run")
+            
+        Returns:
+            Nombre de fichiers supprimés
+        """
+        prefix = s3_prefix.rstrip("/") + "/"
+        count = 0
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            keys = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+            if keys:
+                self.client.delete_objects(Bucket=self.bucket_name, Delete={'Objects': keys})
+                count += len(keys)
+        return count
+    
     def list_files(self, prefix: str = "") -> list:
         """
         Liste les fichiers dans le bucket.
@@ -0,0 +1,524 @@
+"""
+Index de similarité vectorielle sur les features du Feature Store.
+
+Deux modes :
+    ExactIndex   Recherche exacte (produit matriciel par blocs + top-k
+                 par argpartition), adaptée aux petits stores
+    IVFPQIndex   Recherche approchée : partition en listes inversées
+                 (k-means) et quantification produit des résidus (codes
+                 uint8), adaptée aux grands stores
+
+Les vecteurs peuvent venir des colonnes numériques du store (standardisées
+avec les statistiques courantes) ou d'une colonne d'embeddings.
+Les index sont persistés en fichiers .npy rechargés par mmap.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from feature_store import FeatureStore, embedding_matrix
+
+
+METRICS = ["l2", "cosine"]
+INDEX_META_FILE = "index.json"
+
+
+def _as_vectors(vectors, metric: str) -> np.ndarray:
+    """Tableau float32 (n, d) ; normalisé pour la métrique cosinus."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+    return vectors
+
+
+def _as_ids(ids, count: int, start: int = 0) -> np.ndarray:
+    """Identifiants en tableau NumPy non-objet (persistable sans pickle)."""
+    if ids is None:
+        return np.arange(start, start + count, dtype=np.int64)
+    ids = np.asarray(ids)
+    if ids.dtype == object:
+        ids = ids.astype(str)
+    if len(ids) != count:
+        raise ValueError(f"{len(ids)} identifiants pour {count} vecteurs")
+    return ids
+
+
+def _squared_distances(queries: np.ndarray, data: np.ndarray, data_norms: np.ndarray) -> np.ndarray:
+    """||q - x||² = ||q||² - 2 q·x + ||x||² (un seul produit matriciel)."""
+    distances = data_norms[None, :] - 2.0 * (queries @ data.T)
+    distances += np.einsum("ij,ij->i", queries, queries)[:, None]
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def _top_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """Positions des k plus petites distances de chaque ligne, triées."""
+    if k < distances.shape[1]:
+        positions = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        positions = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+    order = np.take_along_axis(distances, positions, axis=1).argsort(axis=1, kind="stable")
+    return np.take_along_axis(positions, order, axis=1)
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """
+    k-means de Lloyd en NumPy (assignation par blocs, mise à jour par reduceat).
+    
+    Args:
+        data: Tableau float32 (n, d)
+        k: Nombre de centroïdes (borné par n)
+        iterations: Nombre d'itérations
+        seed: Graine de l'initialisation
+    
+    Returns:
+        Centroïdes float32 (k, d)
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(data))
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(data, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=k)
+        present = counts > 0
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        centroids[present] = np.add.reduceat(data[order], starts, axis=0) / counts[present, None]
+        # Clusters vides : réinitialisés sur des points aléatoires
+        if not present.all():
+            centroids[~present] = data[rng.choice(len(data), int((~present).sum()), replace=False)]
+    return centroids
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, block_size: int = 16384) -> np.ndarray:
+    """Centroïde le plus proche de chaque vecteur (par blocs pour borner la mémoire)."""
+    norms = np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), block_size):
+        block = data[start:start + block_size]
+        labels[start:start + block_size] = _squared_distances(block, centroids, norms).argmin(axis=1)
+    return labels
+
+
+class VectorIndex:
+    """Base commune : métrique, identifiants et persistance."""
+    
+    kind = None
+    
+    def __init__(self, metric: str = "l2"):
+        if metric not in METRICS:
+            raise ValueError(f"Métrique inconnue: {metric} (attendu: {', '.join(METRICS)})")
+        self.metric = metric
+        self.ids = np.empty(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def _finalize(self, distances: np.ndarray) -> np.ndarray:
+        """Distances L2² -> distances de la métrique (1 - cos pour des vecteurs normalisés)."""
+        return distances / 2.0 if self.metric == "cosine" else distances
+    
+    def save(self, path: Union[str, Path]):
+        """
+        Sauvegarde l'index (un fichier .npy par tableau + index.json).
+        
+        Args:
+            path: Dossier de destination
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        arrays = self._arrays()
+        for name, array in arrays.items():
+            np.save(path / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        meta = {"kind": self.kind, "metric": self.metric, "count": len(self), **self._params()}
+        with open(path / INDEX_META_FILE, 'w') as f:
+            json.dump(meta, f, indent=2)
+        print(f"✅ Index {self.kind} sauvegardé: {path} ({len(self)} vecteurs)")
+    
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+    
+    def _params(self) -> Dict:
+        return {}
+    
+    def search(self, queries, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+
+class ExactIndex(VectorIndex):
+    """Recherche exacte par force brute (produit matriciel par blocs)."""
+    
+    kind = "exact"
+    
+    def __init__(self, metric: str = "l2", block_size: int = 65536):
+        """
+        Args:
+            metric: "l2" ou "cosine"
+            block_size: Nombre de vecteurs de la base comparés par produit matriciel
+        """
+        super().__init__(metric)
+        self.block_size = block_size
+        self.vectors = None
+        self.norms = np.empty(0, dtype=np.float32)
+    
+    def add(self, vectors, ids=None) -> "ExactIndex":
+        """
+        Ajoute des vecteurs (les tableaux mappés en mémoire sont copiés au premier ajout).
+        
+        Args:
+            vectors: Tableau (n, d)
+            ids: Identifiants (par défaut, positions)
+        
+        Returns:
+            L'index
+        """
+        vectors = _as_vectors(vectors, self.metric)
+        ids = _as_ids(ids, len(vectors), len(self))
+        if self.vectors is None:
+            self.vectors = vectors
+            self.ids = ids
+        else:
+            self.vectors = np.concatenate([self.vectors, vectors])
+            self.ids = np.concatenate([self.ids, ids])
+        self.norms = np.concatenate([self.norms, np.einsum("ij,ij->i", vectors, vectors)])
+        return self
+    
+    def search(self, queries, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k plus proches voisins exacts.
+        
+        Args:
+            queries: Tableau (q, d) ou vecteur (d,)
+            k: Nombre de voisins
+        
+        Returns:
+            (distances (q, k), identifiants (q, k)), triés par distance croissante
+        """
+        queries = _as_vectors(queries, self.metric)
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty((len(queries), 0), np.float32), self.ids[:0].reshape(len(queries), 0)
+        
+        best_distances = best_positions = None
+        for start in range(0, len(self), self.block_size):
+            block = slice(start, start + self.block_size)
+            distances = _squared_distances(queries, self.vectors[block], self.norms[block])
+            positions = _top_k(distances, k)
+            distances = np.take_along_axis(distances, positions, axis=1)
+            positions = positions + start
+            if best_distances is not None:
+                distances = np.concatenate([best_distances, distances], axis=1)
+                positions = np.concatenate([best_positions, positions], axis=1)
+                keep = _top_k(distances, k)
+                distances = np.take_along_axis(distances, keep, axis=1)
+                positions = np.take_along_axis(positions, keep, axis=1)
+            best_distances, best_positions = distances, positions
+        return self._finalize(best_distances), self.ids[best_positions]
+    
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        return {"vectors": self.vectors, "norms": self.norms, "ids": self.ids}
+    
+    def _params(self) -> Dict:
+        return {"block_size": self.block_size}
+    
+    @classmethod
+    def _from_arrays(cls, meta: Dict, arrays: Dict[str, np.ndarray]) -> "ExactIndex":
+        index = cls(meta["metric"], meta.get("block_size", 65536))
+        index.vectors, index.norms, index.ids = arrays["vectors"], arrays["norms"], arrays["ids"]
+        return index
+
+
+class IVFPQIndex(VectorIndex):
+    """
+    Recherche approchée IVF-PQ : chaque vecteur est rangé dans la liste de
+    son centroïde grossier le plus proche, et son résidu est codé sur
+    `m` octets (un code par sous-espace). La recherche n'explore que les
+    `nprobe` listes les plus proches et calcule les distances par tables
+    (ADC) sans décompresser les vecteurs. Avec `refine`, les meilleurs
+    candidats sont reclassés par distance exacte (vecteurs conservés).
+    """
+    
+    kind = "ivfpq"
+    
+    def __init__(
+        self,
+        metric: str = "l2",
+        nlist: int = 256,
+        m: int = 16,
+        nprobe: int = 8,
+        refine: int = 0
+    ):
+        """
+        Args:
+            metric: "l2" ou "cosine"
+            nlist: Nombre de listes inversées (centroïdes grossiers)
+            m: Nombre de sous-quantificateurs (octets par vecteur)
+            nprobe: Nombre de listes explorées par requête (compromis rappel/latence)
+            refine: Si > 0, conserve les vecteurs et reclasse exactement les
+                `refine * k` meilleurs candidats PQ
+        """
+        super().__init__(metric)
+        self.nlist = nlist
+        self.m = m
+        self.nprobe = nprobe
+        self.refine = refine
+        self.centroids = None
+        self.codebooks = None
+        self.codes = np.empty((0, m), dtype=np.uint8)
+        self.lists = np.empty(0, dtype=np.int32)
+        self.vectors = None
+        self._order = None
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    def train(self, vectors, sample_size: int = 32768, iterations: int = 15, seed: int = 0) -> "IVFPQIndex":
+        """
+        Apprend les centroïdes grossiers et les dictionnaires PQ.
+        
+        Args:
+            vectors: Tableau (n, d) représentatif
+            sample_size: Nombre maximal de vecteurs utilisés
+            iterations: Itérations de k-means
+            seed: Graine aléatoire
+        
+        Returns:
+            L'index
+        """
+        vectors = _as_vectors(vectors, self.metric)
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        dim = vectors.shape[1]
+        # m doit diviser la dimension : plus grand diviseur <= m demandé
+        self.m = max(d for d in range(1, min(self.m, dim) + 1) if dim % d == 0)
+        self.codes = np.empty((0, self.m), dtype=np.uint8)
+        
+        self.centroids = _kmeans(vectors, self.nlist, iterations, seed)
+        self.nlist = len(self.centroids)
+        residuals = vectors - self.centroids[_assign(vectors, self.centroids)]
+        # 32 points par code suffisent pour les dictionnaires des sous-espaces
+        ksub = min(256, len(residuals))
+        if len(residuals) > 32 * ksub:
+            residuals = residuals[rng.choice(len(residuals), 32 * ksub, replace=False)]
+        dsub = dim // self.m
+        self.codebooks = np.stack([
+            _kmeans(np.ascontiguousarray(residuals[:, j * dsub:(j + 1) * dsub]), ksub, iterations, seed + j)
+            for j in range(self.m)
+        ])
+        return self
+    
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Liste grossière et codes PQ (uint8) de chaque vecteur."""
+        lists = _assign(vectors, self.centroids)
+        residuals = vectors - self.centroids[lists]
+        dsub = vectors.shape[1] // self.m
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _assign(np.ascontiguousarray(residuals[:, j * dsub:(j + 1) * dsub]), self.codebooks[j])
+        return lists.astype(np.int32), codes
+    
+    def add(self, vectors, ids=None) -> "IVFPQIndex":
+        """
+        Ajoute des vecteurs (entraîne l'index au premier ajout si besoin).
+        
+        Args:
+            vectors: Tableau (n, d)
+            ids: Identifiants (par défaut, positions)
+        
+        Returns:
+            L'index
+        """
+        vectors = _as_vectors(vectors, self.metric)
+        if not self.is_trained:
+            self.train(vectors)
+        ids = _as_ids(ids, len(vectors), len(self))
+        lists, codes = self._encode(vectors)
+        self.ids = ids if len(self) == 0 else np.concatenate([self.ids, ids])
+        self.lists = np.concatenate([self.lists, lists])
+        self.codes = np.concatenate([self.codes, codes])
+        if self.refine:
+            self.vectors = vectors if self.vectors is None else np.concatenate([self.vectors, vectors])
+        self._order = None
+        return self
+    
+    def _inverted_lists(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Listes inversées (recalculées après un ajout) : positions regroupées
+        par liste, offsets, et codes dans le même ordre (lecture contiguë).
+        """
+        if self._order is None:
+            self._order = np.argsort(self.lists, kind="stable")
+            self._offsets = np.searchsorted(self.lists[self._order], np.arange(self.nlist + 1))
+            # Index à plat dans les tables ADC : j * ksub + code
+            ksub = self.codebooks.shape[1]
+            self._flat_codes = self.codes[self._order].astype(np.int32) + np.arange(self.m, dtype=np.int32) * ksub
+        return self._order, self._offsets, self._flat_codes
+    
+    def search(self, queries, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k plus proches voisins approchés.
+        
+        Args:
+            queries: Tableau (q, d) ou vecteur (d,)
+            k: Nombre de voisins
+            nprobe: Listes explorées (par défaut, `self.nprobe`)
+        
+        Returns:
+            (distances (q, k), identifiants (q, k)) ; complétés par inf et
+            un identifiant vide si moins de k candidats
+        """
+        queries = _as_vectors(queries, self.metric)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        order, offsets, flat_codes = self._inverted_lists()
+        ksub, dsub = self.codebooks.shape[1:]
+        codebook_norms = np.einsum("mkd,mkd->mk", self.codebooks, self.codebooks)
+        shortlist = k * self.refine if self.refine and self.vectors is not None else k
+        
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        positions = np.full((len(queries), k), -1, dtype=np.int64)
+        coarse = _squared_distances(queries, self.centroids, np.einsum("ij,ij->i", self.centroids, self.centroids))
+        probes = _top_k(coarse, nprobe)
+        for qi, query in enumerate(queries):
+            probe = probes[qi]
+            ranges = [(offsets[l], offsets[l + 1]) for l in probe if offsets[l + 1] > offsets[l]]
+            if not ranges:
+                continue
+            # Tables ADC (nprobe, m, ksub) : ||r - c||² = ||r||² - 2 r.c + ||c||²
+            residuals = (query[None, :] - self.centroids[probe]).reshape(nprobe, self.m, dsub)
+            tables = codebook_norms[None] - 2.0 * np.einsum("pmd,mkd->pmk", residuals, self.codebooks)
+            tables += np.einsum("pmd,pmd->pm", residuals, residuals)[:, :, None]
+            tables = tables.reshape(nprobe, self.m * ksub)
+            
+            candidate_distances = np.concatenate([
+                tables[p].take(flat_codes[start:end]).sum(axis=1)
+                for p, (start, end) in zip(np.flatnonzero(offsets[probe + 1] > offsets[probe]), ranges)
+            ])
+            candidates = np.concatenate([order[start:end] for start, end in ranges])
+            best = _top_k(candidate_distances[None, :], min(shortlist, len(candidates)))[0]
+            candidates, candidate_distances = candidates[best], candidate_distances[best]
+            if shortlist > k:
+                # Lecture triée : accès séquentiels si les vecteurs sont mappés en mémoire
+                candidates = np.sort(candidates)
+                candidate_distances = ((self.vectors[candidates] - query) ** 2).sum(axis=1)
+                best = _top_k(candidate_distances[None, :], min(k, len(candidates)))[0]
+                candidates, candidate_distances = candidates[best], candidate_distances[best]
+            distances[qi, :len(candidates)] = candidate_distances
+            positions[qi, :len(candidates)] = candidates
+        
+        ids = self.ids[np.maximum(positions, 0)]
+        ids[positions < 0] = "" if self.ids.dtype.kind == "U" else -1
+        return self._finalize(np.maximum(distances, 0.0)), ids
+    
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {
+            "centroids": self.centroids, "codebooks": self.codebooks,
+            "codes": self.codes, "lists": self.lists, "ids": self.ids,
+        }
+        if self.vectors is not None:
+            arrays["vectors"] = self.vectors
+        return arrays
+    
+    def _params(self) -> Dict:
+        return {"nlist": self.nlist, "m": self.m, "nprobe": self.nprobe, "refine": self.refine}
+    
+    @classmethod
+    def _from_arrays(cls, meta: Dict, arrays: Dict[str, np.ndarray]) -> "IVFPQIndex":
+        index = cls(meta["metric"], meta["nlist"], meta["m"], meta["nprobe"], meta.get("refine", 0))
+        for name, array in arrays.items():
+            setattr(index, name, array)
+        return index
+
+
+INDEX_TYPES = {cls.kind: cls for cls in (ExactIndex, IVFPQIndex)}
+
+
+def build_index(
+    vectors,
+    ids=None,
+    kind: str = "auto",
+    metric: str = "l2",
+    exact_threshold: int = 50000,
+    **kwargs
+) -> VectorIndex:
+    """
+    Construit un index.
+    
+    Args:
+        vectors: Tableau (n, d)
+        ids: Identifiants des vecteurs (ex: image_hash)
+        kind: "exact", "ivfpq" ou "auto" (exact sous `exact_threshold` vecteurs)
+        metric: "l2" ou "cosine"
+        exact_threshold: Taille à partir de laquelle "auto" choisit IVF-PQ
+        **kwargs: Paramètres de l'index (nlist, m, nprobe, block_size)
+    
+    Returns:
+        Index construit
+    """
+    if kind == "auto":
+        kind = "exact" if len(vectors) < exact_threshold else "ivfpq"
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Type d'index inconnu: {kind} (attendu: {', '.join(INDEX_TYPES)})")
+    return INDEX_TYPES[kind](metric=metric, **kwargs).add(vectors, ids)
+
+
+def load_index(path: Union[str, Path], mmap: bool = True) -> VectorIndex:
+    """
+    Recharge un index sauvegardé par `save`.
+    
+    Args:
+        path: Dossier de l'index
+        mmap: Mapper les tableaux en mémoire (lecture seule, partagés entre processus)
+    
+    Returns:
+        Index
+    """
+    path = Path(path)
+    with open(path / INDEX_META_FILE) as f:
+        meta = json.load(f)
+    arrays = {
+        file.stem: np.load(file, mmap_mode="r" if mmap else None, allow_pickle=False)
+        for file in path.glob("*.npy")
+    }
+    return INDEX_TYPES[meta["kind"]]._from_arrays(meta, arrays)
+
+
+def vectors_from_store(
+    store: FeatureStore,
+    columns: Optional[List[str]] = None,
+    embeddings: bool = False,
+    model_version: Optional[str] = None,
+    label: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vecteurs d'un Feature Store, identifiés par image_hash.
+    
+    Args:
+        store: Feature Store
+        columns: Colonnes numériques (par défaut, toutes celles suivies par
+            les statistiques du store) ; standardisées (moyenne 0, écart-type 1)
+        embeddings: Utiliser les embeddings plutôt que les colonnes numériques
+        model_version: Version des embeddings (par défaut, la dernière)
+        label: Filtrer par label
+    
+    Returns:
+        (image_hash (n,), vecteurs float32 (n, d))
+    """
+    if embeddings:
+        table = store.get_embeddings(model_version=model_version, label=label)
+        return table.column("image_hash").to_numpy(zero_copy_only=False).astype(str), embedding_matrix(table)
+    
+    statistics = store.get_statistics()["features"]
+    columns = columns or list(statistics)
+    rows = store.get_features(label=label, columns=["image_hash"] + columns)
+    if rows.empty:
+        return np.empty(0, dtype=str), np.empty((0, len(columns)), dtype=np.float32)
+    means = np.array([statistics.get(c, {}).get("mean", 0.0) for c in columns], dtype=np.float32)
+    stds = np.array([statistics.get(c, {}).get("std", 1.0) or 1.0 for c in columns], dtype=np.float32)
+    vectors = (rows[columns].to_numpy(dtype=np.float32, na_value=np.nan) - means) / stds
+    return rows["image_hash"].to_numpy().astype(str), np.nan_to_num(vectors, nan=0.0)
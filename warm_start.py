@@ -0,0 +1,155 @@
+"""
+Ré-entraînement incrémental (warm start) depuis le modèle en production.
+
+Au lieu de repartir d'une initialisation aléatoire sur tout le dataset,
+train.py peut reprendre la dernière version enregistrée du modèle
+(registre MLflow, à défaut la copie uploadée dans Minio) et
+l'affiner sur :
+- les images absentes de son entraînement (liste `training_images.json`
+  loggée dans chaque run),
+- un échantillon de rejeu d'anciennes images, pour ne pas oublier
+  l'ancienne distribution.
+
+L'entraînement s'arrête dès que le modèle retrouve l'accuracy de validation
+de la version précédente : la durée dépend du volume de nouvelles données,
+pas de la taille totale du dataset.
+"""
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from tensorflow import keras
+
+try:
+    import mlflow
+    import mlflow.tensorflow
+    MLFLOW_AVAILABLE = True
+except ImportError:
+    MLFLOW_AVAILABLE = False
+
+from model_locator import MODEL_NAME, get_model_version
+
+
+# Artefact de chaque run : images vues par le modèle (cumulées sur les warm starts)
+TRAINED_IMAGES_ARTIFACT = "training_images.json"
+
+
+def get_base_version(client, name: str = MODEL_NAME):
+    """
+    Version de départ : alias `production`, à défaut la dernière version enregistrée.
+    
+    Returns:
+        ModelVersion MLflow, None si aucun modèle n'est enregistré
+    """
+    return get_model_version(client, name)
+
+
+def _load_from_minio(s3_prefix: str) -> keras.Model:
+    """
+    Recharge la copie d'un modèle uploadée dans Minio : modèle MLflow
+    (fichier MLmodel) ou, pour les anciens runs, SavedModel seul.
+    """
+    from utils_s3 import get_minio_client
+    
+    local_dir = tempfile.mkdtemp(prefix="warm-start-")
+    if not get_minio_client().download_directory(s3_prefix, local_dir):
+        raise FileNotFoundError(f"Aucun fichier sous {s3_prefix}")
+    if (Path(local_dir) / "MLmodel").exists():
+        return mlflow.tensorflow.load_model(local_dir)
+    return keras.models.load_model(local_dir)
+
+
+def load_base_model(client, name: str = MODEL_NAME) -> Optional[Dict]:
+    """
+    Charge le modèle de départ d'un warm start.
+    
+    Args:
+        client: MlflowClient
+        name: Nom du modèle enregistré
+    
+    Returns:
+        {"model", "version", "run_id", "metrics", "trained_images"},
+        None si aucun modèle n'est disponible
+    """
+    version = get_base_version(client, name)
+    if version is None:
+        return None
+    run = client.get_run(version.run_id)
+    
+    try:
+        model = mlflow.tensorflow.load_model(f"models:/{name}/{version.version}")
+    except Exception as e:
+        s3_prefix = run.data.params.get("s3_model_path")
+        if not s3_prefix:
+            raise
+        print(f"⚠️  Chargement MLflow impossible ({str(e)}), copie Minio {s3_prefix}")
+        model = _load_from_minio(s3_prefix)
+    
+    try:
+        trained_images = set(mlflow.artifacts.load_dict(f"runs:/{version.run_id}/{TRAINED_IMAGES_ARTIFACT}")["images"])
+    except Exception:
+        # Version antérieure au warm start : toutes les images seront considérées nouvelles
+        trained_images = set()
+    
+    return {
+        "model": model,
+        "version": version.version,
+        "run_id": version.run_id,
+        "metrics": dict(run.data.metrics),
+        "trained_images": trained_images,
+    }
+
+
+def plan_warm_start(
+    paths: List[str],
+    trained_images: Set[str],
+    replay_ratio: float = 1.0,
+    min_replay: int = 0,
+    seed: Optional[int] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Sépare les images en nouvelles images et échantillon de rejeu.
+    
+    Args:
+        paths: Images disponibles
+        trained_images: Images déjà vues par le modèle de départ
+        replay_ratio: Nombre d'anciennes images rejouées par nouvelle image
+        min_replay: Taille minimale de l'échantillon de rejeu
+        seed: Graine du tirage
+    
+    Returns:
+        (nouvelles images, images rejouées), triées
+    """
+    new = sorted(p for p in paths if p not in trained_images)
+    old = sorted(p for p in paths if p in trained_images)
+    count = min(len(old), max(min_replay, int(round(replay_ratio * len(new)))))
+    replay = np.random.default_rng(seed).choice(len(old), size=count, replace=False) if count else []
+    return new, sorted(old[i] for i in replay)
+
+
+class TargetMetricStopping(keras.callbacks.Callback):
+    """Arrête l'entraînement dès qu'une métrique de validation atteint une cible."""
+    
+    def __init__(self, target: float, monitor: str = "val_accuracy", mode: str = "max"):
+        """
+        Args:
+            target: Valeur à atteindre (ex: accuracy du modèle précédent)
+            monitor: Métrique surveillée
+            mode: "max" (atteinte si >= target) ou "min" (si <= target)
+        """
+        super().__init__()
+        self.target = target
+        self.monitor = monitor
+        self.mode = mode
+        self.stopped_epoch = None
+    
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is None:
+            return
+        reached = value >= self.target if self.mode == "max" else value <= self.target
+        if reached:
+            self.stopped_epoch = epoch
+            self.model.stop_training = True
+            print(f"\n✅ {self.monitor}={value:.4f} atteint la cible {self.target:.4f}, arrêt à l'epoch {epoch + 1}")